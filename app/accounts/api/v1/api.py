@@ -22,9 +22,11 @@ from app.accounts.services.password_reset_service import (
 )
 
 from services.token_service import (
-    is_refresh_token_valid, store_refresh_token, delete_refresh_token, store_access_token
+    is_refresh_token_valid, create_session, rotate_session,
+    list_sessions, find_session_id, revoke_session, revoke_all_sessions,
 )
 
+from core.throttling import IPRateThrottle, IdentifierRateThrottle, UserRateThrottle
 from core.utils.base_utils import get_user
 
 logger = logging.getLogger(__name__)
@@ -36,6 +38,8 @@ logger = logging.getLogger(__name__)
 class RegisterAPI(CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "register"
 
     def post(self, request):
         logger.info(f"User registration attempt for email: {request.data.get('email')}")
@@ -56,6 +60,8 @@ class RegisterAPI(CreateAPIView):
 
 class LoginAPI(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [IPRateThrottle, IdentifierRateThrottle]
+    throttle_scope = "login"
     
     def post(self, request):
         logger.info(f"Login attempt for email: {request.data.get('email')}")
@@ -68,9 +74,7 @@ class LoginAPI(TokenObtainPairView):
                     token_obj = RefreshToken(refresh_token)
                     uid = token_obj.get('user_id') or token_obj.get('user')
                     if uid:
-                        store_refresh_token(uid, refresh_token)
-                        if access_token:
-                            store_access_token(uid, access_token)
+                        create_session(uid, refresh_token, access_token)
                         logger.info(f"User logged in successfully, user_id: {uid}")
                 except TokenError as e:
                     logger.error(f"Token error during login: {str(e)}")
@@ -79,6 +83,9 @@ class LoginAPI(TokenObtainPairView):
                 
 
 class RefreshAPI(TokenRefreshView):
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "token_refresh"
+
     def post(self, request):
         logger.info("Token refresh attempt")
         old_refresh = request.data.get("refresh")
@@ -96,10 +103,10 @@ class RefreshAPI(TokenRefreshView):
         if new_refresh:
             token = RefreshToken(new_refresh)
             uid = token["user_id"]
-            store_refresh_token(uid, new_refresh)
-            if new_access:
-                store_access_token(uid, new_access)
-            delete_refresh_token(old_refresh)
+            if rotate_session(uid, old_refresh, new_refresh, new_access) is None:
+                # Revoked while the new pair was being issued; the new tokens were never stored
+                logger.warning("Refresh token revoked during refresh")
+                return Response({"message": "Invalid refresh token"}, status=401)
             logger.info("Token refreshed successfully")
 
         return response
@@ -118,6 +125,47 @@ class LogoutAPI(APIView):
         logger.info(f"User logged out successfully: {request.user.email}")
         return Response({"message": "Logged out"}, status=205)
 
+
+class SessionListAPI(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+    throttle_scope = "sessions"
+
+    def get(self, request):
+        logger.debug(f"List sessions request for user: {request.user.email}")
+        sessions = list_sessions(request.user.id, current_access_token=str(request.auth))
+        return Response({"message": "Success", "data": sessions}, status=status.HTTP_200_OK)
+
+
+class RevokeSessionAPI(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+    throttle_scope = "sessions"
+
+    def post(self, request):
+        session_id = request.data.get("session_id")
+        if not session_id:
+            return Response({"message": "session_id required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Revoke session attempt for user: {request.user.email}")
+        if not revoke_session(request.user.id, session_id):
+            return Response({"message": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"message": "Session revoked"}, status=status.HTTP_200_OK)
+
+
+class RevokeAllSessionsAPI(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+    throttle_scope = "sessions"
+
+    def post(self, request):
+        logger.info(f"Revoke all sessions attempt for user: {request.user.email}")
+        keep_current = str(request.data.get("keep_current", False)).lower() == "true"
+        current_session_id = find_session_id(request.user.id, str(request.auth)) if keep_current else None
+        revoked = revoke_all_sessions(request.user.id, except_session_id=current_session_id)
+        logger.info(f"Revoked {revoked} sessions for user: {request.user.email}")
+        return Response({"message": "Sessions revoked", "data": {"revoked": revoked}}, status=status.HTTP_200_OK)
+
 # ---------------------------------------
 # USER: Get Profile / Update Profile / Delete Profile
 # ---------------------------------------
@@ -171,6 +219,8 @@ class GetUserAPI(APIView):
 
 class GetOTPAPI(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, IdentifierRateThrottle]
+    throttle_scope = "otp_send"
 
     def post(self, request):
         logger.info(f"OTP request for {request.data.get('kind')}: {request.data.get('identifier')}")
@@ -187,6 +237,8 @@ class GetOTPAPI(APIView):
 
 class VerifyOTPAPI(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, IdentifierRateThrottle]
+    throttle_scope = "otp_verify"
 
     def post(self, request):
         logger.info(f"OTP verification for {request.data.get('kind')}: {request.data.get('identifier')}")
@@ -217,6 +269,8 @@ class VerifyOTPAPI(APIView):
 
 class OTPLoginAPI(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, IdentifierRateThrottle]
+    throttle_scope = "otp_verify"
 
     def post(self, request):
         logger.info(f"OTP login attempt for {request.data.get('kind')}: {request.data.get('identifier')}")
@@ -251,6 +305,8 @@ class OTPLoginAPI(APIView):
 
 class ForgotPasswordRequestAPI(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, IdentifierRateThrottle]
+    throttle_scope = "otp_send"
 
     def post(self, request):
         logger.info(f"Password reset request for {request.data.get('kind')}: {request.data.get('identifier')}")
@@ -266,6 +322,8 @@ class ForgotPasswordRequestAPI(APIView):
 
 class ForgotPasswordVerifyAPI(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, IdentifierRateThrottle]
+    throttle_scope = "otp_verify"
 
     def post(self, request):
         logger.info(f"Password reset OTP verification for {request.data.get('kind')}: {request.data.get('identifier')}")
@@ -278,6 +336,8 @@ class ForgotPasswordVerifyAPI(APIView):
 
 class ForgotPasswordResetAPI(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "password_reset"
 
     def put(self, request):
         logger.info("Password reset with token")
@@ -3,7 +3,7 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 
 from app.accounts.api.v1.api import (
-    RegisterAPI, LoginAPI, LogoutAPI, RefreshAPI, GetUserAPI, GetOTPAPI, VerifyOTPAPI, OTPLoginAPI, 
+    RegisterAPI, LoginAPI, LogoutAPI, RefreshAPI, SessionListAPI, RevokeSessionAPI, RevokeAllSessionsAPI, GetUserAPI, GetOTPAPI, VerifyOTPAPI, OTPLoginAPI, 
     ForgotPasswordRequestAPI, ForgotPasswordVerifyAPI, ForgotPasswordResetAPI
 )
 
@@ -14,6 +14,11 @@ urlpatterns = [
     path('login/', LoginAPI.as_view(), name='login'),
     path("logout/", LogoutAPI.as_view(), name="logout"),
     path('token/refresh/', RefreshAPI.as_view(), name='token_refresh'),
+
+    # Sessions
+    path('sessions/', SessionListAPI.as_view(), name='list_sessions'),
+    path('sessions/revoke/', RevokeSessionAPI.as_view(), name='revoke_session'),
+    path('sessions/revoke-all/', RevokeAllSessionsAPI.as_view(), name='revoke_all_sessions'),
     
     # User
     path("get-user/", GetUserAPI.as_view(), name="get_user"),
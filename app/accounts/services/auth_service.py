@@ -3,7 +3,7 @@ import logging
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.exceptions import PermissionDenied
 
-from services.token_service import store_refresh_token, delete_refresh_token, store_access_token, delete_access_token
+from services.token_service import create_session, end_session
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +12,7 @@ def login_user(user):
     logger.info(f"Logging in user: {user.email}")
     refresh = RefreshToken.for_user(user)
     access = refresh.access_token
-    store_refresh_token(user.id, str(refresh))
-    store_access_token(user.id, str(access))
+    create_session(user.id, str(refresh), str(access))
     logger.info(f"User logged in successfully: {user.email}")
     return refresh
 
@@ -30,7 +29,5 @@ def logout_user(*, refresh_token, access_token, request_user):
         logger.error(f"Error during logout token validation: {str(e)}")
         pass
 
-    delete_refresh_token(refresh_token)
-    if access_token:
-        delete_access_token(access_token)
+    end_session(request_user.id, refresh_token, access_token)
     logger.info(f"User logged out successfully: {request_user.email}")
@@ -1,9 +1,12 @@
 import logging
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
 
 from services.token_service import is_access_token_valid
+from services.user_cache import get_cached_user
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +16,25 @@ class ValidatedJWTAuthentication(JWTAuthentication):
     Custom JWT authentication that validates both the JWT signature
     and checks if the access token is still valid in Redis.
     This ensures logged-out users cannot use their existing access tokens.
+    Users are loaded through services.user_cache instead of a SELECT per request.
     """
+
+    def get_user(self, validated_token):
+        # Revocation checks compare the password hash, which is never cached
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
     
     def authenticate(self, request):
         try:
@@ -5,8 +5,7 @@ from rest_framework.exceptions import ValidationError
 from services.otp_service import (
     generate_otp,
     store_otp,
-    verify_otp,
-    increment_attempts,
+    verify_and_consume_otp,
 )
 from services.notification_services import send_sms_otp, send_email_otp_async
 
@@ -32,17 +31,18 @@ def send_otp(*, kind, identifier, purpose):
 
 def verify_otp_flow(*, kind, identifier, otp, purpose):
     logger.info(f"Verifying OTP for {kind}: {identifier}, purpose: {purpose}")
-    attempts = increment_attempts(
+    result = verify_and_consume_otp(
         f"{purpose}:{kind}",
         identifier,
+        otp,
+        max_attempts=MAX_ATTEMPTS,
         window_seconds=300,
     )
-    if attempts > MAX_ATTEMPTS:
+    if result.attempts > MAX_ATTEMPTS:
         logger.warning(f"Too many OTP attempts for {kind}: {identifier}")
         raise ValidationError("Too many attempts. Try later.")
 
-    ok = verify_otp(f"{purpose}:{kind}", identifier, otp)
-    if not ok:
+    if not result.consumed:
         logger.warning(f"Invalid or expired OTP for {kind}: {identifier}")
         raise ValidationError("Invalid or expired OTP")
     logger.info(f"OTP verified successfully for {kind}: {identifier}")
@@ -4,7 +4,7 @@ from rest_framework.exceptions import ValidationError
 
 from app.accounts.models import User
 from services.otp_service import (
-    generate_otp, store_otp, verify_otp, increment_attempts, create_reset_token, 
+    generate_otp, store_otp, verify_and_consume_otp, increment_attempts, create_reset_token, 
     get_userid_for_reset_token, delete_reset_token,
 )
 from services.notification_services import send_email_otp_async, send_sms_otp
@@ -46,12 +46,15 @@ def request_password_reset(*, kind, identifier):
 
 def verify_password_reset_otp(*, kind, identifier, otp):
     logger.info(f"Verifying password reset OTP for {kind}: {identifier}")
-    attempts = increment_attempts(f"password_verify:{kind}", identifier, 300)
-    if attempts > 5:
+    result = verify_and_consume_otp(
+        f"password:{kind}", identifier, otp,
+        attempts_kind=f"password_verify:{kind}", max_attempts=5, window_seconds=300,
+    )
+    if result.attempts > 5:
         logger.warning(f"Too many password reset OTP verification attempts for {kind}: {identifier}")
         raise ValidationError("Too many attempts")
 
-    if not verify_otp(f"password:{kind}", identifier, otp):
+    if not result.consumed:
         logger.warning(f"Invalid password reset OTP for {kind}: {identifier}")
         raise ValidationError("Invalid OTP")
 
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app.accounts.models import User
+
+from services.user_cache import invalidate_user
+
+
+# =========================================================
+# USER CACHE INVALIDATION
+# =========================================================
+# Covers profile updates, deactivation and soft delete, which all go
+# through save(). Runs after commit so a concurrent reader cannot cache
+# the row as it was before the transaction.
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
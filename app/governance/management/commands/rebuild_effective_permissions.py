@@ -0,0 +1,63 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.governance.models import EffectiveProjectPermission
+from app.governance.services.effective_permissions import (
+    REBUILD_CHUNK_SIZE, projects_for_scope, rebuild_all_effective_permissions, rebuild_project_permissions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the effective project permission table from memberships and governance settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--org',
+            help='Only rebuild projects of this organization',
+        )
+        parser.add_argument(
+            '--team',
+            help='Only rebuild projects of this team',
+        )
+        parser.add_argument(
+            '--project',
+            help='Only rebuild this project',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help=f'Projects rebuilt per transaction (default: {REBUILD_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        scopes = [(scope, options[option]) for scope, option in (('org', 'org'), ('team', 'team'), ('project', 'project')) if options[option]]
+        if len(scopes) > 1:
+            raise CommandError('Use only one of --org, --team and --project.')
+
+        started = time.monotonic()
+        if scopes:
+            scope, entity_id = scopes[0]
+            project_ids = list(projects_for_scope(scope, entity_id).values_list('pk', flat=True))
+            written = 0
+            for start in range(0, len(project_ids), options['chunk_size']):
+                written += rebuild_project_permissions(
+                    projects_for_scope(scope, entity_id).filter(pk__in=project_ids[start:start + options['chunk_size']])
+                )
+            label = f'{len(project_ids)} projects of {scope} {entity_id}'
+        else:
+            written = rebuild_all_effective_permissions(chunk_size=options['chunk_size'])
+            label = 'all projects'
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} effective permissions for {label} in {elapsed:.1f}s '
+            f'({EffectiveProjectPermission.objects.count()} rows in table).'
+        ))
+        logger.info(f'Rebuilt {written} effective permissions for {label}')
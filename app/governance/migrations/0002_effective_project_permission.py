@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('governance', '0001_initial'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectiveProjectPermission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('effective_role', models.CharField(choices=[('OWNER', 'Owner'), ('MANAGER', 'Manager'), ('LEAD', 'Lead'), ('CONTRIBUTOR', 'Contributor'), ('VIEWER', 'Viewer')], max_length=20)),
+                ('capabilities', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_permissions', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_project_permissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'effective_role'], name='governance__user_id_4d6ece_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='unique_effective_project_user')],
+            },
+        ),
+    ]
@@ -175,4 +175,36 @@ class ProjectSettings(BaseSettings):
     inherit_base_rules_from_org = models.BooleanField(default=False)
     
     def __str__(self):
-        return f"Project Settings - {self.project.name}"
\ No newline at end of file
+        return f"Project Settings - {self.project.name}"
+
+
+class EffectiveProjectPermission(TimeStampedModel):
+    """
+    Denormalized answer to "what can this user do in this project", combining
+    project, team and organization memberships with the project's governance
+    rules. Maintained by app.governance.services.effective_permissions; rebuild
+    with `manage.py rebuild_effective_permissions`.
+    """
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='effective_project_permissions'
+    )
+    project = models.ForeignKey(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        related_name='effective_permissions'
+    )
+    effective_role = models.CharField(max_length=20, choices=project_constant.PROJECT_ROLES)
+    capabilities = models.PositiveIntegerField(default=0)                          # Bitmask of project_constant.PROJECT_CAPABILITIES
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "project"], name="unique_effective_project_user")
+        ]
+        indexes = [
+            models.Index(fields=["user", "effective_role"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.project_id}: {self.effective_role}"
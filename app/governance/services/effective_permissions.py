@@ -0,0 +1,202 @@
+import logging
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from app.governance.models import EffectiveProjectPermission
+from app.governance.services.rules_engine import GovernanceResolver
+from app.organizations.models import OrganizationMembership
+from app.projects.models import Project, ProjectMembership
+from app.teams.models import TeamMembership
+from core.constants.project_constant import PROJECT_CAPABILITIES, PROJECT_ROLE_HIERARCHY
+
+logger = logging.getLogger(__name__)
+
+# Projects rebuilt per transaction by rebuild_all_effective_permissions
+REBUILD_CHUNK_SIZE = 100
+
+MEMBER_ACTIONS = ("invite_member", "update_member", "remove_member")
+TASK_ACTIONS = ("create_task", "update_task")
+
+
+def effective_permissions_enabled():
+    """Whether the table is maintained; while it is off, its rows may be stale."""
+    return getattr(settings, "EFFECTIVE_PERMISSIONS_ENABLED", False)
+
+
+def effective_project_role(project, project_role, team_role, org_role):
+    """
+    The project role a user effectively holds, mirroring the permission classes:
+    organization owners act as project owners (IsOrgOwnerOrProjectOwner), and
+    any organization member - or team member, for projects outside an
+    organization - can view the project (check_user_project_permission).
+    """
+    candidates = [project_role]
+    if org_role == "OWNER":
+        candidates.append("OWNER")
+    if project.organization_id:
+        if org_role:
+            candidates.append("VIEWER")
+    elif project.team_id and team_role:
+        candidates.append("VIEWER")
+
+    roles = [role for role in candidates if role in PROJECT_ROLE_HIERARCHY]
+    if not roles:
+        return None
+    return max(roles, key=PROJECT_ROLE_HIERARCHY.get)
+
+
+def project_capabilities(effective_role, project_role, table):
+    """Capability bitmask for a user given the project's ActionDecisionTable."""
+    if effective_role is None:
+        return 0
+    rank = PROJECT_ROLE_HIERARCHY[effective_role]
+    capabilities = PROJECT_CAPABILITIES["view_project"]
+
+    # IsOrgOwnerOrProjectManager, then ProjectAPI.check_role_permissions
+    if rank >= PROJECT_ROLE_HIERARCHY["MANAGER"]:
+        for action_name in MEMBER_ACTIONS:
+            if table.can(effective_role, action_name):
+                capabilities |= PROJECT_CAPABILITIES[action_name]
+
+    # IsProjectMember / IsProjectManager, then TaskAPI.check_role_permissions
+    if project_role is not None:
+        for action_name in TASK_ACTIONS:
+            if table.can(project_role, action_name):
+                capabilities |= PROJECT_CAPABILITIES[action_name]
+        if PROJECT_ROLE_HIERARCHY.get(project_role, 0) >= PROJECT_ROLE_HIERARCHY["MANAGER"] and table.can(project_role, "delete_task"):
+            capabilities |= PROJECT_CAPABILITIES["delete_task"]
+
+    if effective_role == "OWNER":
+        capabilities |= PROJECT_CAPABILITIES["manage_project"]
+    return capabilities
+
+
+def _role_maps(projects, user_ids=None):
+    """{project/team/org id: {user id: role}} for the memberships that matter to `projects`."""
+    project_ids = [project.pk for project in projects]
+    team_ids = {project.team_id for project in projects if project.team_id and not project.organization_id}
+    org_ids = {project.organization_id for project in projects if project.organization_id}
+
+    maps = {"project": defaultdict(dict), "team": defaultdict(dict), "org": defaultdict(dict)}
+    for kind, model, field, ids in (
+        ("project", ProjectMembership, "project_id", project_ids),
+        ("team", TeamMembership, "team_id", team_ids),
+        ("org", OrganizationMembership, "organization_id", org_ids),
+    ):
+        if not ids:
+            continue
+        memberships = model.objects.filter(**{f"{field}__in": ids})
+        if user_ids is not None:
+            memberships = memberships.filter(user_id__in=user_ids)
+        for entity_id, user_id, role in memberships.values_list(field, "user_id", "role"):
+            maps[kind][entity_id][user_id] = role
+    return maps
+
+
+def rebuild_project_permissions(projects, user_ids=None):
+    """
+    Recompute EffectiveProjectPermission rows for `projects` (limited to
+    `user_ids` when given): three membership queries, one upsert and one
+    delete for users who no longer have access. Returns rows written.
+    """
+    projects = list(projects)
+    if not projects:
+        return 0
+    maps = _role_maps(projects, user_ids)
+
+    rows = []
+    for project in projects:
+        table = GovernanceResolver.get_project_action_table(project)
+        project_roles = maps["project"].get(project.pk, {})
+        team_roles = maps["team"].get(project.team_id, {}) if not project.organization_id else {}
+        org_roles = maps["org"].get(project.organization_id, {})
+
+        for user_id in set(project_roles) | set(team_roles) | set(org_roles):
+            project_role = project_roles.get(user_id)
+            role = effective_project_role(project, project_role, team_roles.get(user_id), org_roles.get(user_id))
+            if role is None:
+                continue
+            rows.append(EffectiveProjectPermission(
+                user_id=user_id,
+                project_id=project.pk,
+                effective_role=role,
+                capabilities=project_capabilities(role, project_role, table),
+            ))
+
+    keep = {(row.user_id, row.project_id) for row in rows}
+    existing = EffectiveProjectPermission.objects.filter(project_id__in=[project.pk for project in projects])
+    if user_ids is not None:
+        existing = existing.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        stale_ids = [
+            pk for pk, user_id, project_id in existing.values_list("pk", "user_id", "project_id")
+            if (user_id, project_id) not in keep
+        ]
+        if stale_ids:
+            EffectiveProjectPermission.objects.filter(pk__in=stale_ids).delete()
+
+        EffectiveProjectPermission.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user", "project"],
+            update_fields=["effective_role", "capabilities", "updated_at"],
+        )
+    return len(rows)
+
+
+def rebuild_user_permissions(user_id, projects):
+    """Refresh one user's rows after a membership change."""
+    return rebuild_project_permissions(projects, user_ids=[user_id])
+
+
+def clear_project_permissions(project_id):
+    """Drop every row of a project, e.g. once it is soft-deleted. Returns rows deleted."""
+    deleted, _ = EffectiveProjectPermission.objects.filter(project_id=project_id).delete()
+    return deleted
+
+
+def rebuild_all_effective_permissions(chunk_size=REBUILD_CHUNK_SIZE):
+    """Rebuild every row, a chunk of projects per transaction. Returns rows written."""
+    written = 0
+    project_ids = list(Project.objects.filter(is_deleted=False).values_list("pk", flat=True))
+    for start in range(0, len(project_ids), chunk_size):
+        written += rebuild_project_permissions(
+            Project.objects.filter(pk__in=project_ids[start:start + chunk_size])
+        )
+    EffectiveProjectPermission.objects.filter(project__is_deleted=True).delete()
+    return written
+
+
+def projects_for_scope(scope, entity_id):
+    """Projects whose effective permissions depend on an organization, team or project."""
+    if scope == "org":
+        return Project.objects.filter(organization_id=entity_id, is_deleted=False)
+    if scope == "team":
+        return Project.objects.filter(team_id=entity_id, is_deleted=False)
+    return Project.objects.filter(pk=entity_id, is_deleted=False)
+
+
+def has_project_capability(user, project, capability):
+    """One indexed lookup: does `user` hold `capability` (a PROJECT_CAPABILITIES name) in `project`?"""
+    bit = PROJECT_CAPABILITIES[capability]
+    row = (
+        EffectiveProjectPermission.objects.filter(user=user, project=project)
+        .values_list("capabilities", flat=True)
+        .first()
+    )
+    return bool(row and row & bit)
+
+
+def projects_with_capability(user, capability):
+    """Project ids where `user` holds `capability`, as a subquery for Project filters."""
+    bit = PROJECT_CAPABILITIES[capability]
+    return (
+        EffectiveProjectPermission.objects.alias(granted=F("capabilities").bitand(bit))
+        .filter(user=user, granted=bit)
+        .values("project_id")
+    )
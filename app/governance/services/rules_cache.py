@@ -0,0 +1,176 @@
+import json
+import logging
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RULES_CACHE_PREFIX = "governance_rules:"
+SETTINGS_VERSION_PREFIX = "governance_version:"
+
+ORG_SCOPE = "org"
+TEAM_SCOPE = "team"
+PROJECT_SCOPE = "project"
+
+
+def _version_key(scope, entity_id):
+    return f"{SETTINGS_VERSION_PREFIX}{scope}:{entity_id}"
+
+
+def _lineage(chain):
+    """[(scope, id), ...] with absent ancestors (no team/org) dropped, ids as strings."""
+    return [[scope, str(entity_id)] for scope, entity_id in chain if entity_id is not None]
+
+
+class GovernanceRulesCache:
+    """
+    Effective governance rules per project or team: a per-process LRU in
+    front of Redis in front of the settings walk.
+
+    Every organization, team and project has a settings version in Redis,
+    replaced by a fresh random stamp whenever its settings are saved. An
+    entry records the versions of the entity and all of its ancestors at the
+    time it was computed, so a change to organization settings invalidates
+    every team and project below it without enumerating them. Local entries
+    are trusted for `local_ttl` seconds, which bounds how long another
+    process may apply stale rules.
+    """
+
+    def __init__(self, max_size=10000, local_ttl=5.0, redis_ttl=3600):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope, chain, compute):
+        """
+        Return the rules for chain[0], an entity given as (scope, id) followed
+        by its ancestors. `compute` is called on a miss.
+        """
+        lineage = _lineage(chain)
+        key = f"{scope}:{lineage[0][1]}"
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            # A project moved to another team carries a different lineage
+            if entry is not None and entry[0] > now and entry[1] == lineage:
+                self._entries.move_to_end(key)
+                self.local_hits += 1
+                return dict(entry[2])
+
+        versions, rules = self._read_redis(key, lineage)
+        if rules is not None:
+            self.redis_hits += 1
+        else:
+            self.misses += 1
+            rules = compute()
+            self._write_redis(key, lineage, versions, rules)
+
+        self._remember(key, lineage, rules)
+        return dict(rules)
+
+    def invalidate(self, scope, entity_id):
+        """Give an entity a new settings version; descendants miss from now on."""
+        node = [scope, str(entity_id)]
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if node in entry[1]]:
+                del self._entries[key]
+        try:
+            # A stamp never repeats, unlike a counter that restarts once its key
+            # expires; entries written under an expired stamp can never match again
+            settings.REDIS_CLIENT.set(_version_key(scope, entity_id), uuid.uuid4().hex, ex=self.redis_ttl * 2)
+        except Exception as e:
+            # Redis entries also expire on their own after redis_ttl
+            logger.error(f"Could not invalidate governance rules for {scope} {entity_id}: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    def _read_redis(self, key, lineage):
+        """(current versions of the lineage, cached rules or None) in one MGET"""
+        try:
+            *versions, payload = settings.REDIS_CLIENT.mget(
+                *[_version_key(scope, entity_id) for scope, entity_id in lineage],
+                f"{RULES_CACHE_PREFIX}{key}",
+            )
+        except Exception as e:
+            logger.warning(f"Could not read cached governance rules for {key}: {str(e)}")
+            return None, None
+        versions = [version or "" for version in versions]
+        if payload:
+            entry = json.loads(payload)
+            if entry.get("lineage") == lineage and entry.get("versions") == versions:
+                return versions, entry["rules"]
+        return versions, None
+
+    def _write_redis(self, key, lineage, versions, rules):
+        if versions is None:
+            return
+        try:
+            settings.REDIS_CLIENT.set(
+                f"{RULES_CACHE_PREFIX}{key}",
+                json.dumps({"lineage": lineage, "versions": versions, "rules": rules}),
+                ex=self.redis_ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache governance rules for {key}: {str(e)}")
+
+    def _remember(self, key, lineage, rules):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.local_ttl, lineage, dict(rules))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_rules_cache():
+    """Return the process-wide governance rules cache, or None when disabled."""
+    global _cache
+    if not getattr(settings, "GOVERNANCE_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GovernanceRulesCache(
+                    max_size=getattr(settings, "GOVERNANCE_CACHE_SIZE", 10000),
+                    local_ttl=getattr(settings, "GOVERNANCE_CACHE_LOCAL_TTL", 5.0),
+                    redis_ttl=getattr(settings, "GOVERNANCE_CACHE_REDIS_TTL", 3600),
+                )
+    return _cache
+
+
+def cached_rules(scope, chain, compute):
+    """Effective rules through the cache (computed directly when disabled)."""
+    cache = get_rules_cache()
+    if cache is None:
+        return compute()
+    return cache.get(scope, chain, compute)
+
+
+def invalidate_settings(scope, entity_id):
+    cache = get_rules_cache()
+    if cache is not None:
+        cache.invalidate(scope, entity_id)
@@ -1,7 +1,57 @@
-from core.constants import (
-    ORG_ACTION_POLICIES, TEAM_ACTION_POLICIES, PROJECT_ACTION_POLICIES, 
-    ORG_ROLE_HIERARCHY, TEAM_ROLE_HIERARCHY, PROJECT_ROLE_HIERARCHY,
+from rest_framework.exceptions import ValidationError
+
+from app.governance.models import OrganizationSettings, TeamSettings
+from app.governance.services.rules_cache import (
+    ORG_SCOPE, TEAM_SCOPE, PROJECT_SCOPE, cached_rules,
 )
+from core.constants.org_constant import ORG_ACTION_POLICIES, ORG_ROLE_HIERARCHY
+from core.constants.team_constant import TEAM_ACTION_POLICIES, TEAM_ROLE_HIERARCHY
+from core.constants.project_constant import PROJECT_ACTION_POLICIES, PROJECT_ROLE_HIERARCHY
+
+
+# Settings flag that switches each action on for non-owners, and how it reads in errors
+ACTION_SWITCHES = {
+    "invite_member": ("allow_member_invites", "invite members"),
+    "update_member": ("allow_member_updates", "update members"),
+    "remove_member": ("allow_member_removal", "remove members"),
+    "create_team": ("allow_team_creation", "create teams"),
+    "create_project": ("allow_project_creation", "create projects"),
+    "create_task": ("allow_task_creation", "create tasks"),
+    "update_task": ("allow_task_updates", "update tasks"),
+    "delete_task": ("allow_task_deletions", "delete tasks"),
+}
+
+ORG_ACTIONS_SCOPE = "org_actions"
+TEAM_ACTIONS_SCOPE = "team_actions"
+PROJECT_ACTIONS_SCOPE = "project_actions"
+
+
+class ActionDecisionTable:
+    """
+    "Can role R do action A" for one organization, team or project, answered
+    with a single set lookup. Built once per settings version by
+    GovernanceResolver.compile_action_table; OWNER can always act.
+    """
+
+    def __init__(self, actions):
+        # action -> {"enabled": bool, "min_role": str, "roles": [roles allowed]}
+        self.actions = actions
+        self._roles = {name: frozenset(decision["roles"]) for name, decision in actions.items()}
+
+    def can(self, role, action_name):
+        roles = self._roles.get(action_name)
+        if roles is None:
+            raise ValueError(f"Unknown action policy: {action_name}")
+        return role in roles
+
+    def check(self, role, action_name, error=ValidationError):
+        """Raise `error` with the reason when `role` may not perform the action."""
+        if self.can(role, action_name):
+            return True
+        decision = self.actions[action_name]
+        if not decision["enabled"]:
+            raise error(f"You are not allowed to {ACTION_SWITCHES[action_name][1]}.")
+        raise error(f"You must have at least {decision['min_role']} role to perform this action.")
 
 
 class GovernanceResolver:
@@ -18,6 +68,17 @@ class GovernanceResolver:
 
     @staticmethod
     def get_effective_project_base_rules(project):
+        """
+        Project → Team → Org, cached until any of the three settings change.
+        """
+        return cached_rules(
+            PROJECT_SCOPE,
+            [(PROJECT_SCOPE, project.pk), (TEAM_SCOPE, project.team_id), (ORG_SCOPE, project.organization_id)],
+            lambda: GovernanceResolver._compute_project_base_rules(project),
+        )
+
+    @staticmethod
+    def _compute_project_base_rules(project):
         project_settings = project.settings
 
         effective = {}
@@ -27,14 +88,14 @@ class GovernanceResolver:
             effective[field] = getattr(project_settings, field)
 
         # 2️⃣ Override from team (if enabled)
-        if project.team and project_settings.inherit_base_rules_from_team:
-            team_settings = project.team.settings
+        if project.team_id and project_settings.inherit_base_rules_from_team:
+            team_settings = TeamSettings.objects.get(team_id=project.team_id)
             for field in GovernanceResolver.BASE_FIELDS:
                 effective[field] = getattr(team_settings, field)
 
         # 3️⃣ Override from org (highest priority)
-        if project.organization and project_settings.inherit_base_rules_from_org:
-            org_settings = project.organization.settings
+        if project.organization_id and project_settings.inherit_base_rules_from_org:
+            org_settings = OrganizationSettings.objects.get(organization_id=project.organization_id)
             for field in GovernanceResolver.BASE_FIELDS:
                 effective[field] = getattr(org_settings, field)
 
@@ -48,8 +109,16 @@ class GovernanceResolver:
     @staticmethod
     def get_effective_team_base_rules(team):
         """
-        Team → Org
+        Team → Org, cached until either settings change.
         """
+        return cached_rules(
+            TEAM_SCOPE,
+            [(TEAM_SCOPE, team.pk), (ORG_SCOPE, team.organization_id)],
+            lambda: GovernanceResolver._compute_team_base_rules(team),
+        )
+
+    @staticmethod
+    def _compute_team_base_rules(team):
         team_settings = team.settings
         effective_rules = {}
 
@@ -62,8 +131,8 @@ class GovernanceResolver:
         for field in base_fields:
             effective_rules[field] = getattr(team_settings, field)
 
-        if team.organization and team_settings.inherit_base_rules_from_org:
-            org_settings = team.organization.settings
+        if team.organization_id and team_settings.inherit_base_rules_from_org:
+            org_settings = OrganizationSettings.objects.get(organization_id=team.organization_id)
             for field in base_fields:
                 effective_rules[field] = getattr(org_settings, field)
 
@@ -107,3 +176,62 @@ class GovernanceResolver:
             configured_value = system_max
 
         return configured_value
+
+
+    # -----------------------------------------------------
+    # COMPILED ACTION DECISION TABLES
+    # -----------------------------------------------------
+
+    @staticmethod
+    def compile_action_table(entity_settings, policy_dict, hierarchy, rules=None):
+        """
+        Resolve every action in `policy_dict` against a settings row. Switches
+        are read from `rules` (the effective base rules) when they are there,
+        otherwise from the row itself.
+        """
+        rules = rules or {}
+        actions = {}
+        for action_name in policy_dict:
+            switch = ACTION_SWITCHES[action_name][0]
+            enabled = bool(rules.get(switch, getattr(entity_settings, switch)))
+            min_role = GovernanceResolver.resolve_action_min_role(entity_settings, action_name, policy_dict, hierarchy)
+            roles = ["OWNER"]
+            if enabled:
+                roles = [role for role, rank in hierarchy.items() if rank >= hierarchy[min_role] or role == "OWNER"]
+            actions[action_name] = {"enabled": enabled, "min_role": min_role, "roles": roles}
+        return actions
+
+    @staticmethod
+    def get_org_action_table(organization):
+        actions = cached_rules(
+            ORG_ACTIONS_SCOPE,
+            [(ORG_SCOPE, organization.pk)],
+            lambda: GovernanceResolver.compile_action_table(
+                organization.settings, ORG_ACTION_POLICIES, ORG_ROLE_HIERARCHY,
+            ),
+        )
+        return ActionDecisionTable(actions)
+
+    @staticmethod
+    def get_team_action_table(team):
+        actions = cached_rules(
+            TEAM_ACTIONS_SCOPE,
+            [(TEAM_SCOPE, team.pk), (ORG_SCOPE, team.organization_id)],
+            lambda: GovernanceResolver.compile_action_table(
+                team.settings, TEAM_ACTION_POLICIES, TEAM_ROLE_HIERARCHY,
+                GovernanceResolver.get_effective_team_base_rules(team),
+            ),
+        )
+        return ActionDecisionTable(actions)
+
+    @staticmethod
+    def get_project_action_table(project):
+        actions = cached_rules(
+            PROJECT_ACTIONS_SCOPE,
+            [(PROJECT_SCOPE, project.pk), (TEAM_SCOPE, project.team_id), (ORG_SCOPE, project.organization_id)],
+            lambda: GovernanceResolver.compile_action_table(
+                project.settings, PROJECT_ACTION_POLICIES, PROJECT_ROLE_HIERARCHY,
+                GovernanceResolver.get_effective_project_base_rules(project),
+            ),
+        )
+        return ActionDecisionTable(actions)
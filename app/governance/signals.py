@@ -1,15 +1,23 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 
-from app.organizations.models import Organization
-from app.teams.models import Team
-from app.projects.models import Project
+from app.organizations.models import Organization, OrganizationMembership
+from app.teams.models import Team, TeamMembership
+from app.projects.models import Project, ProjectMembership
 
 from app.governance.models import (
     OrganizationSettings,
     TeamSettings,
     ProjectSettings,
 )
+from app.governance.services.effective_permissions import (
+    clear_project_permissions, effective_permissions_enabled, rebuild_user_permissions,
+)
+from app.governance.services.rules_cache import (
+    ORG_SCOPE, TEAM_SCOPE, PROJECT_SCOPE, invalidate_settings,
+)
+from app.governance.tasks import rebuild_effective_permissions_task
 
 
 # =========================================================
@@ -40,3 +48,113 @@ def create_team_settings(sender, instance, created, **kwargs):
 def create_project_settings(sender, instance, created, **kwargs):
     if created:
         ProjectSettings.objects.create(project=instance)
+
+
+# =========================================================
+# EFFECTIVE RULES CACHE INVALIDATION
+# =========================================================
+# Bumping an entity's settings version also invalidates the cached rules of
+# every team and project below it. Runs after commit so a concurrent reader
+# cannot cache rules computed from the old settings.
+
+@receiver(post_save, sender=OrganizationSettings)
+def invalidate_org_rules(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_settings(ORG_SCOPE, instance.organization_id))
+
+
+@receiver(post_save, sender=TeamSettings)
+def invalidate_team_rules(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_settings(TEAM_SCOPE, instance.team_id))
+
+
+@receiver(post_save, sender=ProjectSettings)
+def invalidate_project_rules(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_settings(PROJECT_SCOPE, instance.project_id))
+
+
+# =========================================================
+# EFFECTIVE PERMISSION TABLE MAINTENANCE
+# =========================================================
+# A project membership change touches one row and is refreshed right after
+# commit. Team and organization memberships can span many projects, and
+# settings changes and project moves can touch every member of a large
+# organization, so those are rebuilt by a Celery task. Settings rows created
+# along with their entity have no members to rebuild yet. Callbacks are
+# robust: a failed refresh is logged instead of failing a committed request.
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def refresh_project_member_permissions(sender, instance, **kwargs):
+    if effective_permissions_enabled():
+        transaction.on_commit(lambda: rebuild_user_permissions(
+            instance.user_id, Project.objects.filter(pk=instance.project_id, is_deleted=False),
+        ), robust=True)
+
+
+@receiver(post_save, sender=TeamMembership)
+@receiver(post_delete, sender=TeamMembership)
+def refresh_team_member_permissions(sender, instance, **kwargs):
+    if effective_permissions_enabled():
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(
+            TEAM_SCOPE, instance.team_id, user_id=instance.user_id,
+        ), robust=True)
+
+
+@receiver(post_save, sender=OrganizationMembership)
+@receiver(post_delete, sender=OrganizationMembership)
+def refresh_org_member_permissions(sender, instance, **kwargs):
+    if effective_permissions_enabled():
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(
+            ORG_SCOPE, instance.organization_id, user_id=instance.user_id,
+        ), robust=True)
+
+
+@receiver(post_save, sender=OrganizationSettings)
+def rebuild_org_permissions(sender, instance, created, **kwargs):
+    if not created and effective_permissions_enabled():
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(ORG_SCOPE, instance.organization_id), robust=True)
+
+
+@receiver(post_save, sender=TeamSettings)
+def rebuild_team_permissions(sender, instance, created, **kwargs):
+    if not created and effective_permissions_enabled():
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(TEAM_SCOPE, instance.team_id), robust=True)
+
+
+@receiver(post_save, sender=ProjectSettings)
+def rebuild_project_settings_permissions(sender, instance, created, **kwargs):
+    if not created and effective_permissions_enabled():
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(PROJECT_SCOPE, instance.project_id), robust=True)
+
+
+# Fields of a Project that its effective permissions depend on
+PROJECT_PLACEMENT_FIELDS = ("team_id", "organization_id", "is_deleted")
+
+
+@receiver(pre_save, sender=Project)
+def detect_project_placement_change(sender, instance, update_fields=None, **kwargs):
+    # Renames and other edits leave effective permissions alone
+    instance._placement_changed = False
+    if instance._state.adding or not effective_permissions_enabled():
+        return
+    if update_fields is not None and not {"team", "organization", *PROJECT_PLACEMENT_FIELDS} & set(update_fields):
+        return
+    previous = Project.objects.filter(pk=instance.pk).values_list(*PROJECT_PLACEMENT_FIELDS).first()
+    instance._placement_changed = previous != tuple(getattr(instance, field) for field in PROJECT_PLACEMENT_FIELDS)
+
+
+@receiver(post_save, sender=Project)
+def rebuild_placed_project_permissions(sender, instance, created, **kwargs):
+    if not effective_permissions_enabled():
+        return
+    # A new project is visible to its organization (or team) members right away
+    if created:
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(PROJECT_SCOPE, instance.pk), robust=True)
+        return
+    if not getattr(instance, "_placement_changed", False):
+        return
+    if instance.is_deleted:
+        # Rebuilds skip deleted projects, so their rows are dropped in the same transaction
+        clear_project_permissions(instance.pk)
+    else:
+        transaction.on_commit(lambda: rebuild_effective_permissions_task.delay(PROJECT_SCOPE, instance.pk), robust=True)
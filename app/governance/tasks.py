@@ -0,0 +1,32 @@
+import logging
+
+from celery import shared_task
+
+from app.governance.services.effective_permissions import (
+    REBUILD_CHUNK_SIZE, projects_for_scope, rebuild_project_permissions,
+)
+from app.projects.models import Project
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def rebuild_effective_permissions_task(self, scope, entity_id, user_id=None):
+    """
+    Celery task to recompute effective project permissions below an
+    organization, team or project after its settings, placement or - for
+    one user - memberships changed.
+    """
+    project_ids = list(projects_for_scope(scope, entity_id).values_list("pk", flat=True))
+    user_ids = [user_id] if user_id is not None else None
+    written = 0
+    try:
+        for start in range(0, len(project_ids), REBUILD_CHUNK_SIZE):
+            written += rebuild_project_permissions(
+                Project.objects.filter(pk__in=project_ids[start:start + REBUILD_CHUNK_SIZE]), user_ids=user_ids,
+            )
+    except Exception as e:
+        logger.error(f"Failed to rebuild effective permissions for {scope} {entity_id}: {str(e)}")
+        raise self.retry(exc=e, countdown=10, max_retries=3)
+    logger.info(f"Rebuilt {written} effective permissions for {scope} {entity_id} ({len(project_ids)} projects)")
+    return {"projects": len(project_ids), "written": written}
@@ -1,3 +1,284 @@
-from django.test import TestCase
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.test import APIClient
+
+from app.accounts.models import User
+from app.governance.models import EffectiveProjectPermission
+from app.governance.services.effective_permissions import (
+    effective_project_role, has_project_capability, project_capabilities, projects_with_capability,
+)
+from app.governance.services.rules_engine import ActionDecisionTable, GovernanceResolver
+from app.governance.tasks import rebuild_effective_permissions_task
+from app.organizations.api.v1.api import OrganizationAPI
+from app.organizations.models import Organization, OrganizationMembership
+from app.projects.api.v1.api import ProjectAPI
+from app.projects.models import Project, ProjectMembership
+from app.tasks.api.v1.api import TaskAPI
+from app.tasks.models import Task
+from app.teams.api.v1.api import TeamAPI
+from app.teams.models import Team, TeamMembership
+from core.constants.org_constant import ORG_ACTION_POLICIES, ORG_ROLE_HIERARCHY
+from core.constants.project_constant import PROJECT_CAPABILITIES
+
+
+def org_table(rules=None, **overrides):
+    """An organization's action table compiled from a settings row with model defaults."""
+    row = {
+        "allow_member_invites": False,
+        "allow_member_updates": False,
+        "allow_member_removal": False,
+        "allow_team_creation": False,
+        "allow_project_creation": False,
+        **{f"{action_name}_min_role": "ADMIN" for action_name in ORG_ACTION_POLICIES},
+        **overrides,
+    }
+    return ActionDecisionTable(GovernanceResolver.compile_action_table(
+        SimpleNamespace(**row), ORG_ACTION_POLICIES, ORG_ROLE_HIERARCHY, rules,
+    ))
+
+
+class ActionDecisionTableTests(SimpleTestCase):
+
+    def test_owner_bypasses_disabled_switch(self):
+        table = org_table()
+        self.assertTrue(table.can("OWNER", "invite_member"))
+        self.assertFalse(table.can("ADMIN", "invite_member"))
+        with self.assertRaisesMessage(ValidationError, "You are not allowed to invite members."):
+            table.check("ADMIN", "invite_member")
+
+    def test_effective_rules_override_the_row_switch(self):
+        table = org_table(rules={"allow_member_invites": True})
+        self.assertTrue(table.can("ADMIN", "invite_member"))
+        self.assertFalse(table.can("MANAGER", "invite_member"))
+
+    def test_min_role_clamped_to_system_bounds(self):
+        # invite_member allows MANAGER..ADMIN, remove_member only ADMIN
+        table = org_table(allow_member_invites=True, allow_member_removal=True,
+                          invite_member_min_role="VIEWER", remove_member_min_role="OWNER")
+        self.assertTrue(table.can("MANAGER", "invite_member"))
+        self.assertFalse(table.can("MEMBER", "invite_member"))
+        self.assertTrue(table.can("ADMIN", "remove_member"))
+        with self.assertRaisesMessage(ValidationError, "You must have at least MANAGER role to perform this action."):
+            table.check("MEMBER", "invite_member")
+
+    def test_check_raises_the_requested_error(self):
+        with self.assertRaises(PermissionDenied):
+            org_table().check("ADMIN", "invite_member", error=PermissionDenied)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            org_table().can("OWNER", "archive_everything")
+
+
+@override_settings(GOVERNANCE_CACHE_ENABLED=False)
+class ViewSetRoleCheckTests(TestCase):
+    """check_role_permissions of each ViewSet against its compiled action table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="owner@example.com", password="Passw0rd!")
+        cls.member = User.objects.create_user(email="member@example.com", password="Passw0rd!")
+        cls.org = Organization.objects.create(name="Acme", owner=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=cls.org, role="OWNER")
+        OrganizationMembership.objects.create(user=cls.member, organization=cls.org, role="MEMBER")
+        cls.team = Team.objects.create(name="Core", organization=cls.org, created_by=cls.owner)
+        TeamMembership.objects.create(user=cls.owner, team=cls.team, role="OWNER")
+        TeamMembership.objects.create(user=cls.member, team=cls.team, role="MEMBER")
+        cls.project = Project.objects.create(name="Apollo", organization=cls.org, team=cls.team, created_by=cls.owner)
+        ProjectMembership.objects.create(user=cls.owner, project=cls.project, role="OWNER")
+        ProjectMembership.objects.create(user=cls.member, project=cls.project, role="CONTRIBUTOR")
+
+    def check(self, viewset_class, action, user, *entities):
+        view = viewset_class()
+        view.action = action
+        return view.check_role_permissions(SimpleNamespace(user=user), *entities)
+
+    def test_organization(self):
+        self.assertTrue(self.check(OrganizationAPI, "send_invite", self.owner, self.org))
+        with self.assertRaisesMessage(ValidationError, "You are not allowed to invite members."):
+            self.check(OrganizationAPI, "send_invite", self.member, self.org)
+        self.assertIsNone(self.check(OrganizationAPI, "retrieve", self.member, self.org))
+
+    def test_team(self):
+        self.assertTrue(self.check(TeamAPI, "remove_member", self.owner, self.team))
+        with self.assertRaisesMessage(ValidationError, "You are not allowed to remove members."):
+            self.check(TeamAPI, "remove_member", self.member, self.team)
+
+    def test_project(self):
+        self.assertTrue(self.check(ProjectAPI, "update_member", self.owner, self.project))
+        with self.assertRaisesMessage(ValidationError, "You are not allowed to update members."):
+            self.check(ProjectAPI, "update_member", self.member, self.project)
+
+    def test_project_min_role(self):
+        self.project.settings.allow_member_invites = True
+        self.project.settings.save()
+        with self.assertRaisesMessage(ValidationError, "You must have at least MANAGER role to perform this action."):
+            self.check(ProjectAPI, "send_invite", self.member, self.project)
+
+    def test_task(self):
+        self.assertTrue(self.check(TaskAPI, "create", self.owner, self.project))
+        # Task creation is enabled by default, but only from MANAGER up
+        with self.assertRaisesMessage(PermissionDenied, "You must have at least MANAGER role to perform this action."):
+            self.check(TaskAPI, "create", self.member, self.project)
+
+        self.project.settings.allow_task_deletions = False
+        self.project.settings.save()
+        with self.assertRaisesMessage(PermissionDenied, "You are not allowed to delete tasks."):
+            self.check(TaskAPI, "destroy", self.member, self.project)
+
+    def test_task_creator_bypasses_the_table(self):
+        task = Task.objects.create(project=self.project, title="Ship it", created_by=self.member)
+        self.assertTrue(self.check(TaskAPI, "update", self.member, self.project, task))
+
+
+def capability_bits(*names):
+    bits = 0
+    for name in names:
+        bits |= PROJECT_CAPABILITIES[name]
+    return bits
+
+
+ALL_CAPABILITIES = capability_bits(*PROJECT_CAPABILITIES)
+
+
+class EffectiveProjectRoleTests(SimpleTestCase):
+    org_project = SimpleNamespace(organization_id=1, team_id=2)
+    team_project = SimpleNamespace(organization_id=None, team_id=2)
+
+    def test_project_role_wins_when_higher(self):
+        self.assertEqual(effective_project_role(self.org_project, "MANAGER", None, "MEMBER"), "MANAGER")
+
+    def test_org_owner_acts_as_project_owner(self):
+        self.assertEqual(effective_project_role(self.org_project, "CONTRIBUTOR", None, "OWNER"), "OWNER")
+
+    def test_org_member_can_view(self):
+        self.assertEqual(effective_project_role(self.org_project, None, None, "MEMBER"), "VIEWER")
+
+    def test_team_membership_only_counts_outside_an_organization(self):
+        self.assertIsNone(effective_project_role(self.org_project, None, "MEMBER", None))
+        self.assertEqual(effective_project_role(self.team_project, None, "MEMBER", None), "VIEWER")
+
+    def test_no_membership(self):
+        self.assertIsNone(effective_project_role(self.team_project, None, None, None))
+
+
+@override_settings(EFFECTIVE_PERMISSIONS_ENABLED=True, GOVERNANCE_CACHE_ENABLED=False)
+class EffectiveProjectPermissionTests(TestCase):
+    """Rows maintained by the governance signals, with Celery rebuilds run inline."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="owner@example.com", password="Passw0rd!")
+        cls.manager = User.objects.create_user(email="manager@example.com", password="Passw0rd!")
+        cls.member = User.objects.create_user(email="member@example.com", password="Passw0rd!")
+        cls.outsider = User.objects.create_user(email="outsider@example.com", password="Passw0rd!")
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            rebuild_effective_permissions_task, "delay", side_effect=rebuild_effective_permissions_task,
+        )
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.org = Organization.objects.create(name="Acme", owner=self.owner)
+            OrganizationMembership.objects.create(user=self.owner, organization=self.org, role="OWNER")
+            OrganizationMembership.objects.create(user=self.member, organization=self.org, role="MEMBER")
+        # A separate commit, so the project's rows do not come from the membership refreshes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(name="Apollo", organization=self.org, created_by=self.manager)
+            ProjectMembership.objects.create(user=self.manager, project=self.project, role="MANAGER")
+
+    def rows(self, project=None):
+        return dict(
+            EffectiveProjectPermission.objects.filter(project=project or self.project)
+            .values_list("user__email", "effective_role")
+        )
+
+    def test_new_project_covers_organization_members(self):
+        self.assertEqual(self.rows(), {
+            "owner@example.com": "OWNER",
+            "manager@example.com": "MANAGER",
+            "member@example.com": "VIEWER",
+        })
+
+    def test_capabilities_per_membership(self):
+        row = lambda user: EffectiveProjectPermission.objects.get(user=user, project=self.project).capabilities
+        # Member management is switched off by default, so only the owner holds it
+        self.assertEqual(row(self.owner), capability_bits(
+            "view_project", "invite_member", "update_member", "remove_member", "manage_project",
+        ))
+        self.assertEqual(row(self.manager), capability_bits("view_project", "create_task", "update_task", "delete_task"))
+        self.assertEqual(row(self.member), capability_bits("view_project"))
+
+        table = GovernanceResolver.get_project_action_table(self.project)
+        self.assertEqual(project_capabilities("OWNER", "OWNER", table), ALL_CAPABILITIES)
+        self.assertEqual(project_capabilities(None, None, table), 0)
+
+    def test_capability_queries(self):
+        self.assertTrue(has_project_capability(self.owner, self.project, "manage_project"))
+        self.assertFalse(has_project_capability(self.member, self.project, "create_task"))
+        self.assertFalse(has_project_capability(self.outsider, self.project, "view_project"))
+        self.assertEqual(list(projects_with_capability(self.manager, "delete_task")), [{"project_id": self.project.pk}])
+        self.assertFalse(projects_with_capability(self.member, "delete_task").exists())
+
+    def test_membership_save_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            membership = OrganizationMembership.objects.create(user=self.outsider, organization=self.org, role="MEMBER")
+        self.assertEqual(self.rows()["outsider@example.com"], "VIEWER")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectMembership.objects.create(user=self.outsider, project=self.project, role="CONTRIBUTOR")
+        self.assertEqual(self.rows()["outsider@example.com"], "CONTRIBUTOR")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectMembership.objects.filter(user=self.outsider).delete()
+            membership.delete()
+        self.assertNotIn("outsider@example.com", self.rows())
+
+    def test_team_project_covers_team_members(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            team = Team.objects.create(name="Core", created_by=self.owner)
+            TeamMembership.objects.create(user=self.member, team=team, role="MEMBER")
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(name="Gemini", team=team, created_by=self.owner)
+        self.assertEqual(self.rows(project), {"member@example.com": "VIEWER"})
+
+    def test_soft_delete_drops_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.is_deleted = True
+            self.project.save(update_fields=["is_deleted"])
+        self.assertEqual(self.rows(), {})
+        self.assertFalse(has_project_capability(self.owner, self.project, "view_project"))
+
+    def test_rename_does_not_rebuild(self):
+        self.delay.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.name = "Artemis"
+            self.project.save()
+        self.delay.assert_not_called()
+
+    def test_management_command_rebuilds(self):
+        EffectiveProjectPermission.objects.all().delete()
+        call_command("rebuild_effective_permissions", stdout=StringIO())
+        self.assertEqual(len(self.rows()), 3)
+
+        EffectiveProjectPermission.objects.all().delete()
+        call_command("rebuild_effective_permissions", org=str(self.org.pk), stdout=StringIO())
+        self.assertEqual(len(self.rows()), 3)
+
+    def test_capability_filter(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get("/api/v1/projects/get-user-projects/?capability=manage_project")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["name"] for row in response.data["results"]["data"]], ["Apollo"])
+
+        with override_settings(EFFECTIVE_PERMISSIONS_ENABLED=False):
+            response = client.get("/api/v1/projects/get-user-projects/?capability=manage_project")
+        self.assertEqual(response.status_code, 400)
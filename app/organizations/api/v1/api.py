@@ -5,11 +5,12 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import NotFound
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from app.organizations.models import Organization
+from app.governance.services.rules_engine import GovernanceResolver
 from app.organizations.filters import OrganizationFilter, OrganizationMembershipFilter
 from app.organizations.services.organization_invite_service import send_organization_invite
 from app.organizations.api.v1.serializers import (
@@ -24,8 +25,7 @@ from app.organizations.services.organization_service import (
 )
 
 from core.utils.base_utils import add_member, get_user
-from core.utils.org_utils import get_org, get_all_org_memberships
-from core.constants.org_constant import ORG_ROLE_HIERARCHY
+from core.utils.org_utils import get_org, get_all_org_memberships, with_org_counts
 from core.permissions.base import get_org_role
 from core.permissions.mixins import RoleCheckerMixin
 from core.permissions.organization import (
@@ -43,6 +43,12 @@ class OrganizationAPI(viewsets.ModelViewSet, RoleCheckerMixin):
     Organization API (v1)
     """
     queryset = Organization.objects.all()
+    # ViewSet action -> governance action policy checked by check_role_permissions
+    action_policies = {
+        "send_invite": "invite_member",
+        "update_member": "update_member",
+        "remove_member": "remove_member",
+    }
     pagination_class = StandardPagination()
     search_fields = ["name"]
 
@@ -63,34 +69,12 @@ class OrganizationAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         return [permission() for permission in permissions]
         
     def check_role_permissions(self, request, organization):
-        role = get_org_role(request.user, organization)
-        
-        min_role_required = None
-        
-        if role == "OWNER":
-            return True
-        elif self.action == "send_invite":
-            if organization.settings.allow_member_invites == False:
-                raise ValidationError("You are not allowed to invite members.")
-            
-            min_role_required = organization.settings.invite_member_min_role
-        elif self.action == "update_member":
-            if organization.settings.allow_member_updates == False:
-                raise ValidationError("You are not allowed to update members.")
-            
-            min_role_required = organization.settings.update_member_min_role
-        elif self.action == "remove_member":
-            if organization.settings.allow_member_removal == False:
-                raise ValidationError("You are not allowed to remove members.")
-            
-            min_role_required = organization.settings.remove_member_min_role
-        else:
+        action_name = self.action_policies.get(self.action)
+        if action_name is None:
             return
         
-        if not self.has_minimum_role(role, min_role_required, ORG_ROLE_HIERARCHY):
-            raise ValidationError(f"You must have at least {min_role_required} role to perform this action.")
-        
-        return True
+        role = get_org_role(request.user, organization)
+        return GovernanceResolver.get_org_action_table(organization).check(role, action_name)
     
     def get_serializer_class(self):
         if self.action == "create":
@@ -129,7 +113,7 @@ class OrganizationAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         
     def list(self, request):
         logger.info(f"Listing organizations for user: {request.user.email}")
-        orgs = self.apply_filters(request, Organization.objects.filter(memberships__user=request.user, is_deleted=False).distinct())
+        orgs = self.apply_filters(request, with_org_counts(Organization.objects.filter(memberships__user=request.user, is_deleted=False).distinct()))
         
         page = self.pagination_class.paginate_queryset(orgs, request)
         logger.debug(f"Found {len(page)} organizations for user: {request.user.email}")
@@ -14,13 +14,20 @@ class OrganizationSerializer(serializers.ModelSerializer):
         model = Organization
         fields = ["id", "name", "owner", "owner_email", "member_count", "team_count", "project_count"]
 
+    # Counts are annotated by with_org_counts on list endpoints
     def get_member_count(self, obj):
+        if hasattr(obj, "member_count"):
+            return obj.member_count
         return obj.members.count()
 
     def get_team_count(self, obj):
+        if hasattr(obj, "team_count"):
+            return obj.team_count
         return obj.teams.count()
 
     def get_project_count(self, obj):
+        if hasattr(obj, "project_count"):
+            return obj.project_count
         return obj.projects.count()
 
     def get_owner_email(self, obj):
@@ -1,3 +1,47 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from app.accounts.models import User
+from app.organizations.models import Organization, OrganizationMembership
+from app.projects.models import Project
+from app.teams.models import Team
+
+
+class OrganizationListQueryCountTests(TestCase):
+    """Listing a page of organizations costs the same number of queries however many rows it holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="owner@example.com", password="Passw0rd!")
+        cls.other = User.objects.create_user(email="member@example.com", password="Passw0rd!")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_organizations(self, count):
+        for _ in range(count):
+            org = Organization.objects.create(name=f"Org {Organization.objects.count()}", owner=self.user)
+            OrganizationMembership.objects.create(user=self.user, organization=org, role="OWNER")
+            OrganizationMembership.objects.create(user=self.other, organization=org, role="MEMBER")
+            Team.objects.create(name=f"{org.name} team", organization=org, created_by=self.user)
+            for n in range(3):
+                Project.objects.create(name=f"{org.name} project {n}", organization=org, created_by=self.user)
+
+    def get_organizations(self):
+        # Page count and page rows
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/organizations/get-org/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]["data"]
+
+    def test_user_organizations(self):
+        self.add_organizations(2)
+        self.assertEqual(len(self.get_organizations()), 2)
+
+        self.add_organizations(8)
+        rows = self.get_organizations()
+        self.assertEqual(len(rows), 10)
+        for row in rows:
+            self.assertEqual((row["member_count"], row["team_count"], row["project_count"]), (2, 1, 3))
+            self.assertEqual(row["owner_email"], "owner@example.com")
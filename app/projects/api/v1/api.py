@@ -10,6 +10,8 @@ from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from app.projects.models import Project
+from app.governance.services.effective_permissions import effective_permissions_enabled, projects_with_capability
+from app.governance.services.rules_engine import GovernanceResolver
 from app.projects.api.v1.serializers import (
     ProjectSerializer, ProjectCreateSerializer, ProjectMembershipSerializer, ProjectUpdateSerializer, 
     ProjectMemberUpdateSerializer, InviteMemberSerializer,
@@ -26,11 +28,11 @@ from app.projects.services.project_service import (
 from core.utils.base_utils import get_user, add_member
 from core.utils.org_utils import get_org, get_org_membership
 from core.utils.team_utils import get_team, get_team_membership
-from core.utils.project_utils import get_project, get_all_project_memberships, get_project_membership
-from core.constants.project_constant import PROJECT_ROLE_HIERARCHY
+from core.utils.project_utils import get_project, get_all_project_memberships, with_project_counts
+from core.constants.project_constant import PROJECT_CAPABILITIES
 from core.constants.org_constant import ORG_ROLE_HIERARCHY
 from core.constants.team_constant import TEAM_ROLE_HIERARCHY
-from core.permissions.base import get_project_role, get_org_role, get_team_role
+from core.permissions.base import get_project_role, get_project_roles, get_org_role, get_team_role
 from core.permissions.mixins import RoleCheckerMixin
 from core.permissions.project import IsProjectMember
 from core.permissions.organization import IsOrganizationPart
@@ -51,6 +53,12 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
     Project API (v1)
     """
     queryset = Project.objects.all()
+    # ViewSet action -> governance action policy checked by check_role_permissions
+    action_policies = {
+        "send_invite": "invite_member",
+        "update_member": "update_member",
+        "remove_member": "remove_member",
+    }
     pagination_class = StandardPagination()
     search_fields = ["name", "description"]
 
@@ -74,32 +82,12 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         return [permission() for permission in permissions]
     
     def check_role_permissions(self, request, project):
-        role = get_project_role(request.user, project)
-        
-        if role == "OWNER":
-            return True
-        elif self.action == "send_invite":
-            if project.settings.allow_member_invites == False:
-                raise ValidationError("You are not allowed to invite members.")
-            
-            min_role_required = project.settings.invite_member_min_role
-        elif self.action == "update_member":
-            if project.settings.allow_member_updates == False:
-                raise ValidationError("You are not allowed to update members.")
-            
-            min_role_required = project.settings.update_member_min_role
-        elif self.action == "remove_member":
-            if project.settings.allow_member_removal == False:
-                raise ValidationError("You are not allowed to remove members.")
-            
-            min_role_required = project.settings.remove_member_min_role
-        else:
+        action_name = self.action_policies.get(self.action)
+        if action_name is None:
             return
         
-        if not self.has_minimum_role(role, min_role_required, PROJECT_ROLE_HIERARCHY):
-            raise ValidationError(f"You must have at least {min_role_required} role to perform this action.")
-        
-        return True
+        role = get_project_role(request.user, project)
+        return GovernanceResolver.get_project_action_table(project).check(role, action_name)
     
     def check_user_permission(self, user, id):
         if self.action == "create" and id is not None:
@@ -133,22 +121,16 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
             
     
     def check_user_project_permission(self, user, project):
-        try:
-            if get_project_membership(project.id, user):
+        roles = get_project_roles(user, project)
+        if roles.project:
+            return True
+        if project.organization_id:
+            if roles.org:
                 return True
-        except ValidationError as e:
-            if project.organization_id:
-                id = project.organization_id
-                org = get_org_membership(id, user).organization
-                if org:
-                    return True
-            elif project.team_id:
-                id = project.team_id
-                team = get_team_membership(id, user).team
-                if team and project.team_id == team.id:
-                    return True
-            else:
-                raise e
+        elif project.team_id:
+            if roles.team:
+                return True
+        raise ValidationError("user is not a member of this project")
             
     def get_serializer_class(self):
         if self.action == "create":
@@ -189,7 +171,20 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         
     def list(self, request):
         logger.info(f"Listing projects for user: {request.user.email}")
-        projects = self.apply_filters(request, Project.objects.filter(members=request.user, is_deleted=False).distinct())
+        capability = request.query_params.get("capability")
+        if capability:
+            # e.g. ?capability=invite_member: projects the user can manage members of,
+            # read from the effective permission table in one indexed query
+            if not effective_permissions_enabled():
+                raise ValidationError("Filtering by capability is not enabled.")
+            if capability not in PROJECT_CAPABILITIES:
+                raise ValidationError(f"Unknown capability: {capability}")
+            projects = Project.objects.filter(
+                pk__in=projects_with_capability(request.user, capability), is_deleted=False,
+            )
+        else:
+            projects = Project.objects.filter(members=request.user, is_deleted=False).distinct()
+        projects = self.apply_filters(request, with_project_counts(projects))
 
         page = self.pagination_class.paginate_queryset(projects, request)
         logger.debug(f"Found {len(page)} projects for user: {request.user.email}")
@@ -279,7 +274,7 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
     def org_projects(self, request):
         org = get_org(request.query_params.get("org_id"))
         logger.info(f"Getting all projects for org: {org.name} by user: {request.user.email}")
-        projects = Project.objects.filter(organization=org, is_deleted=False)
+        projects = with_project_counts(Project.objects.filter(organization=org, is_deleted=False))
         self.check_object_permissions(request, org)
         
         page = self.pagination_class.paginate_queryset(projects, request)
@@ -293,7 +288,7 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
     def team_projects(self, request):
         team = get_team(request.query_params.get("team_id"))
         logger.info(f"Getting all projects for team: {team.name} by user: {request.user.email}")
-        projects = Project.objects.filter(team_id=team.id, is_deleted=False)
+        projects = with_project_counts(Project.objects.filter(team_id=team.id, is_deleted=False))
         self.check_object_permissions(request, team)
         
         page = self.pagination_class.paginate_queryset(projects, request)
@@ -346,11 +341,7 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         project = get_project(project_id)
         self.check_object_permissions(request, project)
         
-        is_org_owner = False
-        if project.organization_id:
-            org = get_org_membership(project.organization_id, request.user).organization
-            is_org_owner = get_org_role(request.user, org) == "OWNER"
-            
+        is_org_owner = get_project_roles(request.user, project).org == "OWNER"
         if not is_org_owner:
             self.check_role_permissions(request, project)
         
@@ -403,11 +394,7 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         project = get_project(project_id)
         self.check_object_permissions(request, project)
 
-        is_org_owner = False
-        if project.organization_id:
-            org = get_org_membership(project.organization_id, request.user).organization
-            is_org_owner = get_org_role(request.user, org) == "OWNER"
-            
+        is_org_owner = get_project_roles(request.user, project).org == "OWNER"
         if not is_org_owner:
             self.check_role_permissions(request, project)
 
@@ -448,11 +435,7 @@ class ProjectAPI(viewsets.ModelViewSet, RoleCheckerMixin):
         project = get_project(project_id)
         self.check_object_permissions(request, project)
 
-        is_org_owner = False
-        if project.organization_id:
-            org = get_org_membership(project.organization_id, request.user).organization
-            is_org_owner = get_org_role(request.user, org) == "OWNER"
-            
+        is_org_owner = get_project_roles(request.user, project).org == "OWNER"
         if not is_org_owner:
             self.check_role_permissions(request, project)
         
@@ -25,6 +25,9 @@ class ProjectSerializer(serializers.ModelSerializer):
         ]
         
     def get_member_count(self, obj):
+        # Annotated by with_project_counts on list endpoints
+        if hasattr(obj, "member_count"):
+            return obj.member_count
         return obj.members.count()
     
 
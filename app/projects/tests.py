@@ -1,3 +1,68 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from app.accounts.models import User
+from app.organizations.models import Organization, OrganizationMembership
+from app.projects.models import Project, ProjectMembership
+from app.teams.models import Team, TeamMembership
+
+
+class ProjectListQueryCountTests(TestCase):
+    """Listing a page of projects costs the same number of queries however many rows it holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="owner@example.com", password="Passw0rd!")
+        cls.other = User.objects.create_user(email="member@example.com", password="Passw0rd!")
+        cls.org = Organization.objects.create(name="Acme", owner=cls.user)
+        OrganizationMembership.objects.create(user=cls.user, organization=cls.org, role="OWNER")
+        cls.team = Team.objects.create(name="Core", organization=cls.org, created_by=cls.user)
+        TeamMembership.objects.create(user=cls.user, team=cls.team, role="OWNER")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_projects(self, count):
+        for _ in range(count):
+            project = Project.objects.create(
+                name=f"Project {Project.objects.count()}",
+                organization=self.org,
+                team=self.team,
+                created_by=self.user,
+            )
+            ProjectMembership.objects.create(user=self.user, project=project, role="OWNER")
+            ProjectMembership.objects.create(user=self.other, project=project, role="VIEWER")
+
+    def get_projects(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        rows = response.data["results"]["data"]
+        self.assertTrue(all(row["member_count"] == 2 for row in rows))
+        self.assertTrue(all(row["organization_name"] == "Acme" and row["team_name"] == "Core" for row in rows))
+        return rows
+
+    def test_user_projects(self):
+        # Page count and page rows
+        url = "/api/v1/projects/get-user-projects/"
+        self.add_projects(2)
+        self.assertEqual(len(self.get_projects(url, 2)), 2)
+        self.add_projects(8)
+        self.assertEqual(len(self.get_projects(url, 2)), 10)
+
+    def test_org_projects(self):
+        # Organization, membership check, page count and page rows
+        url = f"/api/v1/projects/get_org-projects/?org_id={self.org.id}"
+        self.add_projects(2)
+        self.assertEqual(len(self.get_projects(url, 4)), 2)
+        self.add_projects(8)
+        self.assertEqual(len(self.get_projects(url, 4)), 10)
+
+    def test_team_projects(self):
+        # Team, membership check, page count and page rows
+        url = f"/api/v1/projects/get-team-projects/?team_id={self.team.id}"
+        self.add_projects(2)
+        self.assertEqual(len(self.get_projects(url, 4)), 2)
+        self.add_projects(8)
+        self.assertEqual(len(self.get_projects(url, 4)), 10)
@@ -10,13 +10,13 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from app.tasks.models import Task
+from app.governance.services.rules_engine import GovernanceResolver
 from app.tasks.api.v1.serializers import (
     TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer
 )
 from app.tasks.services.task_service import delete_task
 from app.tasks.filters import TaskFilter
 
-from core.constants.project_constant import PROJECT_ROLE_HIERARCHY
 from core.pagination import StandardPagination
 from core.permissions.base import get_project_role
 from core.permissions.mixins import RoleCheckerMixin
@@ -32,6 +32,12 @@ class TaskAPI(viewsets.ViewSet, RoleCheckerMixin):
     Task API (v1)
     """
     queryset = Task.objects.all()
+    # ViewSet action -> governance action policy checked by check_role_permissions
+    action_policies = {
+        "create": "create_task",
+        "update": "update_task",
+        "destroy": "delete_task",
+    }
     pagination_class = StandardPagination()
     filterset_class = TaskFilter
     search_fields = ["title", "description"]
@@ -52,32 +58,12 @@ class TaskAPI(viewsets.ViewSet, RoleCheckerMixin):
             if request.user == task.created_by or request.user == task.assigned_to:
                 return True
             
-        role = get_project_role(request.user, project)
-        
-        if role == "OWNER":
-            return True
-        elif self.action == "create":
-            if project.settings.allow_task_creation == False:
-                raise PermissionDenied("You are not allowed to create tasks.")
-            
-            minimum_role = project.settings.create_task_min_role
-        elif self.action == "update":
-            if project.settings.allow_task_updates == False:
-                raise PermissionDenied("You are not allowed to update tasks.")
-            
-            minimum_role = project.settings.update_task_min_role
-        elif self.action == "destroy":
-            if project.settings.allow_task_deletions == False:
-                raise PermissionDenied("You are not allowed to delete tasks.")
-            
-            minimum_role = project.settings.delete_task_min_role
-        else:
+        action_name = self.action_policies.get(self.action)
+        if action_name is None:
             return
-            
-        if not self.has_minimum_role(role, minimum_role, PROJECT_ROLE_HIERARCHY):
-            raise PermissionDenied(f"You must have at least {minimum_role} role to perform this action.")
-        else:
-            return True
+        
+        role = get_project_role(request.user, project)
+        return GovernanceResolver.get_project_action_table(project).check(role, action_name, error=PermissionDenied)
     
     def get_serializer_class(self):
         if self.action == "create":
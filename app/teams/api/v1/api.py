@@ -11,6 +11,7 @@ from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from app.teams.models import Team
+from app.governance.services.rules_engine import GovernanceResolver
 from app.teams.api.v1.serializers import (
     TeamSerializer, TeamCreateSerializer, TeamMembershipSerializer, TeamUpdateSerializer, 
     TeamMemberUpdateSerializer, InviteMemberSerializer,
@@ -30,9 +31,8 @@ from services.invite_token_service import verify_invite_token
 
 from core.utils.base_utils import get_user, add_member
 from core.utils.org_utils import get_org, get_org_membership
-from core.utils.team_utils import get_team, get_all_team_memberships, get_team_membership
+from core.utils.team_utils import get_team, get_all_team_memberships, get_team_membership, with_team_counts
 from core.pagination import StandardPagination
-from core.constants.team_constant import TEAM_ROLE_HIERARCHY
 from core.constants.org_constant import ORG_ROLE_HIERARCHY
 from core.permissions.base import get_team_role, get_org_role
 from core.permissions.mixins import RoleCheckerMixin
@@ -48,6 +48,12 @@ class TeamAPI(viewsets.ViewSet, RoleCheckerMixin):
     Team API (v1)
     """
     queryset = Team.objects.all()
+    # ViewSet action -> governance action policy checked by check_role_permissions
+    action_policies = {
+        "send_invite": "invite_member",
+        "update_member": "update_member",
+        "remove_member": "remove_member",
+    }
     pagination_class = StandardPagination()
     search_fields = ["name", "description"]
     
@@ -68,32 +74,12 @@ class TeamAPI(viewsets.ViewSet, RoleCheckerMixin):
         return [permission() for permission in permissions]
     
     def check_role_permissions(self, request, team):
-        role = get_team_role(request.user, team)
-        
-        if role == "OWNER":
-            return True
-        elif self.action == "send_invite":
-            if team.settings.allow_member_invites == False:
-                raise ValidationError("You are not allowed to invite members.")
-            
-            min_role_required = team.settings.invite_member_min_role
-        elif self.action == "update_member":
-            if team.settings.allow_member_updates == False:
-                raise ValidationError("You are not allowed to update members.")
-            
-            min_role_required = team.settings.update_member_min_role
-        elif self.action == "remove_member":
-            if team.settings.allow_member_removal == False:
-                raise ValidationError("You are not allowed to remove members.")
-            
-            min_role_required = team.settings.remove_member_min_role
-        else:
+        action_name = self.action_policies.get(self.action)
+        if action_name is None:
             return
         
-        if not self.has_minimum_role(role, min_role_required, TEAM_ROLE_HIERARCHY):
-            raise ValidationError(f"You must have at least {min_role_required} role to perform this action.")
-        
-        return True
+        role = get_team_role(request.user, team)
+        return GovernanceResolver.get_team_action_table(team).check(role, action_name)
     
     def check_user_permission(self, org_id, user):
         if self.action == "create" and org_id is not None:
@@ -167,7 +153,7 @@ class TeamAPI(viewsets.ViewSet, RoleCheckerMixin):
 
     def list(self, request):
         logger.info(f"Listing teams for user: {request.user.email}")
-        teams = self.apply_filters(request, Team.objects.filter(memberships__user=request.user, is_deleted=False))
+        teams = self.apply_filters(request, with_team_counts(Team.objects.filter(memberships__user=request.user, is_deleted=False)))
         
         page = self.pagination_class.paginate_queryset(teams, request)
         logger.debug(f"Found {len(page)} teams for user: {request.user.email}")
@@ -258,7 +244,7 @@ class TeamAPI(viewsets.ViewSet, RoleCheckerMixin):
     def org_teams(self, request):
         org = get_org(request.query_params.get("org_id"))
         logger.info(f"Gettings all teams for that org: {org.name}")
-        teams = Team.objects.filter(organization=org, is_deleted=False)
+        teams = with_team_counts(Team.objects.filter(organization=org, is_deleted=False))
         self.check_object_permissions(request, org)
         
         page = self.pagination_class.paginate_queryset(teams, request)
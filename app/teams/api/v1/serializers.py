@@ -20,10 +20,15 @@ class TeamSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "organization", "organization_name", "created_by", 
                   "created_by_email", "member_count", "project_count", "created_at"]
     
+    # Counts are annotated by with_team_counts on list endpoints
     def get_member_count(self, obj):
+        if hasattr(obj, "member_count"):
+            return obj.member_count
         return obj.members.count()
     
     def get_project_count(self, obj):
+        if hasattr(obj, "project_count"):
+            return obj.project_count
         return obj.projects.count()
     
         
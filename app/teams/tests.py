@@ -1,3 +1,54 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from app.accounts.models import User
+from app.organizations.models import Organization, OrganizationMembership
+from app.projects.models import Project
+from app.teams.models import Team, TeamMembership
+
+
+class TeamListQueryCountTests(TestCase):
+    """Listing a page of teams costs the same number of queries however many rows it holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="owner@example.com", password="Passw0rd!")
+        cls.other = User.objects.create_user(email="member@example.com", password="Passw0rd!")
+        cls.org = Organization.objects.create(name="Acme", owner=cls.user)
+        OrganizationMembership.objects.create(user=cls.user, organization=cls.org, role="OWNER")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_teams(self, count):
+        for _ in range(count):
+            team = Team.objects.create(name=f"Team {Team.objects.count()}", organization=self.org, created_by=self.user)
+            TeamMembership.objects.create(user=self.user, team=team, role="OWNER")
+            TeamMembership.objects.create(user=self.other, team=team, role="MEMBER")
+            for n in range(3):
+                Project.objects.create(name=f"{team.name} project {n}", organization=self.org, team=team, created_by=self.user)
+
+    def get_teams(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        rows = response.data["results"]["data"]
+        self.assertTrue(all(row["member_count"] == 2 and row["project_count"] == 3 for row in rows))
+        return rows
+
+    def test_user_teams(self):
+        # Page count and page rows
+        url = "/api/v1/teams/get-user-teams/"
+        self.add_teams(2)
+        self.assertEqual(len(self.get_teams(url, 2)), 2)
+        self.add_teams(8)
+        self.assertEqual(len(self.get_teams(url, 2)), 10)
+
+    def test_org_teams(self):
+        # Organization, membership check, page count and page rows
+        url = f"/api/v1/teams/get-org-teams/?org_id={self.org.id}"
+        self.add_teams(2)
+        self.assertEqual(len(self.get_teams(url, 4)), 2)
+        self.add_teams(8)
+        self.assertEqual(len(self.get_teams(url, 4)), 10)
@@ -24,6 +24,23 @@ app.conf.result_backend = settings.CELERY_RESULT_BACKEND
 app.conf.task_track_started = True
 app.conf.task_time_limit = 30 * 60  # 30 minutes per task default
 
+# Periodic tasks (run with `celery -A config beat`)
+app.conf.beat_schedule = {
+    "ensure-activity-log-partitions": {
+        "task": "core.tasks.ensure_activity_log_partitions",
+        "schedule": 6 * 60 * 60,  # every 6 hours
+    },
+    "rollup-activity-logs": {
+        "task": "core.tasks.rollup_activity_logs_task",
+        "schedule": 60,  # every minute
+    },
+}
+if settings.ACTIVITY_LOG_SINK == "redis":
+    app.conf.beat_schedule["consume-activity-stream"] = {
+        "task": "core.tasks.consume_activity_stream",
+        "schedule": settings.ACTIVITY_LOG_STREAM_POLL_INTERVAL,
+    }
+
 logger.info("Celery configuration completed, autodiscovering tasks")
 app.autodiscover_tasks()
 logger.info("Celery application ready")
@@ -1,11 +1,12 @@
 import os
-import redis
 import logging
 
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import timedelta
 
+from services.redis_client import LazyRedisClient
+
 logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
@@ -59,8 +60,45 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.ActivityTrackingMiddleware',
+    'core.middleware.RoleCacheMiddleware',
 ]
 
+# Activity tracking
+# ACTIVITY_LOG_SINK: "buffered" (background bulk inserts), "redis" (Redis stream consumed
+# by Celery) or "sync" (one INSERT per request)
+ACTIVITY_LOG_SINK = os.getenv("ACTIVITY_LOG_SINK", "buffered")
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", 200))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL", 1.0))  # seconds
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", 10000))
+# ACTIVITY_LOG_OVERFLOW_POLICY: "block", "drop_newest" or "drop_oldest"
+ACTIVITY_LOG_OVERFLOW_POLICY = os.getenv("ACTIVITY_LOG_OVERFLOW_POLICY", "drop_newest")
+ACTIVITY_LOG_BLOCK_TIMEOUT = float(os.getenv("ACTIVITY_LOG_BLOCK_TIMEOUT", 0.05))  # seconds
+ACTIVITY_LOG_STREAM = os.getenv("ACTIVITY_LOG_STREAM", "activity_logs")
+ACTIVITY_LOG_STREAM_GROUP = os.getenv("ACTIVITY_LOG_STREAM_GROUP", "activity_log_writers")
+ACTIVITY_LOG_STREAM_MAXLEN = int(os.getenv("ACTIVITY_LOG_STREAM_MAXLEN", 1000000))
+ACTIVITY_LOG_STREAM_CLAIM_IDLE_MS = int(os.getenv("ACTIVITY_LOG_STREAM_CLAIM_IDLE_MS", 60000))
+ACTIVITY_LOG_STREAM_POLL_INTERVAL = float(os.getenv("ACTIVITY_LOG_STREAM_POLL_INTERVAL", 5.0))  # seconds
+# Per-route tracking policies, first match wins. "route" (URL name) and "method" are
+# fnmatch patterns. Modes: "always", "sample" (with "rate" in (0, 1]), "errors"
+# (status >= 400), "slow" (with "threshold_ms") and "never". For example:
+#   {"route": "get_project_tasks", "method": "GET", "mode": "sample", "rate": 0.05}
+ACTIVITY_TRACKING_POLICIES = []
+ACTIVITY_TRACKING_DEFAULT_MODE = os.getenv("ACTIVITY_TRACKING_DEFAULT_MODE", "always")
+# Range partitioning of core_activitylog on timestamp (PostgreSQL): "month" or "day"
+ACTIVITY_LOG_PARTITION_INTERVAL = os.getenv("ACTIVITY_LOG_PARTITION_INTERVAL", "month")
+ACTIVITY_LOG_PARTITIONS_AHEAD = int(os.getenv("ACTIVITY_LOG_PARTITIONS_AHEAD", 3))
+# Activity rollups (minute/hour/day counters fed by core.tasks.rollup_activity_logs_task)
+ACTIVITY_ROLLUP_LAG_SECONDS = int(os.getenv("ACTIVITY_ROLLUP_LAG_SECONDS", 120))
+ACTIVITY_ROLLUP_WINDOW_SECONDS = int(os.getenv("ACTIVITY_ROLLUP_WINDOW_SECONDS", 3600))
+ACTIVITY_ROLLUP_MINUTE_RETENTION_DAYS = int(os.getenv("ACTIVITY_ROLLUP_MINUTE_RETENTION_DAYS", 7))
+# Per-route latency histograms scraped from /api/v1/metrics/ (Prometheus text format)
+# Bearer token required by the scrape endpoint; it answers 403 while unset
+METRICS_SCRAPE_TOKEN = os.getenv("METRICS_SCRAPE_TOKEN")
+METRICS_MAX_SERIES = int(os.getenv("METRICS_MAX_SERIES", 1000))
+# Share snapshots through Redis so any worker can answer a scrape for all of them
+METRICS_SHARE_VIA_REDIS = os.getenv("METRICS_SHARE_VIA_REDIS", "False").lower() in ("true", "1", "yes")
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", 10.0))  # seconds
+
 # Create logs directory if it doesn't exist
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 os.makedirs(LOGS_DIR, exist_ok=True)
@@ -147,16 +185,16 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 
-# Initialize Redis client as a Django setting so services can access it via settings.redis_client
-logger.info(f"Initializing Redis client: host={REDIS_HOST}, port={REDIS_PORT}, db={REDIS_DB}")
-REDIS_CLIENT = redis.StrictRedis(
-    host=REDIS_HOST,
-    port=REDIS_PORT,
-    db=REDIS_DB,
-    password=REDIS_PASSWORD,
-    decode_responses=True
-)
-logger.info("Redis client initialized successfully")
+# Connection pool per process (services.redis_client), created on first use
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5.0))  # wait for a free connection
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 5.0))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 2.0))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))  # seconds idle before a PING
+REDIS_RETRY_ATTEMPTS = int(os.getenv("REDIS_RETRY_ATTEMPTS", 3))
+
+# Services access Redis via settings.REDIS_CLIENT; it connects lazily and is fork-safe
+REDIS_CLIENT = LazyRedisClient()
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -216,7 +254,59 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ),
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
+    # Token-bucket limits for core.throttling, keyed "<view throttle_scope>_<ip|identifier|user>".
+    # "5/min" allows a burst of 5 and refills one every 12s. Empty value disables a limit.
+    'DEFAULT_THROTTLE_RATES': {
+        'register_ip': os.getenv('THROTTLE_REGISTER_IP', '10/hour') or None,
+        'login_ip': os.getenv('THROTTLE_LOGIN_IP', '20/min') or None,
+        'login_identifier': os.getenv('THROTTLE_LOGIN_IDENTIFIER', '5/min') or None,
+        'otp_send_ip': os.getenv('THROTTLE_OTP_SEND_IP', '10/min') or None,
+        'otp_send_identifier': os.getenv('THROTTLE_OTP_SEND_IDENTIFIER', '3/min') or None,
+        'otp_verify_ip': os.getenv('THROTTLE_OTP_VERIFY_IP', '20/min') or None,
+        'otp_verify_identifier': os.getenv('THROTTLE_OTP_VERIFY_IDENTIFIER', '10/min') or None,
+        'password_reset_ip': os.getenv('THROTTLE_PASSWORD_RESET_IP', '10/min') or None,
+        'token_refresh_ip': os.getenv('THROTTLE_TOKEN_REFRESH_IP', '60/min') or None,
+        'sessions_user': os.getenv('THROTTLE_SESSIONS_USER', '30/min') or None,
+    },
+    # Reverse proxies in front of the app. IP throttles take the client address this many
+    # hops from the right of X-Forwarded-For; 0 uses REMOTE_ADDR and ignores the header.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+
+# Per-process cache of access tokens recently confirmed valid in Redis. Logout and
+# token deletion are broadcast on TOKEN_INVALIDATION_CHANNEL; an entry is never
+# trusted for longer than ACCESS_TOKEN_CACHE_TTL seconds.
+ACCESS_TOKEN_CACHE_ENABLED = os.getenv('ACCESS_TOKEN_CACHE_ENABLED', 'True').lower() == 'true'
+ACCESS_TOKEN_CACHE_TTL = float(os.getenv('ACCESS_TOKEN_CACHE_TTL', 5.0))  # seconds
+ACCESS_TOKEN_CACHE_SIZE = int(os.getenv('ACCESS_TOKEN_CACHE_SIZE', 10000))
+TOKEN_INVALIDATION_CHANNEL = os.getenv('TOKEN_INVALIDATION_CHANNEL', 'token_invalidations')
+
+# Session keys are access:/refresh:<fingerprint>. Keep accepting the old full-JWT keys
+# until every token issued before the switch has expired (REFRESH_TOKEN_LIFETIME).
+TOKEN_STORE_ACCEPT_LEGACY_KEYS = os.getenv('TOKEN_STORE_ACCEPT_LEGACY_KEYS', 'True').lower() == 'true'
+
+# Authenticated users are loaded from a per-process LRU backed by Redis instead of the
+# database. Invalidated on User save/delete; other workers may serve a changed user
+# for up to USER_CACHE_LOCAL_TTL seconds.
+USER_CACHE_ENABLED = os.getenv('USER_CACHE_ENABLED', 'True').lower() == 'true'
+USER_CACHE_LOCAL_TTL = float(os.getenv('USER_CACHE_LOCAL_TTL', 5.0))  # seconds
+USER_CACHE_REDIS_TTL = int(os.getenv('USER_CACHE_REDIS_TTL', 3600))  # seconds
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 5000))
+
+# Effective governance rules (project → team → org) are cached per project/team, per process
+# and in Redis. Settings saves bump a version that invalidates every descendant; other
+# workers may apply the old rules for up to GOVERNANCE_CACHE_LOCAL_TTL seconds.
+GOVERNANCE_CACHE_ENABLED = os.getenv('GOVERNANCE_CACHE_ENABLED', 'True').lower() == 'true'
+GOVERNANCE_CACHE_LOCAL_TTL = float(os.getenv('GOVERNANCE_CACHE_LOCAL_TTL', 5.0))  # seconds
+GOVERNANCE_CACHE_REDIS_TTL = int(os.getenv('GOVERNANCE_CACHE_REDIS_TTL', 3600))  # seconds
+GOVERNANCE_CACHE_SIZE = int(os.getenv('GOVERNANCE_CACHE_SIZE', 10000))
+
+# Maintain the EffectiveProjectPermission table (user, project, role, capabilities). Membership
+# changes refresh it on commit; settings changes and project moves rebuild it in Celery.
+# Off by default: the table starts empty, so run `manage.py rebuild_effective_permissions`
+# right after enabling. The `capability` project filter is rejected while it is off.
+EFFECTIVE_PERMISSIONS_ENABLED = os.getenv('EFFECTIVE_PERMISSIONS_ENABLED', 'False').lower() == 'true'
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
@@ -1,18 +1,35 @@
 import logging
+import secrets
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import ValidationError
+from django.db.models import Count, Max, Q, Sum
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from core.models import ActivityLog
-from core.api.serializers import ActivityLogSerializer, ActivityLogListSerializer
+from app.governance.services.rules_cache import get_rules_cache
+from core.models import ActivityLog, ActivityRollup
+from core.api.serializers import (
+    ActivityLogSerializer, ActivityLogListSerializer, ActivityRollupQuerySerializer,
+    ActivityLogExportQuerySerializer,
+)
 from core.filters import ActivityLogFilter
-from core.pagination import StandardPagination
+from core.middleware.latency_metrics import get_latency_registry, render_prometheus, render_prometheus_scalars
+from core.pagination import KeysetPagination, StandardPagination
 from core.utils.base_utils import add_member
+from core.utils.export_utils import EXPORT_CONTENT_TYPES, export_filename, iter_export
+from core.utils.rollup_utils import COUNTER_FIELDS, LATENCY_BUCKET_FIELDS, estimate_percentile
 
 from services.invite_token_service import verify_invite_token
+from services.redis_client import pool_stats
+from services.token_cache import get_access_token_cache
+from services.user_cache import get_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +75,20 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
     
+    @property
+    def paginator(self):
+        """
+        Page numbers by default; keyset pagination on (timestamp, id) with
+        ?pagination=cursor or when following a cursor link.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request else {}
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
     def get_serializer_class(self):
         """Use lightweight serializer for list view"""
         if self.action == 'list':
@@ -105,38 +136,53 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get activity statistics"""
+        """
+        Get activity statistics.
+        Accepts the same filters as the list view (e.g. timestamp_after,
+        timestamp_before) to scope the counts to a time window.
+        """
         logger.info(f"Fetching activity stats for user: {request.user.email}")
         
-        queryset = self.get_queryset()
+        filterset = ActivityLogFilter(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        queryset = filterset.qs.order_by()
         
-        stats = {
-            'total_activities': queryset.count(),
-            'by_action': {},
-            'by_resource': {},
-            'by_status': {},
+        # One pass for totals, per-action and per-status-range counts
+        action_counts = {
+            f'action_{code}': Count('id', filter=Q(action=code))
+            for code, _ in ActivityLog.ACTION_CHOICES
         }
+        totals = queryset.aggregate(
+            total_activities=Count('id'),
+            success_2xx=Count('id', filter=Q(status_code__gte=200, status_code__lt=300)),
+            redirect_3xx=Count('id', filter=Q(status_code__gte=300, status_code__lt=400)),
+            client_error_4xx=Count('id', filter=Q(status_code__gte=400, status_code__lt=500)),
+            server_error_5xx=Count('id', filter=Q(status_code__gte=500)),
+            **action_counts,
+        )
+        
+        # One grouped pass for per-resource counts
+        by_resource = (
+            queryset.exclude(resource_type='')
+            .values('resource_type')
+            .annotate(count=Count('id'))
+        )
         
-        # Count by action
-        for action_choice in ActivityLog.ACTION_CHOICES:
-            action_code = action_choice[0]
-            count = queryset.filter(action=action_code).count()
-            if count > 0:
-                stats['by_action'][action_code] = count
-        
-        # Count by resource type
-        resource_types = queryset.values_list('resource_type', flat=True).distinct()
-        for resource_type in resource_types:
-            if resource_type:
-                count = queryset.filter(resource_type=resource_type).count()
-                stats['by_resource'][resource_type] = count
-        
-        # Count by status code range
-        stats['by_status'] = {
-            'success_2xx': queryset.filter(status_code__gte=200, status_code__lt=300).count(),
-            'redirect_3xx': queryset.filter(status_code__gte=300, status_code__lt=400).count(),
-            'client_error_4xx': queryset.filter(status_code__gte=400, status_code__lt=500).count(),
-            'server_error_5xx': queryset.filter(status_code__gte=500).count(),
+        stats = {
+            'total_activities': totals['total_activities'],
+            'by_action': {
+                code: totals[f'action_{code}']
+                for code, _ in ActivityLog.ACTION_CHOICES
+                if totals[f'action_{code}'] > 0
+            },
+            'by_resource': {row['resource_type']: row['count'] for row in by_resource},
+            'by_status': {
+                'success_2xx': totals['success_2xx'],
+                'redirect_3xx': totals['redirect_3xx'],
+                'client_error_4xx': totals['client_error_4xx'],
+                'server_error_5xx': totals['server_error_5xx'],
+            },
         }
         
         logger.debug(f"Activity stats calculated: {stats['total_activities']} total")
@@ -145,3 +191,146 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
             'message': 'Success',
             'data': stats
         })
+    
+    @action(detail=False, methods=['get'])
+    def rollups(self, request):
+        """
+        Chart data from the pre-aggregated rollups (admin only).
+        Query params: granularity (minute/hour/day), start, end, group_by
+        (comma-separated dimensions) and optional dimension filters.
+        """
+        logger.info(f"Fetching activity rollups for user: {request.user.email}")
+        
+        serializer = ActivityRollupQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        group_by = params['group_by']
+        
+        queryset = ActivityRollup.objects.filter(
+            granularity=params['granularity'],
+            bucket__gte=params['start'],
+            bucket__lt=params['end'],
+        )
+        for dimension in ('resource_type', 'action', 'method', 'status_class'):
+            if dimension in params:
+                queryset = queryset.filter(**{dimension: params[dimension]})
+        
+        rows = (
+            queryset.order_by()
+            .values('bucket', *group_by)
+            .annotate(
+                latency_max_ms=Max('latency_max_ms'),
+                **{field: Sum(field) for field in COUNTER_FIELDS},
+            )
+            .order_by('bucket', *group_by)
+        )
+        
+        series = []
+        for row in rows:
+            histogram = [row[field] for field in LATENCY_BUCKET_FIELDS]
+            point = {'bucket': row['bucket']}
+            point.update({dimension: row[dimension] for dimension in group_by})
+            point.update({
+                'count': row['count'],
+                'error_count': row['error_count'],
+                'avg_latency_ms': round(row['latency_sum_ms'] / row['latency_count'], 2) if row['latency_count'] else None,
+                'max_latency_ms': row['latency_max_ms'],
+                'p50_latency_ms': estimate_percentile(histogram, 50),
+                'p95_latency_ms': estimate_percentile(histogram, 95),
+                'p99_latency_ms': estimate_percentile(histogram, 99),
+            })
+            series.append(point)
+        
+        logger.debug(f"Returning {len(series)} rollup points")
+        
+        return Response({
+            'message': 'Success',
+            'data': {
+                'granularity': params['granularity'],
+                'start': params['start'],
+                'end': params['end'],
+                'group_by': group_by,
+                'series': series,
+            }
+        })
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every matching activity log as NDJSON or CSV (admin only).
+        Query params: export_format (ndjson/csv), gzip, plus the list filters.
+        Rows are read through a server-side cursor, so memory stays flat.
+        """
+        logger.info(f"Exporting activity logs for user: {request.user.email}")
+        
+        serializer = ActivityLogExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        export_format = serializer.validated_data['export_format']
+        compress = serializer.validated_data['gzip']
+        
+        filterset = ActivityLogFilter(request.query_params, queryset=ActivityLog.objects.all(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        
+        filename = export_filename(f"activity_logs_{timezone.now():%Y%m%d_%H%M%S}", export_format, compress)
+        response = StreamingHttpResponse(
+            iter_export(filterset.qs, export_format=export_format, compress=compress),
+            content_type='application/gzip' if compress else EXPORT_CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@require_GET
+def latency_metrics(request):
+    """
+    Prometheus scrape endpoint for the per-route latency histograms.
+    Requests must send METRICS_SCRAPE_TOKEN as a bearer token; the endpoint
+    is disabled until a token is configured.
+    """
+    token = getattr(settings, 'METRICS_SCRAPE_TOKEN', '')
+    if not token:
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    supplied = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ').strip()
+    if not secrets.compare_digest(supplied.encode(), token.encode()):
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    
+    body = render_prometheus(get_latency_registry().collect())
+    
+    # Per-process counters of the access token validation cache
+    token_cache = get_access_token_cache()
+    if token_cache is not None:
+        stats = token_cache.stats()
+        body += render_prometheus_scalars([
+            ('structra_token_cache_hits_total', 'counter', 'Access tokens validated from the local cache.', stats['hits']),
+            ('structra_token_cache_misses_total', 'counter', 'Access tokens validated against Redis.', stats['misses']),
+            ('structra_token_cache_invalidations_total', 'counter', 'Token invalidations received.', stats['invalidations']),
+            ('structra_token_cache_size', 'gauge', 'Tokens currently cached.', stats['size']),
+        ])
+    redis_pool = pool_stats()
+    if redis_pool is not None:
+        body += render_prometheus_scalars([
+            ('structra_redis_pool_max_connections', 'gauge', 'Redis connection pool size limit.', redis_pool['max_connections']),
+            ('structra_redis_pool_connections', 'gauge', 'Redis connections opened by this process.', redis_pool['created']),
+            ('structra_redis_pool_in_use', 'gauge', 'Redis connections currently checked out.', redis_pool['in_use']),
+            ('structra_redis_pool_idle', 'gauge', 'Redis connections idle in the pool.', redis_pool['idle']),
+        ])
+    user_cache = get_user_cache()
+    if user_cache is not None:
+        stats = user_cache.stats()
+        body += render_prometheus_scalars([
+            ('structra_user_cache_local_hits_total', 'counter', 'Authenticated users served from the local cache.', stats['local_hits']),
+            ('structra_user_cache_redis_hits_total', 'counter', 'Authenticated users served from Redis.', stats['redis_hits']),
+            ('structra_user_cache_misses_total', 'counter', 'Authenticated users loaded from the database.', stats['misses']),
+            ('structra_user_cache_size', 'gauge', 'Users currently cached in this process.', stats['size']),
+        ])
+    rules_cache = get_rules_cache()
+    if rules_cache is not None:
+        stats = rules_cache.stats()
+        body += render_prometheus_scalars([
+            ('structra_governance_cache_local_hits_total', 'counter', 'Effective governance rules served from the local cache.', stats['local_hits']),
+            ('structra_governance_cache_redis_hits_total', 'counter', 'Effective governance rules served from Redis.', stats['redis_hits']),
+            ('structra_governance_cache_misses_total', 'counter', 'Effective governance rules computed from settings.', stats['misses']),
+            ('structra_governance_cache_size', 'gauge', 'Projects and teams with rules cached in this process.', stats['size']),
+        ])
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
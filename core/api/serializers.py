@@ -1,5 +1,11 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+
+from core.constants.activity_constant import ROLLUP_DIMENSIONS, ROLLUP_GRANULARITIES
 from core.models import ActivityLog
+from core.utils.export_utils import EXPORT_FORMAT_NDJSON, EXPORT_FORMATS
 
 
 class ActivityLogSerializer(serializers.ModelSerializer):
@@ -55,3 +61,39 @@ class ActivityLogListSerializer(serializers.ModelSerializer):
             'timestamp',
         ]
         read_only_fields = fields
+
+
+class ActivityRollupQuerySerializer(serializers.Serializer):
+    """Validates query params for the activity rollup endpoint"""
+    
+    granularity = serializers.ChoiceField(choices=[g[0] for g in ROLLUP_GRANULARITIES], default='hour')
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    group_by = serializers.CharField(required=False, allow_blank=True, default='')
+    resource_type = serializers.CharField(required=False)
+    action = serializers.ChoiceField(choices=[a[0] for a in ActivityLog.ACTION_CHOICES], required=False)
+    method = serializers.CharField(required=False)
+    status_class = serializers.IntegerField(min_value=1, max_value=5, required=False)
+    
+    def validate_group_by(self, value):
+        dimensions = [d.strip() for d in value.split(',') if d.strip()]
+        invalid = [d for d in dimensions if d not in ROLLUP_DIMENSIONS]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Invalid dimensions: {', '.join(invalid)}. Choose from: {', '.join(ROLLUP_DIMENSIONS)}"
+            )
+        return dimensions
+    
+    def validate(self, attrs):
+        attrs['end'] = attrs.get('end') or timezone.now()
+        attrs['start'] = attrs.get('start') or attrs['end'] - timedelta(days=1)
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError("start must be before end.")
+        return attrs
+
+
+class ActivityLogExportQuerySerializer(serializers.Serializer):
+    """Validates the export-specific query params; row filters go through ActivityLogFilter"""
+    
+    export_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default=EXPORT_FORMAT_NDJSON)
+    gzip = serializers.BooleanField(default=False)
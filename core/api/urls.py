@@ -2,11 +2,12 @@ from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from core.api.api import ActivityLogViewSet
+from core.api.api import ActivityLogViewSet, latency_metrics
 
 router = DefaultRouter()
 router.register(r'activity-logs', ActivityLogViewSet, basename='activity-log')
 
 urlpatterns = [
+    path('metrics/', latency_metrics, name='latency-metrics'),
     path('', include(router.urls)),
 ]
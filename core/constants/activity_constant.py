@@ -0,0 +1,18 @@
+ROLLUP_GRANULARITIES = [
+    ("minute", "Minute"),
+    ("hour", "Hour"),
+    ("day", "Day"),
+]
+
+# Upper edges (inclusive, in ms) of the fixed latency histogram buckets.
+# Anything slower than the last edge is counted in the overflow bucket.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+ROLLUP_DIMENSIONS = ("resource_type", "action", "method", "status_class")
+
+# Log-spaced upper edges (ms) for the in-process per-route histograms
+# scraped from /api/v1/metrics/. Finer than the rollup buckets since they
+# cost nothing to store.
+METRICS_LATENCY_BUCKETS_MS = (
+    1, 2.5, 5, 10, 25, 50, 75, 100, 150, 250, 400, 600, 1000, 1500, 2500, 4000, 6000, 10000, 30000,
+)
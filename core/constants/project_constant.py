@@ -42,13 +42,13 @@ PROJECT_ACTION_POLICIES = {
         "default": "MANAGER",
     },
     "create_task": {
-        "system_min_role": "MEMBER",
+        "system_min_role": "CONTRIBUTOR",
         "system_max_role": "MANAGER",
         "configurable": True,
         "default": "MANAGER",
     },
     "update_task": {
-        "system_min_role": "MEMBER",
+        "system_min_role": "CONTRIBUTOR",
         "system_max_role": "MANAGER",
         "configurable": True,
         "default": "MANAGER",
@@ -60,3 +60,16 @@ PROJECT_ACTION_POLICIES = {
         "default": "MANAGER",
     }
 }
+
+
+# Bits of EffectiveProjectPermission.capabilities
+PROJECT_CAPABILITIES = {
+    "view_project": 1 << 0,
+    "invite_member": 1 << 1,
+    "update_member": 1 << 2,
+    "remove_member": 1 << 3,
+    "create_task": 1 << 4,
+    "update_task": 1 << 5,
+    "delete_task": 1 << 6,
+    "manage_project": 1 << 7,  # update, transfer ownership, delete
+}
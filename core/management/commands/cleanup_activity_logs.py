@@ -1,8 +1,14 @@
+import gzip
 import logging
+import os
+import time
 from datetime import timedelta
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 from django.utils import timezone
 from core.models import ActivityLog
+from core.utils.export_utils import EXPORT_FIELDS, export_filename, iter_export, iter_ndjson
+from core.utils.partition_utils import drop_partitions_before, expired_partitions, is_partitioned
 
 logger = logging.getLogger(__name__)
 
@@ -22,33 +28,65 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be deleted without actually deleting',
         )
+        parser.add_argument(
+            '--detach',
+            action='store_true',
+            help='On a partitioned table, detach expired partitions instead of dropping them',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per transaction (default: 5000)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Seconds to pause between batches to let replication and inserts catch up (default: 0.5)',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Write the rows to gzip NDJSON files in this directory before deleting them',
+        )
 
     def handle(self, *args, **options):
         days = options['days']
         dry_run = options['dry_run']
-        
+        archive_dir = options['archive_dir']
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if archive_dir and not dry_run:
+            os.makedirs(archive_dir, exist_ok=True)
+
         cutoff_date = timezone.now() - timedelta(days=days)
-        
+
         self.stdout.write(
             self.style.WARNING(
                 f'Finding activity logs older than {days} days (before {cutoff_date.date()})...'
             )
         )
-        
-        old_logs = ActivityLog.objects.filter(timestamp__lt=cutoff_date)
-        count = old_logs.count()
-        
-        if count == 0:
-            self.stdout.write(self.style.SUCCESS('No old activity logs found.'))
+
+        if is_partitioned(connection):
+            self._drop_partitions(cutoff_date, days, dry_run, options['detach'], archive_dir)
             return
-        
+
+        old_logs = ActivityLog.objects.filter(timestamp__lt=cutoff_date)
+
         if dry_run:
+            count = old_logs.count()
+            if count == 0:
+                self.stdout.write(self.style.SUCCESS('No old activity logs found.'))
+                return
+
             self.stdout.write(
                 self.style.WARNING(
-                    f'DRY RUN: Would delete {count} activity logs.'
+                    f'DRY RUN: Would delete {count} activity logs '
+                    f'in ~{-(-count // options["batch_size"])} batches of {options["batch_size"]}.'
                 )
             )
-            
+
             # Show sample of what would be deleted
             sample = old_logs[:5]
             self.stdout.write('\nSample of logs that would be deleted:')
@@ -56,22 +94,136 @@ class Command(BaseCommand):
                 self.stdout.write(
                     f'  - {log.timestamp} | {log.username} | {log.action} | {log.resource_type}'
                 )
-            
+
             if count > 5:
                 self.stdout.write(f'  ... and {count - 5} more')
+            return
+
+        deleted_count = self._delete_in_batches(
+            old_logs, cutoff_date, options['batch_size'], options['sleep'], archive_dir
+        )
+
+        if deleted_count == 0:
+            self.stdout.write(self.style.SUCCESS('No old activity logs found.'))
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully deleted {deleted_count} activity logs.'
+            )
+        )
+
+        logger.info(f'Cleaned up {deleted_count} activity logs older than {days} days')
+
+    def _delete_in_batches(self, old_logs, cutoff_date, batch_size, sleep, archive_dir):
+        """
+        Delete the oldest `batch_size` rows per transaction until none are
+        left, so no single statement holds locks or generates WAL for the
+        whole backlog. With an archive directory each batch is appended to
+        a gzip NDJSON file (and flushed) before it is deleted.
+        """
+        fields = EXPORT_FIELDS if archive_dir else ['id', 'timestamp']
+        archive = None
+        if archive_dir:
+            name = export_filename(
+                f'activity_logs_before_{cutoff_date:%Y%m%d}_{timezone.now():%Y%m%d_%H%M%S}', 'ndjson', True
+            )
+            archive_path = os.path.join(archive_dir, name)
+            archive = gzip.open(archive_path, 'wt', encoding='utf-8')
+
+        deleted_total = 0
+        batches = 0
+        started = time.monotonic()
+        try:
+            while True:
+                batch = list(old_logs.order_by('timestamp', 'id').values(*fields)[:batch_size])
+                if not batch:
+                    break
+
+                if archive is not None:
+                    archive.writelines(iter_ndjson(batch))
+                    archive.flush()
+
+                with transaction.atomic():
+                    deleted, _ = ActivityLog.objects.filter(
+                        timestamp__lt=cutoff_date, id__in=[row['id'] for row in batch]
+                    ).delete()
+                deleted_total += deleted
+                batches += 1
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'  Batch {batches}: deleted {deleted} up to {batch[-1]["timestamp"]} '
+                    f'(total {deleted_total}, {deleted_total / elapsed if elapsed else 0:.0f} rows/s)'
+                )
+
+                if len(batch) < batch_size:
+                    break
+                if sleep:
+                    time.sleep(sleep)
+        finally:
+            if archive is not None:
+                archive.close()
+                if batches == 0:
+                    os.remove(archive_path)
+                else:
+                    self.stdout.write(f'Archived {deleted_total} rows to {archive_path}')
+
+        if batches:
+            elapsed = time.monotonic() - started
+            logger.info(
+                f'Deleted {deleted_total} activity logs in {batches} batches '
+                f'({elapsed:.1f}s, {deleted_total / elapsed if elapsed else 0:.0f} rows/s)'
+            )
+        return deleted_total
+
+    def _archive_partition(self, partition, archive_dir):
+        """Stream one partition's rows to <archive_dir>/<partition>.ndjson.gz"""
+        rows = ActivityLog.objects.filter(timestamp__lt=partition['upper'])
+        if partition['lower'] is not None:
+            rows = rows.filter(timestamp__gte=partition['lower'])
+
+        path = os.path.join(archive_dir, export_filename(partition['name'], 'ndjson', True))
+        started = time.monotonic()
+        written = 0
+        with open(path, 'wb') as archive:
+            for chunk in iter_export(rows, compress=True):
+                archive.write(chunk)
+                written += len(chunk)
+        self.stdout.write(
+            f"  - Archived {partition['name']} to {path} ({written} bytes in {time.monotonic() - started:.1f}s)"
+        )
+
+    def _drop_partitions(self, cutoff_date, days, dry_run, detach, archive_dir):
+        """
+        Remove whole partitions that end before the cutoff. Rows in the
+        partition that straddles the cutoff are kept until it fully expires.
+        """
+        expired = expired_partitions(connection, cutoff_date)
+        if not dry_run and expired:
+            if archive_dir:
+                for partition in expired:
+                    self._archive_partition(partition, archive_dir)
+            expired = drop_partitions_before(connection, cutoff_date, detach=detach)
+
+        if not expired:
+            self.stdout.write(self.style.SUCCESS('No expired activity log partitions found.'))
+            return
+
+        if dry_run:
+            prefix = 'DRY RUN: Would detach' if detach else 'DRY RUN: Would drop'
         else:
+            prefix = 'Detached' if detach else 'Dropped'
+        for partition in expired:
             self.stdout.write(
-                self.style.WARNING(
-                    f'Deleting {count} activity logs...'
-                )
+                f"  - {prefix} {partition['name']} (~{partition['estimated_rows']} rows)"
             )
-            
-            deleted_count, _ = old_logs.delete()
-            
+
+        if not dry_run:
+            total = sum(p['estimated_rows'] for p in expired)
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Successfully deleted {deleted_count} activity logs.'
+                    f'Successfully removed {len(expired)} partitions (~{total} activity logs).'
                 )
             )
-            
-            logger.info(f'Cleaned up {deleted_count} activity logs older than {days} days')
+            logger.info(f'Removed {len(expired)} activity log partitions older than {days} days')
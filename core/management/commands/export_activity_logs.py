@@ -0,0 +1,107 @@
+import logging
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.filters import ActivityLogFilter
+from core.models import ActivityLog
+from core.utils.export_utils import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_FORMAT_NDJSON, iter_export
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Stream activity logs matching the API filters to an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='File to write to, or "-" for stdout (default: -)',
+        )
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=EXPORT_FORMATS,
+            default=EXPORT_FORMAT_NDJSON,
+            help='Output format (default: ndjson)',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Gzip the output',
+        )
+        parser.add_argument(
+            '--after',
+            help='Only rows with timestamp >= this ISO datetime',
+        )
+        parser.add_argument(
+            '--before',
+            help='Only rows with timestamp <= this ISO datetime',
+        )
+        parser.add_argument(
+            '--filter',
+            action='append',
+            default=[],
+            metavar='NAME=VALUE',
+            help='Any ActivityLogFilter field, e.g. --filter action=FAILED (repeatable)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched per server-side cursor round trip (default: {DEFAULT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        params = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Invalid --filter {item!r}, expected NAME=VALUE')
+            params[name] = value
+        if options['after']:
+            params['timestamp_after'] = options['after']
+        if options['before']:
+            params['timestamp_before'] = options['before']
+
+        filterset = ActivityLogFilter(params, queryset=ActivityLog.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(f'Invalid filters: {filterset.errors.as_json()}')
+
+        compress = options['gzip']
+        chunks = iter_export(
+            filterset.qs,
+            export_format=options['export_format'],
+            compress=compress,
+            chunk_size=options['chunk_size'],
+        )
+
+        output = options['output']
+        to_stdout = output == '-'
+        if to_stdout:
+            stream = sys.stdout.buffer if compress else sys.stdout
+        elif compress:
+            stream = open(output, 'wb')
+        else:
+            stream = open(output, 'w', encoding='utf-8', newline='')
+
+        started = time.monotonic()
+        written = 0
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+                written += len(chunk)
+        finally:
+            if to_stdout:
+                stream.flush()
+            else:
+                stream.close()
+
+        elapsed = time.monotonic() - started
+        if not to_stdout:
+            self.stderr.write(
+                self.style.SUCCESS(f'Exported activity logs to {output} ({written} bytes in {elapsed:.1f}s)')
+            )
+        logger.info(f'Exported activity logs to {output} ({written} bytes in {elapsed:.1f}s)')
@@ -0,0 +1,59 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.utils.partition_utils import (
+    PARTITION_INTERVALS, ensure_partitions, is_partitioned, list_partitions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Create activity log partitions ahead of time and list existing ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=getattr(settings, 'ACTIVITY_LOG_PARTITIONS_AHEAD', 3),
+            help='Number of future periods to create partitions for (default: ACTIVITY_LOG_PARTITIONS_AHEAD)',
+        )
+        parser.add_argument(
+            '--interval',
+            choices=PARTITION_INTERVALS,
+            default=getattr(settings, 'ACTIVITY_LOG_PARTITION_INTERVAL', 'month'),
+            help='Partition size (default: ACTIVITY_LOG_PARTITION_INTERVAL)',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Only list existing partitions',
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned(connection):
+            raise CommandError('core_activitylog is not a partitioned PostgreSQL table.')
+
+        if not options['list']:
+            created = ensure_partitions(connection, options['interval'], options['ahead'])
+            if created:
+                for name in created:
+                    self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+                logger.info(f'Created {len(created)} activity log partitions')
+            else:
+                self.stdout.write(self.style.SUCCESS('All partitions already exist.'))
+
+        self.stdout.write('\nPartitions:')
+        for partition in list_partitions(connection):
+            if partition['is_default']:
+                bounds = 'DEFAULT'
+            else:
+                lower = partition['lower'].isoformat() if partition['lower'] else 'MINVALUE'
+                upper = partition['upper'].isoformat() if partition['upper'] else 'MAXVALUE'
+                bounds = f'[{lower}, {upper})'
+            self.stdout.write(
+                f"  - {partition['name']} | {bounds} | ~{partition['estimated_rows']} rows"
+            )
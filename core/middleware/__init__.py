@@ -1,3 +1,4 @@
 from .activity_tracking import ActivityTrackingMiddleware
+from .role_cache import RoleCacheMiddleware
 
-__all__ = ['ActivityTrackingMiddleware']
+__all__ = ['ActivityTrackingMiddleware', 'RoleCacheMiddleware']
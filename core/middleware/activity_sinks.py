@@ -0,0 +1,268 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from core.models import ActivityLog
+
+logger = logging.getLogger("core.middleware.activity_tracking")
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST)
+
+
+def log_activity_record(record):
+    """Write the one-line activity summary used for real-time monitoring."""
+    response_time = record.get("response_time_ms")
+    logger.info(
+        "Activity: %s | %s | %s | %s %s | Status: %s | Time: %sms",
+        record.get("username"),
+        record.get("action"),
+        record.get("resource_type"),
+        record.get("method"),
+        record.get("path"),
+        record.get("status_code"),
+        response_time if response_time is not None else "N/A",
+    )
+
+
+class DatabaseActivitySink:
+    """
+    Writes each activity record with its own INSERT inside the request.
+    Kept for tests and for deployments that want strictly synchronous logs.
+    """
+
+    def emit(self, record):
+        ActivityLog.objects.create(**record)
+        log_activity_record(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class BufferedActivitySink:
+    """
+    Pushes activity records onto an in-process queue which a background
+    thread drains with bulk_create.
+
+    A batch is written when `batch_size` records are waiting or when
+    `flush_interval` seconds have passed, whichever comes first. When the
+    queue is full the `overflow_policy` decides what happens:
+    - block:       wait up to `block_timeout` seconds for room, then drop
+    - drop_newest: drop the record being submitted
+    - drop_oldest: evict the oldest queued record to make room
+    """
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_queue_size=10000,
+                 overflow_policy=OVERFLOW_DROP_NEWEST, block_timeout=0.05):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown activity log overflow policy: {overflow_policy}")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        atexit.register(self.close)
+
+    # -----------------------------------------------------
+    # Producer side (request thread)
+    # -----------------------------------------------------
+
+    def emit(self, record):
+        self._ensure_worker()
+        try:
+            if self.overflow_policy == OVERFLOW_BLOCK:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self._handle_overflow(record)
+
+    def _handle_overflow(self, record):
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(record)
+                self._record_drop()
+                return
+            except (queue.Empty, queue.Full):
+                pass
+        self._record_drop()
+
+    def _record_drop(self):
+        with self._lock:
+            self.dropped += 1
+            dropped = self.dropped
+        # Avoid flooding the log under sustained overload
+        if dropped == 1 or dropped % 1000 == 0:
+            logger.warning(f"Activity log queue full, {dropped} records dropped so far")
+
+    def _ensure_worker(self):
+        """Start the flusher lazily, and again in a forked child process."""
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            if self._pid is not None and self._pid != pid:
+                # Records copied from the parent belong to the parent process
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+                self._stop = threading.Event()
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run,
+                name="activity-log-flusher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    # -----------------------------------------------------
+    # Consumer side (flusher thread)
+    # -----------------------------------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+        self.flush()
+
+    def _collect_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            ActivityLog.objects.bulk_create(
+                [ActivityLog(**record) for record in batch],
+                batch_size=self.batch_size,
+            )
+            with self._lock:
+                self.written += len(batch)
+            for record in batch:
+                log_activity_record(record)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} activity logs: {str(e)}", exc_info=True)
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Write everything currently queued from the calling thread."""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self):
+        """Stop the flusher and write any remaining records (runs at exit)."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=max(self.flush_interval * 2, 5))
+        self.flush()
+
+
+class RedisStreamActivitySink:
+    """
+    Appends serialized activity records to a Redis stream. The
+    `core.tasks.consume_activity_stream` Celery task reads the stream
+    through a consumer group and bulk-inserts the rows, so web workers
+    never talk to Postgres for activity logging.
+    """
+
+    def __init__(self, stream=None, max_len=None):
+        self.stream = stream or getattr(settings, "ACTIVITY_LOG_STREAM", "activity_logs")
+        self.max_len = max_len or getattr(settings, "ACTIVITY_LOG_STREAM_MAXLEN", 1000000)
+
+    def emit(self, record):
+        payload = json.dumps(record, cls=DjangoJSONEncoder)
+        # Approximate trimming keeps XADD O(1); it only bites if consumers stop for a long time
+        settings.REDIS_CLIENT.xadd(
+            self.stream,
+            {"record": payload},
+            maxlen=self.max_len,
+            approximate=True,
+        )
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+SINK_SYNC = "sync"
+SINK_BUFFERED = "buffered"
+SINK_REDIS = "redis"
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def build_activity_sink(name=None):
+    name = name or getattr(settings, "ACTIVITY_LOG_SINK", SINK_BUFFERED)
+    if name == SINK_SYNC:
+        return DatabaseActivitySink()
+    if name == SINK_BUFFERED:
+        return BufferedActivitySink(
+            batch_size=getattr(settings, "ACTIVITY_LOG_BATCH_SIZE", 200),
+            flush_interval=getattr(settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 1.0),
+            max_queue_size=getattr(settings, "ACTIVITY_LOG_QUEUE_SIZE", 10000),
+            overflow_policy=getattr(settings, "ACTIVITY_LOG_OVERFLOW_POLICY", OVERFLOW_DROP_NEWEST),
+            block_timeout=getattr(settings, "ACTIVITY_LOG_BLOCK_TIMEOUT", 0.05),
+        )
+    if name == SINK_REDIS:
+        return RedisStreamActivitySink()
+    raise ValueError(f"Unknown activity log sink: {name}")
+
+
+def get_activity_sink():
+    """Return the process-wide activity sink configured by ACTIVITY_LOG_SINK."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = build_activity_sink()
+    return _sink
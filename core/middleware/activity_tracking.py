@@ -1,9 +1,12 @@
 import logging
 import time
 import json
+from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
-from core.models import ActivityLog
+from core.middleware.activity_sinks import get_activity_sink
+from core.middleware.latency_metrics import get_latency_registry, resolve_route
+from core.middleware.tracking_policies import TrackingPolicySet
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,7 @@ class ActivityTrackingMiddleware(MiddlewareMixin):
         '/media/',
         '/admin/jsi18n/',
         '/favicon.ico',
+        '/api/v1/metrics/',
     ]
     
     # Methods to track (you can customize this)
@@ -38,51 +42,82 @@ class ActivityTrackingMiddleware(MiddlewareMixin):
         'ssn',
     ]
     
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.sink = get_activity_sink()
+        self.latency_registry = get_latency_registry()
+        self.policies = TrackingPolicySet.from_settings()
+    
     def process_request(self, request):
         """Mark the start time of the request"""
         request._start_time = time.time()
-        request._should_track = self._should_track_request(request)
+        request._is_excluded = self._is_excluded_path(request)
+        request._should_track = not request._is_excluded and self._should_track_request(request)
         
     def process_response(self, request, response):
         """Log the activity after response is ready"""
+        if hasattr(request, '_start_time'):
+            request._response_time_ms = (time.time() - request._start_time) * 1000
+            if not request._is_excluded:
+                self._record_latency(request, response)
+        
         # Skip if tracking is disabled or path is excluded
         if not getattr(request, '_should_track', False):
             return response
         
         try:
-            self._log_activity(request, response)
+            # Route-level policy from ACTIVITY_TRACKING_POLICIES
+            policy = self.policies.for_request(resolve_route(request), request.method)
+            sample_rate = policy.sample_rate(response.status_code, getattr(request, '_response_time_ms', None))
+            if sample_rate is not None:
+                self._log_activity(request, response, sample_rate)
         except Exception as e:
             # Don't let logging errors break the application
             logger.error(f"Error logging activity: {str(e)}", exc_info=True)
         
         return response
     
-    def _should_track_request(self, request):
-        """Determine if this request should be tracked"""
-        # Check if path is excluded
+    def _is_excluded_path(self, request):
+        """Excluded paths are neither logged nor counted in latency metrics"""
         for excluded_path in self.EXCLUDED_PATHS:
             if request.path.startswith(excluded_path):
-                return False
-        
+                return True
+        return False
+    
+    def _should_track_request(self, request):
+        """Determine if this request should be tracked"""
         # Check if method should be tracked
         if request.method not in self.TRACKED_METHODS:
             return False
         
         return True
     
-    def _log_activity(self, request, response):
-        """Create activity log entry"""
-        # Calculate response time
-        response_time = None
-        if hasattr(request, '_start_time'):
-            response_time = (time.time() - request._start_time) * 1000
+    def _record_latency(self, request, response):
+        """Add this request to the in-process per-route latency histogram"""
+        try:
+            self.latency_registry.observe(
+                resolve_route(request), request.method, request._response_time_ms, response.status_code
+            )
+        except Exception as e:
+            logger.error(f"Error recording request latency: {str(e)}", exc_info=True)
+    
+    def _log_activity(self, request, response, sample_rate=1.0):
+        """Build the activity record and hand it to the configured sink"""
+        record = self._build_record(request, response)
+        record['sample_rate'] = sample_rate
+        self.sink.emit(record)
+    
+    def _build_record(self, request, response):
+        """Collect ActivityLog field values for this request as a plain dict"""
+        # Measured once in process_response
+        response_time = getattr(request, '_response_time_ms', None)
         
         # Extract user info
-        user = None
+        user_id = None
         username = 'Anonymous'
         if hasattr(request, 'user') and request.user.is_authenticated:
-            user = request.user
-            username = user.email or user.username
+            user_id = request.user.id
+            username = request.user.email or request.user.username
         
         # Determine action type
         action = self._determine_action(request, response)
@@ -96,32 +131,25 @@ class ActivityTrackingMiddleware(MiddlewareMixin):
         # Get query params
         query_params = dict(request.GET) if request.GET else None
         
-        # Create activity log
-        ActivityLog.objects.create(
-            user=user,
-            username=username,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            resource_name=resource_name,
-            description=self._generate_description(action, resource_type, resource_name, request),
-            method=request.method,
-            path=request.path,
-            query_params=query_params,
-            request_body=request_body,
-            status_code=response.status_code,
-            response_time_ms=round(response_time, 2) if response_time else None,
-            ip_address=self._get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
-            extra_data=self._get_extra_data(request, response)
-        )
-        
-        # Also log to file for real-time monitoring
-        logger.info(
-            f"Activity: {username} | {action} | {resource_type} | "
-            f"{request.method} {request.path} | Status: {response.status_code} | "
-            f"Time: {round(response_time, 2) if response_time else 'N/A'}ms"
-        )
+        return {
+            'user_id': user_id,
+            'username': username,
+            'action': action,
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'resource_name': resource_name,
+            'description': self._generate_description(action, resource_type, resource_name, request),
+            'method': request.method,
+            'path': request.path,
+            'query_params': query_params,
+            'request_body': request_body,
+            'status_code': response.status_code,
+            'response_time_ms': round(response_time, 2) if response_time else None,
+            'ip_address': self._get_client_ip(request),
+            'user_agent': request.META.get('HTTP_USER_AGENT', '')[:500],
+            'timestamp': timezone.now(),
+            'extra_data': self._get_extra_data(request, response),
+        }
     
     def _determine_action(self, request, response):
         """Determine the action type based on method and path"""
@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from bisect import bisect_left
+
+from django.conf import settings
+
+from core.constants.activity_constant import METRICS_LATENCY_BUCKETS_MS
+from core.utils.rollup_utils import estimate_percentile
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+OVERFLOW_ROUTE = "other"
+SNAPSHOT_KEY_PREFIX = "metrics:latency:"
+METRIC_PREFIX = "structra_http_request"
+QUANTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Fixed log-bucket latency histogram. Two histograms with the same edges
+    merge by adding their counts, so per-process snapshots can be combined.
+    """
+
+    __slots__ = ("counts", "count", "error_count", "sum_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(METRICS_LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.error_count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, duration_ms, is_error=False):
+        # Buckets are upper-inclusive, like Prometheus' "le"
+        self.counts[bisect_left(METRICS_LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        if is_error:
+            self.error_count += 1
+
+    def merge(self, other):
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.count += other.count
+        self.error_count += other.error_count
+        self.sum_ms += other.sum_ms
+        return self
+
+    def percentile(self, percentile):
+        return estimate_percentile(self.counts, percentile, edges=METRICS_LATENCY_BUCKETS_MS)
+
+    def to_dict(self):
+        return {
+            "counts": self.counts,
+            "count": self.count,
+            "error_count": self.error_count,
+            "sum_ms": self.sum_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        if len(data["counts"]) != len(histogram.counts):
+            raise ValueError("Histogram bucket layout does not match")
+        histogram.counts = list(data["counts"])
+        histogram.count = data["count"]
+        histogram.error_count = data["error_count"]
+        histogram.sum_ms = data["sum_ms"]
+        return histogram
+
+
+class LatencyRegistry:
+    """
+    Per-process histograms keyed by (route, method).
+
+    The number of series is capped at `max_series`; requests for routes
+    beyond that are folded into the "other" route. When `share_via_redis`
+    is set the registry writes a snapshot of itself to Redis at most every
+    `snapshot_interval` seconds, so a scrape hitting any worker can merge
+    the histograms of all live workers.
+    """
+
+    def __init__(self, max_series=1000, share_via_redis=False, snapshot_interval=10.0):
+        self.max_series = max_series
+        self.share_via_redis = share_via_redis
+        self.snapshot_interval = snapshot_interval
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_snapshot = 0.0
+        self._pid = os.getpid()
+
+    def observe(self, route, method, duration_ms, status_code):
+        self._check_fork()
+        key = (route, method)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                if len(self._histograms) >= self.max_series:
+                    key = (OVERFLOW_ROUTE, method)
+                    histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(duration_ms, is_error=status_code >= 400)
+
+        if self.share_via_redis and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            self.publish_snapshot()
+
+    def snapshot(self):
+        """Copy of this process' histograms."""
+        with self._lock:
+            return {key: LatencyHistogram().merge(histogram) for key, histogram in self._histograms.items()}
+
+    def publish_snapshot(self):
+        self._last_snapshot = time.monotonic()
+        payload = json.dumps([
+            {"route": route, "method": method, **histogram.to_dict()}
+            for (route, method), histogram in self.snapshot().items()
+        ])
+        try:
+            settings.REDIS_CLIENT.set(
+                self._snapshot_key(), payload, ex=max(int(self.snapshot_interval * 3), 30)
+            )
+        except Exception as e:
+            logger.warning(f"Could not publish latency snapshot: {str(e)}")
+
+    def collect(self):
+        """
+        Histograms to expose on a scrape: this process' own, or the merge of
+        every live worker's snapshot when sharing via Redis.
+        """
+        local = self.snapshot()
+        if not self.share_via_redis:
+            return local
+
+        # Our own snapshot may be stale; publish before merging
+        self.publish_snapshot()
+        merged = {}
+        try:
+            client = settings.REDIS_CLIENT
+            keys = list(client.scan_iter(match=f"{SNAPSHOT_KEY_PREFIX}*", count=100))
+            payloads = client.mget(keys) if keys else []
+        except Exception as e:
+            logger.warning(f"Could not read latency snapshots, exposing local histograms: {str(e)}")
+            return local
+
+        for payload in payloads:
+            if not payload:
+                continue
+            try:
+                for entry in json.loads(payload):
+                    key = (entry["route"], entry["method"])
+                    merged.setdefault(key, LatencyHistogram()).merge(LatencyHistogram.from_dict(entry))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable latency snapshot: {str(e)}")
+        return merged
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def _snapshot_key(self):
+        return f"{SNAPSHOT_KEY_PREFIX}{socket.gethostname()}:{os.getpid()}"
+
+    def _check_fork(self):
+        # A forked worker must not report its parent's requests as its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._last_snapshot = 0.0
+            self._lock = threading.Lock()
+            self._histograms = {}
+
+
+def resolve_route(request):
+    """
+    Low-cardinality route label: the URL name when the pattern has one,
+    otherwise the route pattern, never the raw path.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.view_name or match.route or UNMATCHED_ROUTE
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def render_prometheus(histograms):
+    """Render histograms in the Prometheus text exposition format (0.0.4)."""
+    lines = [
+        f"# HELP {METRIC_PREFIX}s_total Requests handled, by route and method.",
+        f"# TYPE {METRIC_PREFIX}s_total counter",
+    ]
+    ordered = sorted(histograms.items())
+    labels = {key: f'route="{_escape_label(key[0])}",method="{_escape_label(key[1])}"' for key, _ in ordered}
+
+    for key, histogram in ordered:
+        lines.append(f"{METRIC_PREFIX}s_total{{{labels[key]}}} {histogram.count}")
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_errors_total Requests answered with a 4xx or 5xx status.",
+        f"# TYPE {METRIC_PREFIX}_errors_total counter",
+    ]
+    for key, histogram in ordered:
+        lines.append(f"{METRIC_PREFIX}_errors_total{{{labels[key]}}} {histogram.error_count}")
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_duration_ms Request latency in milliseconds.",
+        f"# TYPE {METRIC_PREFIX}_duration_ms histogram",
+    ]
+    for key, histogram in ordered:
+        cumulative = 0
+        for edge, value in zip(METRICS_LATENCY_BUCKETS_MS, histogram.counts):
+            cumulative += value
+            lines.append(
+                f'{METRIC_PREFIX}_duration_ms_bucket{{{labels[key]},le="{_format_number(edge)}"}} {cumulative}'
+            )
+        lines.append(f'{METRIC_PREFIX}_duration_ms_bucket{{{labels[key]},le="+Inf"}} {histogram.count}')
+        lines.append(f"{METRIC_PREFIX}_duration_ms_sum{{{labels[key]}}} {round(histogram.sum_ms, 3)}")
+        lines.append(f"{METRIC_PREFIX}_duration_ms_count{{{labels[key]}}} {histogram.count}")
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_duration_ms_quantile Latency percentiles estimated from the histogram.",
+        f"# TYPE {METRIC_PREFIX}_duration_ms_quantile gauge",
+    ]
+    for key, histogram in ordered:
+        for quantile in QUANTILES:
+            lines.append(
+                f'{METRIC_PREFIX}_duration_ms_quantile{{{labels[key]},quantile="{quantile / 100}"}} '
+                f"{_format_number(histogram.percentile(quantile))}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def render_prometheus_scalars(metrics):
+    """
+    Render process-level values given as (name, type, help, value) tuples,
+    e.g. cache hit counters, in the same text format.
+    """
+    lines = []
+    for name, metric_type, help_text, value in metrics:
+        lines += [
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} {metric_type}",
+            f"{name} {_format_number(value)}",
+        ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_latency_registry():
+    """Return the process-wide latency registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LatencyRegistry(
+                    max_series=getattr(settings, "METRICS_MAX_SERIES", 1000),
+                    share_via_redis=getattr(settings, "METRICS_SHARE_VIA_REDIS", False),
+                    snapshot_interval=getattr(settings, "METRICS_SNAPSHOT_INTERVAL", 10.0),
+                )
+    return _registry
@@ -0,0 +1,16 @@
+from core.permissions.base import role_cache_scope
+
+
+class RoleCacheMiddleware:
+    """
+    Opens a role memo for each request, so permission classes, views,
+    serializers and services share one membership lookup per
+    (user, organization/team/project) instead of repeating it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with role_cache_scope():
+            return self.get_response(request)
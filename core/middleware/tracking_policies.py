@@ -0,0 +1,95 @@
+import logging
+import random
+import threading
+
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+MODE_ALWAYS = "always"
+MODE_SAMPLE = "sample"
+MODE_ERRORS = "errors"
+MODE_SLOW = "slow"
+MODE_NEVER = "never"
+TRACKING_MODES = (MODE_ALWAYS, MODE_SAMPLE, MODE_ERRORS, MODE_SLOW, MODE_NEVER)
+
+
+class TrackingPolicy:
+    """
+    Decides whether one request is written to ActivityLog.
+
+    `route` and `method` are fnmatch patterns matched against the resolved
+    URL name (see latency_metrics.resolve_route) and the HTTP method.
+    """
+
+    def __init__(self, mode=MODE_ALWAYS, route="*", method="*", rate=1.0, threshold_ms=None):
+        if mode not in TRACKING_MODES:
+            raise ImproperlyConfigured(
+                f"Unknown activity tracking mode {mode!r}; expected one of {', '.join(TRACKING_MODES)}"
+            )
+        if mode == MODE_SAMPLE and not 0 < rate <= 1:
+            raise ImproperlyConfigured(f"Sample rate for route {route!r} must be in (0, 1], got {rate!r}")
+        if mode == MODE_SLOW and threshold_ms is None:
+            raise ImproperlyConfigured(f"Slow-only policy for route {route!r} needs threshold_ms")
+
+        self.mode = mode
+        self.route = route
+        self.method = method.upper()
+        self.rate = float(rate) if mode == MODE_SAMPLE else 1.0
+        self.threshold_ms = threshold_ms
+
+    def matches(self, route, method):
+        return fnmatchcase(route, self.route) and fnmatchcase(method, self.method)
+
+    def sample_rate(self, status_code, response_time_ms):
+        """
+        Probability the request was kept with, or None to skip it.
+        Only sampled rows carry a rate below 1; rollups weight them by 1/rate.
+        """
+        if self.mode == MODE_ALWAYS:
+            return 1.0
+        if self.mode == MODE_NEVER:
+            return None
+        if self.mode == MODE_ERRORS:
+            return 1.0 if status_code >= 400 else None
+        if self.mode == MODE_SLOW:
+            return 1.0 if response_time_ms is not None and response_time_ms >= self.threshold_ms else None
+        return self.rate if random.random() < self.rate else None
+
+    def __repr__(self):
+        return f"TrackingPolicy(mode={self.mode!r}, route={self.route!r}, method={self.method!r})"
+
+
+class TrackingPolicySet:
+    """
+    Ordered policies from ACTIVITY_TRACKING_POLICIES; the first match wins,
+    otherwise ACTIVITY_TRACKING_DEFAULT_MODE applies.
+    Lookups are memoized per (route, method) since both are low-cardinality.
+    """
+
+    def __init__(self, policies, default):
+        self.policies = policies
+        self.default = default
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        policies = [
+            TrackingPolicy(**options)
+            for options in getattr(settings, "ACTIVITY_TRACKING_POLICIES", [])
+        ]
+        default = TrackingPolicy(mode=getattr(settings, "ACTIVITY_TRACKING_DEFAULT_MODE", MODE_ALWAYS))
+        return cls(policies, default)
+
+    def for_request(self, route, method):
+        key = (route, method)
+        policy = self._cache.get(key)
+        if policy is None:
+            policy = next((p for p in self.policies if p.matches(route, method)), self.default)
+            with self._lock:
+                self._cache[key] = policy
+        return policy
@@ -0,0 +1,111 @@
+"""
+Converts core_activitylog into a table range-partitioned on "timestamp".
+
+The existing table is kept as a partition covering everything up to the
+start of the period after its newest row, so no rows are copied. New
+partitions are created ahead of time by `manage_activity_log_partitions`;
+a DEFAULT partition catches rows that arrive before their partition exists.
+
+Only runs on PostgreSQL. Django's model state is unchanged, but the
+table's primary key becomes (id, timestamp): the database no longer
+enforces unique ids, which now rely on the uuid4 default alone.
+
+The migration runs in one transaction. From the RENAME until commit it
+holds ACCESS EXCLUSIVE on the activity log, and rebuilding the legacy
+primary key and validating the partition bound both read every legacy
+row under that lock. Activity log reads and writes block for the whole
+run, so schedule it in a maintenance window sized to the table.
+"""
+from django.conf import settings
+from django.db import migrations
+
+from core.utils.partition_utils import (
+    ACTIVITY_LOG_TABLE, INTERVAL_MONTH, ensure_partitions, next_period, period_start,
+)
+
+LEGACY_TABLE = f"{ACTIVITY_LOG_TABLE}_legacy"
+
+
+def partition_activity_log(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    ActivityLog = apps.get_model("core", "ActivityLog")
+    qn = schema_editor.quote_name
+    interval = getattr(settings, "ACTIVITY_LOG_PARTITION_INTERVAL", INTERVAL_MONTH)
+    ahead = getattr(settings, "ACTIVITY_LOG_PARTITIONS_AHEAD", 3)
+
+    with connection.cursor() as cursor:
+        # 1. Move the current table (and its index names) out of the way
+        cursor.execute(f"ALTER TABLE {qn(ACTIVITY_LOG_TABLE)} RENAME TO {qn(LEGACY_TABLE)}")
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [LEGACY_TABLE])
+        for (index_name,) in cursor.fetchall():
+            new_name = f"{index_name[:55]}_legacy"
+            cursor.execute(f"ALTER INDEX {qn(index_name)} RENAME TO {qn(new_name)}")
+
+        # 2. Partitioned parent with the same columns
+        cursor.execute(
+            f"CREATE TABLE {qn(ACTIVITY_LOG_TABLE)} (LIKE {qn(LEGACY_TABLE)} INCLUDING DEFAULTS) "
+            f'PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(f'ALTER TABLE {qn(ACTIVITY_LOG_TABLE)} ADD PRIMARY KEY ("id", "timestamp")')
+        cursor.execute(
+            f"ALTER TABLE {qn(ACTIVITY_LOG_TABLE)} ADD CONSTRAINT {qn(ACTIVITY_LOG_TABLE + '_user_id_fk')} "
+            f'FOREIGN KEY ("user_id") REFERENCES {qn(apps.get_model("accounts", "User")._meta.db_table)} ("id") '
+            f"DEFERRABLE INITIALLY DEFERRED"
+        )
+        for statement in schema_editor._model_indexes_sql(ActivityLog):
+            cursor.execute(str(statement))
+
+        # 3. Attach the old table as the first partition
+        cursor.execute(f'SELECT max("timestamp") FROM {qn(LEGACY_TABLE)}')
+        newest = cursor.fetchone()[0]
+        if newest is None:
+            cursor.execute(f"DROP TABLE {qn(LEGACY_TABLE)}")
+        else:
+            boundary = next_period(period_start(newest, interval), interval)
+            # Partitions must share the parent's primary key
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+                [LEGACY_TABLE],
+            )
+            (legacy_pk,) = cursor.fetchone()
+            cursor.execute(
+                f"ALTER TABLE {qn(LEGACY_TABLE)} DROP CONSTRAINT {qn(legacy_pk)}, "
+                f'ADD PRIMARY KEY ("id", "timestamp")'
+            )
+            # A validated CHECK lets ATTACH skip a second full-table scan. The
+            # table is already locked ACCESS EXCLUSIVE by the RENAME above, so
+            # VALIDATE's scan still blocks activity log reads and writes
+            cursor.execute(
+                f"ALTER TABLE {qn(LEGACY_TABLE)} ADD CONSTRAINT legacy_bound "
+                f'CHECK ("timestamp" IS NOT NULL AND "timestamp" < %s) NOT VALID',
+                [boundary],
+            )
+            cursor.execute(f"ALTER TABLE {qn(LEGACY_TABLE)} VALIDATE CONSTRAINT legacy_bound")
+            cursor.execute(
+                f"ALTER TABLE {qn(ACTIVITY_LOG_TABLE)} ATTACH PARTITION {qn(LEGACY_TABLE)} "
+                f"FOR VALUES FROM (MINVALUE) TO (%s)",
+                [boundary],
+            )
+            cursor.execute(f"ALTER TABLE {qn(LEGACY_TABLE)} DROP CONSTRAINT legacy_bound")
+
+        cursor.execute(
+            f"CREATE TABLE {qn(ACTIVITY_LOG_TABLE + '_default')} PARTITION OF {qn(ACTIVITY_LOG_TABLE)} DEFAULT"
+        )
+
+    ensure_partitions(connection, interval, ahead)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("core", "0002_activitylog_timestamp_default"),
+    ]
+
+    operations = [
+        # Not reversed: the partitioned table is schema-compatible with the old one
+        migrations.RunPython(partition_activity_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_partition_activitylog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityRollupCheckpoint",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("high_water_mark", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ActivityRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("granularity", models.CharField(choices=[("minute", "Minute"), ("hour", "Hour"), ("day", "Day")], max_length=10)),
+                ("bucket", models.DateTimeField(help_text="Start of the minute/hour/day")),
+                ("resource_type", models.CharField(blank=True, max_length=100)),
+                ("action", models.CharField(choices=[("CREATE", "Create"), ("READ", "Read"), ("UPDATE", "Update"), ("DELETE", "Delete"), ("LOGIN", "Login"), ("LOGOUT", "Logout"), ("ACCESS", "Access"), ("FAILED", "Failed")], max_length=20)),
+                ("method", models.CharField(max_length=10)),
+                ("status_class", models.PositiveSmallIntegerField(help_text="status_code // 100, e.g. 2 for 2xx")),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("error_count", models.PositiveIntegerField(default=0, help_text="Requests with status >= 400")),
+                ("latency_count", models.PositiveIntegerField(default=0, help_text="Requests with a recorded response time")),
+                ("latency_sum_ms", models.FloatField(default=0)),
+                ("latency_max_ms", models.FloatField(blank=True, null=True)),
+                ("latency_le_10", models.PositiveIntegerField(default=0)),
+                ("latency_le_25", models.PositiveIntegerField(default=0)),
+                ("latency_le_50", models.PositiveIntegerField(default=0)),
+                ("latency_le_100", models.PositiveIntegerField(default=0)),
+                ("latency_le_250", models.PositiveIntegerField(default=0)),
+                ("latency_le_500", models.PositiveIntegerField(default=0)),
+                ("latency_le_1000", models.PositiveIntegerField(default=0)),
+                ("latency_le_2500", models.PositiveIntegerField(default=0)),
+                ("latency_le_5000", models.PositiveIntegerField(default=0)),
+                ("latency_gt_5000", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Activity Rollup",
+                "verbose_name_plural": "Activity Rollups",
+                "ordering": ["granularity", "bucket"],
+                "constraints": [models.UniqueConstraint(fields=("granularity", "bucket", "resource_type", "action", "method", "status_class"), name="unique_activity_rollup_key")],
+            },
+        ),
+    ]
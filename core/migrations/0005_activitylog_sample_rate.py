@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_activity_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activitylog",
+            name="sample_rate",
+            field=models.FloatField(default=1.0, help_text="Probability this request was logged with under its tracking policy; counts are weighted by 1/sample_rate"),
+        ),
+    ]
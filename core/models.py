@@ -1,5 +1,8 @@
 import uuid
 from django.db import models
+from django.utils import timezone
+
+from core.constants.activity_constant import ROLLUP_GRANULARITIES
 
 
 class TimeStampedModel(models.Model):
@@ -57,8 +60,13 @@ class ActivityLog(models.Model):
     user_agent = models.TextField(blank=True)
     
     # Metadata
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set by the middleware at request time; rows may be written later in batches
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     extra_data = models.JSONField(null=True, blank=True, help_text="Additional context-specific data")
+    sample_rate = models.FloatField(
+        default=1.0,
+        help_text="Probability this request was logged with under its tracking policy; counts are weighted by 1/sample_rate",
+    )
 
     class Meta:
         ordering = ['-timestamp']
@@ -72,3 +80,65 @@ class ActivityLog(models.Model):
 
     def __str__(self):
         return f"{self.username or 'Anonymous'} - {self.action} - {self.resource_type} - {self.timestamp}"
+
+
+class ActivityRollup(models.Model):
+    """
+    Pre-aggregated ActivityLog counters per time bucket, filled incrementally
+    by the `core.tasks.rollup_activity_logs_task` Celery task.
+    Latency buckets are non-cumulative counts; see LATENCY_BUCKETS_MS.
+    """
+    granularity = models.CharField(max_length=10, choices=ROLLUP_GRANULARITIES)
+    bucket = models.DateTimeField(help_text="Start of the minute/hour/day")
+
+    # Dimensions
+    resource_type = models.CharField(max_length=100, blank=True)
+    action = models.CharField(max_length=20, choices=ActivityLog.ACTION_CHOICES)
+    method = models.CharField(max_length=10)
+    status_class = models.PositiveSmallIntegerField(help_text="status_code // 100, e.g. 2 for 2xx")
+
+    # Counters
+    count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0, help_text="Requests with status >= 400")
+    latency_count = models.PositiveIntegerField(default=0, help_text="Requests with a recorded response time")
+    latency_sum_ms = models.FloatField(default=0)
+    latency_max_ms = models.FloatField(null=True, blank=True)
+
+    # Latency histogram
+    latency_le_10 = models.PositiveIntegerField(default=0)
+    latency_le_25 = models.PositiveIntegerField(default=0)
+    latency_le_50 = models.PositiveIntegerField(default=0)
+    latency_le_100 = models.PositiveIntegerField(default=0)
+    latency_le_250 = models.PositiveIntegerField(default=0)
+    latency_le_500 = models.PositiveIntegerField(default=0)
+    latency_le_1000 = models.PositiveIntegerField(default=0)
+    latency_le_2500 = models.PositiveIntegerField(default=0)
+    latency_le_5000 = models.PositiveIntegerField(default=0)
+    latency_gt_5000 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['granularity', 'bucket']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'resource_type', 'action', 'method', 'status_class'],
+                name='unique_activity_rollup_key',
+            )
+        ]
+        verbose_name = 'Activity Rollup'
+        verbose_name_plural = 'Activity Rollups'
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket} - {self.resource_type} {self.method} {self.status_class}xx: {self.count}"
+
+
+class ActivityRollupCheckpoint(models.Model):
+    """
+    High-water mark of the rollup job: every ActivityLog row with a
+    timestamp before `high_water_mark` has been folded into ActivityRollup.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.high_water_mark}"
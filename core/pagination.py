@@ -1,6 +1,132 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+import logging
+import uuid
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger(__name__)
+
 
 class StandardPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+def approximate_count(queryset):
+    """
+    Planner row estimate for `queryset` on PostgreSQL (EXPLAIN, no scan).
+    Returns None on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (timestamp, id), newest first.
+
+    Each page is a range scan from the last row of the previous page, so
+    page N costs the same as page 1 and no COUNT(*) is run. Pass
+    `count=approximate` for the planner's row estimate instead.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering_field = "timestamp"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.approximate_count = None
+        if request.query_params.get(self.count_query_param) == "approximate":
+            self.approximate_count = approximate_count(queryset)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            field = self.ordering_field
+            # The leading range keeps the index scan on `field`; ties break on id
+            queryset = queryset.filter(
+                Q(**{f"{field}__lte": value}) & (Q(**{f"{field}__lt": value}) | Q(pk__lt=pk))
+            )
+
+        rows = list(queryset.order_by(f"-{self.ordering_field}", "-pk")[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.next_position = (getattr(page[-1], self.ordering_field), page[-1].pk) if self.has_next else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            value = parse_datetime(data["t"])
+            if value is None:
+                raise ValueError("bad timestamp")
+            return value, uuid.UUID(str(data["id"]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        value, pk = position
+        data = json.dumps({"t": value.isoformat(), "id": str(pk)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "first": self.get_first_link(),
+        }
+        if self.approximate_count is not None:
+            payload["approximate_count"] = self.approximate_count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "approximate_count": {"type": "integer"},
+                "results": schema,
+            },
+        }
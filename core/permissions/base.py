@@ -1,13 +1,69 @@
 import logging
 
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import OuterRef, Subquery
 
 from app.organizations.models import OrganizationMembership
 from app.teams.models import TeamMembership
-from app.projects.models import ProjectMembership
+from app.projects.models import Project, ProjectMembership
 
 logger = logging.getLogger(__name__)
 
+ORG_ENTITY = "organization"
+TEAM_ENTITY = "team"
+PROJECT_ENTITY = "project"
+
+# Roles resolved during the current request, keyed by (user id, entity type, entity id).
+# None outside a role_cache_scope(), so background jobs always read the database.
+_role_memo = ContextVar("role_memo", default=None)
+_MISSING = object()
+
+
+@contextmanager
+def role_cache_scope():
+    """
+    Memoize role lookups for the duration of the block. RoleCacheMiddleware
+    opens one per request; Celery tasks or commands can open their own.
+    """
+    token = _role_memo.set({})
+    try:
+        yield
+    finally:
+        _role_memo.reset(token)
+
+
+def _memo_key(user, entity_type, entity):
+    # Users and entities may be passed as instances or primary keys
+    return (str(getattr(user, "pk", user)), entity_type, str(getattr(entity, "pk", entity)))
+
+
+def remember_role(user, entity_type, entity, role):
+    """Record a role already loaded elsewhere (e.g. with a membership row)."""
+    memo = _role_memo.get()
+    if memo is not None and user is not None and entity is not None:
+        memo[_memo_key(user, entity_type, entity)] = role
+
+
+def forget_role(user, entity_type, entity):
+    memo = _role_memo.get()
+    if memo is not None:
+        memo.pop(_memo_key(user, entity_type, entity), None)
+
+
+def _memoized_role(entity_type, user, entity, fetch):
+    memo = _role_memo.get()
+    if memo is None:
+        return fetch()
+    key = _memo_key(user, entity_type, entity)
+    role = memo.get(key, _MISSING)
+    if role is _MISSING:
+        role = memo[key] = fetch()
+    return role
+
 
 def _get_role_from_membership(ModelClass, **filters):
     """
@@ -35,7 +91,10 @@ def get_org_role(user, organization):
         logger.debug("User is None or not authenticated")
         return None
     try:
-        return _get_role_from_membership(OrganizationMembership, user=user, organization=organization)
+        return _memoized_role(
+            ORG_ENTITY, user, organization,
+            lambda: _get_role_from_membership(OrganizationMembership, user=user, organization=organization),
+        )
     except Exception as e:
         logger.error(f"Error getting org role: {str(e)}")
         return None
@@ -48,7 +107,10 @@ def get_team_role(user, team):
         logger.debug("User is None or not authenticated")
         return None
     try:
-        return _get_role_from_membership(TeamMembership, user=user, team=team)
+        return _memoized_role(
+            TEAM_ENTITY, user, team,
+            lambda: _get_role_from_membership(TeamMembership, user=user, team=team),
+        )
     except Exception as e:
         logger.error(f"Error getting team role: {str(e)}")
         return None
@@ -58,7 +120,84 @@ def get_project_role(user, project):
         logger.debug("User is None or not authenticated")
         return None
     try:
-        return _get_role_from_membership(ProjectMembership, user=user, project=project)
+        return _memoized_role(
+            PROJECT_ENTITY, user, project,
+            lambda: _get_role_from_membership(ProjectMembership, user=user, project=project),
+        )
     except Exception as e:
         logger.error(f"Error getting project role: {str(e)}")
         return None
+
+
+ProjectRoles = namedtuple("ProjectRoles", ["project", "team", "org"])
+NO_PROJECT_ROLES = ProjectRoles(None, None, None)
+
+
+def _known_roles(user, project):
+    """Roles for a project instance when the memo already holds all of them."""
+    memo = _role_memo.get()
+    if memo is None or not isinstance(project, Project):
+        return None
+    roles = []
+    for entity_type, entity in (
+        (PROJECT_ENTITY, project.pk),
+        (TEAM_ENTITY, project.team_id),
+        (ORG_ENTITY, project.organization_id),
+    ):
+        if entity is None:
+            roles.append(None)
+            continue
+        role = memo.get(_memo_key(user, entity_type, entity), _MISSING)
+        if role is _MISSING:
+            return None
+        roles.append(role)
+    return ProjectRoles(*roles)
+
+
+def get_project_roles(user, project):
+    """
+    Return the user's (project, team, org) roles for a project in one query.
+    Accepts project instance or pk. Roles the user does not hold are None,
+    as are team/org roles for a project without a team/organization.
+    """
+    if project is None:
+        logger.debug("Project is None")
+        return NO_PROJECT_ROLES
+    if user is None or not getattr(user, "is_authenticated", False):
+        logger.debug("User is None or not authenticated")
+        return NO_PROJECT_ROLES
+
+    known = _known_roles(user, project)
+    if known is not None:
+        return known
+
+    # One SELECT on the project row with a correlated subquery per membership table
+    try:
+        row = (
+            Project.objects.filter(pk=getattr(project, "pk", project))
+            .annotate(
+                project_role=Subquery(
+                    ProjectMembership.objects.filter(user=user, project=OuterRef("pk")).values("role")[:1]
+                ),
+                team_role=Subquery(
+                    TeamMembership.objects.filter(user=user, team=OuterRef("team_id")).values("role")[:1]
+                ),
+                org_role=Subquery(
+                    OrganizationMembership.objects.filter(user=user, organization=OuterRef("organization_id")).values("role")[:1]
+                ),
+            )
+            .values("pk", "team_id", "organization_id", "project_role", "team_role", "org_role")
+            .first()
+        )
+    except Exception as e:
+        logger.error(f"Error getting project roles: {str(e)}")
+        return NO_PROJECT_ROLES
+    if row is None:
+        logger.debug(f"Project not found: {project}")
+        return NO_PROJECT_ROLES
+
+    remember_role(user, PROJECT_ENTITY, row["pk"], row["project_role"])
+    remember_role(user, TEAM_ENTITY, row["team_id"], row["team_role"])
+    remember_role(user, ORG_ENTITY, row["organization_id"], row["org_role"])
+    return ProjectRoles(row["project_role"], row["team_role"], row["org_role"])
+
@@ -1,19 +1,23 @@
 from rest_framework.permissions import BasePermission
 
+from core.constants.project_constant import PROJECT_ROLE_HIERARCHY
+from core.permissions.base import get_project_roles
+from core.permissions.mixins import RoleCheckerMixin
 from core.permissions.organization import IsOrganizationOwner
-from core.permissions.project import IsProjectManager, IsProjectOwner
 from core.permissions.team import IsTeamManager, IsTeamOwner
 
 
-class IsOrgOwnerOrProjectManager(BasePermission):
+class IsOrgOwnerOrProjectManager(BasePermission, RoleCheckerMixin):
     message = "Only the organization owner or project manager can perform this action."
     
     def has_object_permission(self, request, view, project):
-        org = project.organization
+        if not getattr(request.user, "is_authenticated", False):
+            return False
+        roles = get_project_roles(request.user, project)
 
         return bool(
-            IsOrganizationOwner().has_object_permission(request, view, org)
-            or IsProjectManager().has_object_permission(request, view, project)
+            roles.org == "OWNER"
+            or self.has_minimum_role(roles.project, "MANAGER", PROJECT_ROLE_HIERARCHY)
         )
 
 
@@ -41,15 +45,17 @@ class IsOrgOwnerOrTeamManager(BasePermission):
         )
         
         
-class IsOrgOwnerOrProjectOwner(BasePermission):
+class IsOrgOwnerOrProjectOwner(BasePermission, RoleCheckerMixin):
     message = "Only the organization owner or project owner can perform this action."
     
     def has_object_permission(self, request, view, project):
-        org = project.organization
+        if not getattr(request.user, "is_authenticated", False):
+            return False
+        roles = get_project_roles(request.user, project)
         
         return bool(
-            IsOrganizationOwner().has_object_permission(request, view, org)
-            or IsProjectOwner().has_object_permission(request, view, project)
+            roles.org == "OWNER"
+            or self.has_minimum_role(roles.project, "OWNER", PROJECT_ROLE_HIERARCHY)
         )
         
         
\ No newline at end of file
@@ -1,7 +1,7 @@
 from rest_framework.permissions import BasePermission
 
 from core.constants.project_constant import PROJECT_ROLE_HIERARCHY
-from core.permissions.base import get_project_role
+from core.permissions.base import get_project_roles
 from core.permissions.mixins import RoleCheckerMixin
 
 
@@ -11,7 +11,7 @@ class IsProjectMember(BasePermission):
     def has_object_permission(self, request, view, project):
         if not getattr(request.user, "is_authenticated", False):
             return False
-        return get_project_role(request.user, project) is not None
+        return get_project_roles(request.user, project).project is not None
 
 
 class IsProjectContributor(BasePermission, RoleCheckerMixin):
@@ -20,7 +20,7 @@ class IsProjectContributor(BasePermission, RoleCheckerMixin):
     def has_object_permission(self, request, view, project):
         if not getattr(request.user, "is_authenticated", False):
             return False
-        role = get_project_role(request.user, project)
+        role = get_project_roles(request.user, project).project
         return self.has_minimum_role(role, "CONTRIBUTOR", PROJECT_ROLE_HIERARCHY)
 
 
@@ -30,7 +30,7 @@ class IsProjectManager(BasePermission, RoleCheckerMixin):
     def has_object_permission(self, request, view, project):
         if not getattr(request.user, "is_authenticated", False):
             return False
-        role = get_project_role(request.user, project)
+        role = get_project_roles(request.user, project).project
         return self.has_minimum_role(role, "MANAGER", PROJECT_ROLE_HIERARCHY)
     
 
@@ -40,5 +40,5 @@ class IsProjectOwner(BasePermission, RoleCheckerMixin):
     def has_object_permission(self, request, view, project):
         if not getattr(request.user, "is_authenticated", False):
             return False
-        role = get_project_role(request.user, project)
+        role = get_project_roles(request.user, project).project
         return self.has_minimum_role(role, "OWNER", PROJECT_ROLE_HIERARCHY)
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app.organizations.models import OrganizationMembership
+from app.teams.models import TeamMembership
+from app.projects.models import ProjectMembership
+
+from core.permissions.base import ORG_ENTITY, TEAM_ENTITY, PROJECT_ENTITY, forget_role
+
+
+# =========================================================
+# REQUEST ROLE MEMO INVALIDATION
+# =========================================================
+# Role changes, joins and removals must be visible to later checks in the
+# same request.
+
+@receiver(post_save, sender=OrganizationMembership)
+@receiver(post_delete, sender=OrganizationMembership)
+def forget_org_role(sender, instance, **kwargs):
+    forget_role(instance.user_id, ORG_ENTITY, instance.organization_id)
+
+
+@receiver(post_save, sender=TeamMembership)
+@receiver(post_delete, sender=TeamMembership)
+def forget_team_role(sender, instance, **kwargs):
+    forget_role(instance.user_id, TEAM_ENTITY, instance.team_id)
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def forget_project_role(sender, instance, **kwargs):
+    forget_role(instance.user_id, PROJECT_ENTITY, instance.project_id)
@@ -0,0 +1,154 @@
+import json
+import os
+import socket
+import uuid
+import logging
+
+from celery import shared_task
+
+from django.conf import settings
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+
+from core.middleware.activity_sinks import log_activity_record
+from core.models import ActivityLog
+from core.utils.partition_utils import ensure_partitions, is_partitioned
+from core.utils.rollup_utils import prune_minute_rollups, rollup_activity_logs
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deriving ActivityLog ids from stream entry ids, so a
+# redelivered entry maps onto the row that was already inserted.
+ACTIVITY_STREAM_NAMESPACE = uuid.UUID("3c4d1f0e-6b1a-4f8e-9a57-6a2f5d0c9e21")
+
+
+def _ensure_consumer_group(client, stream, group):
+    try:
+        client.xgroup_create(stream, group, id="0", mkstream=True)
+        logger.info(f"Created consumer group {group} on stream {stream}")
+    except Exception as e:
+        # BUSYGROUP: the group already exists
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _decode_entry(stream, entry_id, fields):
+    record = json.loads(fields["record"])
+    if record.get("timestamp"):
+        record["timestamp"] = parse_datetime(record["timestamp"])
+    record["id"] = uuid.uuid5(ACTIVITY_STREAM_NAMESPACE, f"{stream}:{entry_id}")
+    return record
+
+
+def _write_entries(client, stream, group, entries):
+    """
+    Insert a batch of stream entries, then acknowledge them.
+    Entries are only acked after the rows are committed; a crash in between
+    leaves them pending and they are re-claimed later. Re-inserting them is
+    a no-op because their ids are derived from the entry id.
+    """
+    records = []
+    ack_ids = []
+    for entry_id, fields in entries:
+        ack_ids.append(entry_id)
+        try:
+            records.append(_decode_entry(stream, entry_id, fields))
+        except Exception as e:
+            # Malformed entries can never succeed; ack them so they do not block the group
+            logger.error(f"Dropping malformed activity stream entry {entry_id}: {str(e)}")
+
+    if records:
+        ActivityLog.objects.bulk_create(
+            [ActivityLog(**record) for record in records],
+            ignore_conflicts=True,
+        )
+        for record in records:
+            log_activity_record(record)
+
+    if ack_ids:
+        client.xack(stream, group, *ack_ids)
+    return len(records)
+
+
+@shared_task(bind=True)
+def consume_activity_stream(self, batch_size=500, max_batches=20):
+    """
+    Celery task to move activity records from the Redis stream into ActivityLog.
+    Pending entries idle for longer than ACTIVITY_LOG_STREAM_CLAIM_IDLE_MS
+    (left behind by a crashed consumer) are claimed and written first.
+    """
+    client = settings.REDIS_CLIENT
+    stream = settings.ACTIVITY_LOG_STREAM
+    group = settings.ACTIVITY_LOG_STREAM_GROUP
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+    _ensure_consumer_group(client, stream, group)
+
+    written = 0
+    try:
+        # 1. Recover entries delivered to consumers that never acked them
+        start_id = "0-0"
+        for _ in range(max_batches):
+            result = client.xautoclaim(
+                stream,
+                group,
+                consumer,
+                min_idle_time=settings.ACTIVITY_LOG_STREAM_CLAIM_IDLE_MS,
+                start_id=start_id,
+                count=batch_size,
+            )
+            start_id, entries = result[0], result[1]
+            if entries:
+                written += _write_entries(client, stream, group, entries)
+            if start_id == "0-0":
+                break
+
+        # 2. Consume new entries
+        for _ in range(max_batches):
+            response = client.xreadgroup(group, consumer, {stream: ">"}, count=batch_size)
+            if not response:
+                break
+            _, entries = response[0]
+            if not entries:
+                break
+            written += _write_entries(client, stream, group, entries)
+
+    except Exception as e:
+        # Unacked entries stay pending and are re-claimed on a later run
+        logger.error(f"Error consuming activity stream {stream}: {str(e)}", exc_info=True)
+
+    if written:
+        logger.info(f"Consumed {written} activity records from stream {stream}")
+    return {"written": written}
+
+
+@shared_task(bind=True)
+def ensure_activity_log_partitions(self):
+    """
+    Celery task to create activity log partitions ahead of time.
+    """
+    if not is_partitioned(connection):
+        return {"created": []}
+    created = ensure_partitions(
+        connection,
+        settings.ACTIVITY_LOG_PARTITION_INTERVAL,
+        settings.ACTIVITY_LOG_PARTITIONS_AHEAD,
+    )
+    if created:
+        logger.info(f"Created activity log partitions: {', '.join(created)}")
+    return {"created": created}
+
+
+@shared_task(bind=True)
+def rollup_activity_logs_task(self):
+    """
+    Celery task to fold new activity logs into the minute/hour/day rollups.
+    """
+    high_water_mark = rollup_activity_logs(
+        lag_seconds=settings.ACTIVITY_ROLLUP_LAG_SECONDS,
+        max_window_seconds=settings.ACTIVITY_ROLLUP_WINDOW_SECONDS,
+    )
+    pruned = prune_minute_rollups(settings.ACTIVITY_ROLLUP_MINUTE_RETENTION_DAYS)
+    if pruned:
+        logger.info(f"Pruned {pruned} minute activity rollups")
+    return {"high_water_mark": high_water_mark.isoformat() if high_water_mark else None}
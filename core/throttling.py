@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import math
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_KEY_PREFIX = "throttle:"
+
+# KEYS[1] = bucket hash; ARGV[1] = capacity, ARGV[2] = refill rate (tokens/second)
+# Returns {allowed, tokens left, seconds until the next token}. Uses the Redis
+# clock so app servers with skewed clocks share one bucket correctly.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+_script = None
+
+
+def _token_bucket():
+    global _script
+    if _script is None:
+        _script = settings.REDIS_CLIENT.register_script(TOKEN_BUCKET_LUA)
+    return _script
+
+
+def take_token(key, capacity, refill_per_second):
+    """
+    Take one token from the bucket at `key` in a single atomic call.
+    Returns (allowed, seconds to wait before retrying).
+    """
+    allowed, _, wait = _token_bucket()(
+        keys=[key], args=[capacity, refill_per_second], client=settings.REDIS_CLIENT
+    )
+    return bool(allowed), float(wait)
+
+
+class RedisTokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket shared by every worker through Redis. A rate of "5/min"
+    allows bursts of 5 and refills one token every 12 seconds.
+
+    The rate is looked up as "<view.throttle_scope>_<kind>" in
+    REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]; a scope without a rate is not
+    limited. If Redis is unreachable requests are let through rather than
+    locking everyone out of authentication.
+    """
+
+    kind = None
+    cache_format = f"{THROTTLE_KEY_PREFIX}%(scope)s:%(ident)s"
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request
+        self.rate = None
+
+    def get_rate(self):
+        return self.THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+            return True
+
+        throttle_scope = getattr(view, "throttle_scope", None)
+        if not throttle_scope:
+            return True
+        self.scope = f"{throttle_scope}_{self.kind}"
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        ident = self.get_ident_for(request)
+        if ident is None:
+            return True
+        key = self.cache_format % {"scope": self.scope, "ident": ident}
+
+        try:
+            allowed, self._wait = take_token(key, self.num_requests, self.num_requests / self.duration)
+        except Exception as e:
+            logger.error(f"Rate limiter unavailable, allowing request: {str(e)}")
+            return True
+
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for {self.scope}: {ident}")
+        return allowed
+
+    def wait(self):
+        return math.ceil(self._wait) if getattr(self, "_wait", 0) else None
+
+    def get_ident_for(self, request):
+        raise NotImplementedError(".get_ident_for() must be overridden")
+
+
+class IPRateThrottle(RedisTokenBucketThrottle):
+    """Limits by client IP: REMOTE_ADDR, or X-Forwarded-For behind NUM_PROXIES proxies."""
+
+    kind = "ip"
+
+    def get_ident_for(self, request):
+        return self.get_ident(request)
+
+
+class IdentifierRateThrottle(RedisTokenBucketThrottle):
+    """
+    Limits by the email/phone a request targets, so one address cannot be
+    flooded with OTPs from many IPs. The identifier is hashed in the key.
+    """
+
+    kind = "identifier"
+    identifier_fields = ("identifier", "email", "phone_number")
+
+    def get_ident_for(self, request):
+        try:
+            data = request.data
+        except Exception:
+            return None
+        for field in self.identifier_fields:
+            value = data.get(field) if hasattr(data, "get") else None
+            if value:
+                return hashlib.sha256(str(value).strip().lower().encode("utf-8")).hexdigest()[:32]
+        return None
+
+
+class UserRateThrottle(RedisTokenBucketThrottle):
+    """Limits by authenticated user, falling back to IP for anonymous requests."""
+
+    kind = "user"
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return self.get_ident(request)
@@ -0,0 +1,113 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMATS = (EXPORT_FORMAT_NDJSON, EXPORT_FORMAT_CSV)
+
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+    EXPORT_FORMAT_CSV: "text/csv",
+}
+
+EXPORT_FIELDS = [
+    "id",
+    "user_id",
+    "username",
+    "action",
+    "resource_type",
+    "resource_id",
+    "resource_name",
+    "description",
+    "method",
+    "path",
+    "query_params",
+    "request_body",
+    "status_code",
+    "response_time_ms",
+    "ip_address",
+    "user_agent",
+    "timestamp",
+    "extra_data",
+    "sample_rate",
+]
+JSON_FIELDS = {"query_params", "request_body", "extra_data"}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _LineBuffer:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Rows as dicts of EXPORT_FIELDS, read through a server-side cursor
+    `chunk_size` rows at a time, oldest first.
+    """
+    return queryset.order_by("timestamp", "id").values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
+
+
+def iter_csv(rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(EXPORT_FIELDS)
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield writer.writerow([
+            encoder.encode(row[field]) if field in JSON_FIELDS and row[field] is not None else row[field]
+            for field in EXPORT_FIELDS
+        ])
+
+
+def iter_blocks(chunks, block_size=64 * 1024):
+    """Join small str chunks into blocks of about `block_size` characters."""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= block_size:
+            yield "".join(pending)
+            pending, pending_size = [], 0
+    if pending:
+        yield "".join(pending)
+
+
+def iter_gzip(blocks, level=6):
+    """Gzip a stream of str blocks incrementally, without buffering the whole output."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        data = compressor.compress(block.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(queryset, export_format=EXPORT_FORMAT_NDJSON, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Serialized export of `queryset` in ~64KB blocks: str, or gzip bytes
+    when `compress` is set.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    rows = iter_rows(queryset, chunk_size=chunk_size)
+    lines = iter_ndjson(rows) if export_format == EXPORT_FORMAT_NDJSON else iter_csv(rows)
+    blocks = iter_blocks(lines)
+    return iter_gzip(blocks) if compress else blocks
+
+
+def export_filename(stem, export_format, compress):
+    name = f"{stem}.{export_format}"
+    return f"{name}.gz" if compress else name
@@ -3,6 +3,10 @@ import logging
 from rest_framework.exceptions import NotFound, ValidationError
 
 from app.organizations.models import Organization, OrganizationMembership
+from app.projects.models import Project
+from app.teams.models import Team
+from core.permissions.base import ORG_ENTITY, remember_role
+from core.utils.query_utils import count_subquery
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +37,7 @@ def get_org_membership(org_id, user):
     if org_id and user:
         try:
             obj = OrganizationMembership.objects.get(organization_id=org_id, user=user)
+            remember_role(user, ORG_ENTITY, org_id, obj.role)
             if not obj:
                 raise NotFound("Organization not found")
             return obj
@@ -50,3 +55,14 @@ def get_all_org_memberships(org_id):
         except Exception as e:
             raise Exception(e)
     raise ValidationError("Organization ID is required")
+
+def with_org_counts(queryset):
+    """
+    Annotate member/team/project counts for OrganizationSerializer and load
+    the owner, so a page of organizations costs one query.
+    """
+    return queryset.select_related("owner").annotate(
+        member_count=count_subquery(OrganizationMembership, "organization"),
+        team_count=count_subquery(Team, "organization"),
+        project_count=count_subquery(Project, "organization"),
+    )
@@ -0,0 +1,217 @@
+import re
+import logging
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_LOG_TABLE = "core_activitylog"
+
+INTERVAL_DAY = "day"
+INTERVAL_MONTH = "month"
+PARTITION_INTERVALS = (INTERVAL_DAY, INTERVAL_MONTH)
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def period_start(value, interval):
+    """
+    Returns the UTC start of the day/month containing `value`.
+    """
+    value = value.astimezone(dt_timezone.utc)
+    if interval == INTERVAL_DAY:
+        return datetime(value.year, value.month, value.day, tzinfo=dt_timezone.utc)
+    if interval == INTERVAL_MONTH:
+        return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+
+def next_period(start, interval):
+    if interval == INTERVAL_DAY:
+        return datetime.fromordinal(start.toordinal() + 1).replace(tzinfo=dt_timezone.utc)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start, interval, table=ACTIVITY_LOG_TABLE):
+    if interval == INTERVAL_DAY:
+        return f"{table}_p{start:%Y%m%d}"
+    return f"{table}_p{start:%Y%m}"
+
+
+def _parse_bound(value):
+    value = value.strip().strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value)
+
+
+def is_partitioned(connection, table=ACTIVITY_LOG_TABLE):
+    """
+    Returns True if `table` is a PostgreSQL partitioned table.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s
+            """,
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection, table=ACTIVITY_LOG_TABLE):
+    """
+    Returns the partitions of `table` ordered by lower bound, as dicts with
+    name, lower, upper (None for MINVALUE/MAXVALUE), is_default and the
+    planner's row estimate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound, reltuples in rows:
+        partition = {
+            "name": name,
+            "lower": None,
+            "upper": None,
+            "is_default": bound == "DEFAULT",
+            "estimated_rows": max(int(reltuples), 0),
+        }
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            partition["lower"] = _parse_bound(match.group(1))
+            partition["upper"] = _parse_bound(match.group(2))
+        partitions.append(partition)
+
+    far_past = datetime.min.replace(tzinfo=dt_timezone.utc)
+    partitions.sort(key=lambda p: (p["is_default"], p["lower"] or far_past))
+    return partitions
+
+
+def _overlaps(partitions, start, end):
+    for partition in partitions:
+        if partition["is_default"]:
+            continue
+        lower, upper = partition["lower"], partition["upper"]
+        if (lower is None or lower < end) and (upper is None or upper > start):
+            return True
+    return False
+
+
+def create_partition(connection, start, interval, table=ACTIVITY_LOG_TABLE):
+    """
+    Creates the partition covering [start, next period). Rows that already
+    landed in the default partition for that range are moved into it.
+    Returns the partition name.
+    """
+    end = next_period(start, interval)
+    name = partition_name(start, interval, table)
+    qn = connection.ops.quote_name
+    default_name = f"{table}_default"
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [default_name])
+        has_default = cursor.fetchone()[0] is not None
+
+        stray_rows = False
+        if has_default:
+            cursor.execute(
+                f'SELECT 1 FROM {qn(default_name)} WHERE "timestamp" >= %s AND "timestamp" < %s LIMIT 1',
+                [start, end],
+            )
+            stray_rows = cursor.fetchone() is not None
+
+        if not stray_rows:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        else:
+            logger.warning(f"Moving rows from {default_name} into new partition {name}")
+            cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {qn(default_name)}
+                    WHERE "timestamp" >= %s AND "timestamp" < %s
+                    RETURNING *
+                )
+                INSERT INTO {qn(name)} SELECT * FROM moved
+                """,
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+
+    logger.info(f"Created partition {name} for [{start.isoformat()}, {end.isoformat()})")
+    return name
+
+
+def ensure_partitions(connection, interval, ahead, now=None, table=ACTIVITY_LOG_TABLE):
+    """
+    Makes sure partitions exist for the current period and `ahead` periods
+    after it. Periods already covered by an existing partition are skipped.
+    Returns the names of the partitions created.
+    """
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(f"Unknown partition interval: {interval}")
+
+    now = now or datetime.now(dt_timezone.utc)
+    partitions = list_partitions(connection, table)
+    start = period_start(now, interval)
+
+    created = []
+    for _ in range(ahead + 1):
+        end = next_period(start, interval)
+        if not _overlaps(partitions, start, end):
+            created.append(create_partition(connection, start, interval, table))
+        start = end
+    return created
+
+
+def expired_partitions(connection, cutoff, table=ACTIVITY_LOG_TABLE):
+    """Partitions whose upper bound is at or before `cutoff`."""
+    return [
+        p for p in list_partitions(connection, table)
+        if not p["is_default"] and p["upper"] is not None and p["upper"] <= cutoff
+    ]
+
+
+def drop_partitions_before(connection, cutoff, detach=False, table=ACTIVITY_LOG_TABLE):
+    """
+    Drops (or detaches) every partition whose upper bound is at or before
+    `cutoff`. Whole partitions are removed, so the cost does not depend on
+    how many rows they hold. Returns the affected partitions.
+    """
+    qn = connection.ops.quote_name
+    expired = expired_partitions(connection, cutoff, table)
+
+    with connection.cursor() as cursor:
+        for partition in expired:
+            if detach:
+                cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(partition['name'])}")
+                logger.info(f"Detached partition {partition['name']}")
+            else:
+                cursor.execute(f"DROP TABLE {qn(partition['name'])}")
+                logger.info(f"Dropped partition {partition['name']}")
+    return expired
@@ -3,6 +3,8 @@ import logging
 from rest_framework.exceptions import NotFound, ValidationError
 
 from app.projects.models import Project, ProjectMembership
+from core.permissions.base import PROJECT_ENTITY, remember_role
+from core.utils.query_utils import count_subquery
 
 logger = logging.getLogger(__name__)
 
@@ -44,9 +46,19 @@ def get_project_membership(project_id, user):
     if project_id and user:
         try:
             obj = ProjectMembership.objects.get(project=project_id, user=user)
+            remember_role(user, PROJECT_ENTITY, project_id, obj.role)
             if not obj:
                 raise ValidationError("user is not a member of this project")
             return obj
         except Exception as e:
             raise Exception(e)
     raise ValidationError("project ID and user are required")
+
+def with_project_counts(queryset):
+    """
+    Annotate member_count for ProjectSerializer and load the related rows it
+    prints, so a page of projects costs one query instead of one per row.
+    """
+    return queryset.select_related("organization", "team", "created_by").annotate(
+        member_count=count_subquery(ProjectMembership, "project"),
+    )
@@ -0,0 +1,18 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, fk_field, **filters):
+    """
+    Correlated COUNT(*) of `model` rows pointing at the outer row through
+    `fk_field`, for .annotate(). Unlike Count() over joins, several of these
+    on one queryset do not multiply each other's rows.
+    """
+    counts = (
+        model.objects.filter(**{fk_field: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(fk_field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
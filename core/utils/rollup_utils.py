@@ -0,0 +1,214 @@
+import logging
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, IntegerField, Max, Q, Sum, Value
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from core.constants.activity_constant import LATENCY_BUCKETS_MS, ROLLUP_DIMENSIONS
+from core.models import ActivityLog, ActivityRollup, ActivityRollupCheckpoint
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_CHECKPOINT_NAME = "activity_rollup"
+
+LATENCY_BUCKET_FIELDS = [f"latency_le_{edge}" for edge in LATENCY_BUCKETS_MS] + [
+    f"latency_gt_{LATENCY_BUCKETS_MS[-1]}"
+]
+COUNTER_FIELDS = ["count", "error_count", "latency_count", "latency_sum_ms"] + LATENCY_BUCKET_FIELDS
+
+
+def truncate_bucket(value, granularity):
+    if granularity == "minute":
+        return value.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+
+def _weighted_count(condition=None):
+    """
+    Sum of 1/sample_rate over matching rows, i.e. the estimated number of
+    requests including those a sampling policy did not log.
+    """
+    weight = ExpressionWrapper(Value(1.0) / F("sample_rate"), output_field=FloatField())
+    return Sum(weight, filter=condition, default=0.0)
+
+
+def _latency_bucket_aggregates():
+    """
+    Weighted count per histogram bucket, evaluated in the same pass as
+    the other counters.
+    """
+    aggregates = {}
+    lower = None
+    for edge, field in zip(LATENCY_BUCKETS_MS, LATENCY_BUCKET_FIELDS):
+        condition = Q(response_time_ms__lte=edge)
+        if lower is not None:
+            condition &= Q(response_time_ms__gt=lower)
+        aggregates[field] = _weighted_count(condition)
+        lower = edge
+    aggregates[LATENCY_BUCKET_FIELDS[-1]] = _weighted_count(Q(response_time_ms__gt=lower))
+    return aggregates
+
+
+def _aggregate_minutes(start, end):
+    """
+    One grouped query over the raw rows in [start, end), per minute and
+    rollup key. Counters are weighted by 1/sample_rate and rounded.
+    """
+    rows = (
+        ActivityLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        .order_by()
+        .annotate(
+            bucket=TruncMinute("timestamp"),
+            status_class=ExpressionWrapper(F("status_code") / 100, output_field=IntegerField()),
+        )
+        .values("bucket", *ROLLUP_DIMENSIONS)
+        .annotate(
+            count=_weighted_count(),
+            error_count=_weighted_count(Q(status_code__gte=400)),
+            latency_count=_weighted_count(Q(response_time_ms__isnull=False)),
+            latency_sum_ms=Sum(
+                ExpressionWrapper(F("response_time_ms") / F("sample_rate"), output_field=FloatField()),
+                default=0.0,
+            ),
+            latency_max_ms=Max("response_time_ms"),
+            **_latency_bucket_aggregates(),
+        )
+    )
+    for row in rows:
+        for field in COUNTER_FIELDS:
+            if field != "latency_sum_ms":
+                row[field] = round(row[field])
+        yield row
+
+
+def _merge(target, row):
+    for field in COUNTER_FIELDS:
+        target[field] = (target.get(field) or 0) + (row[field] or 0)
+    if row["latency_max_ms"] is not None:
+        current = target.get("latency_max_ms")
+        target["latency_max_ms"] = row["latency_max_ms"] if current is None else max(current, row["latency_max_ms"])
+
+
+def _upsert(granularity, grouped):
+    """
+    Add `grouped` counters ({(bucket, *dims): counters}) onto the stored
+    rollup rows. Callers hold the checkpoint lock, so there is a single writer.
+    """
+    if not grouped:
+        return 0
+
+    buckets = {key[0] for key in grouped}
+    existing = {
+        (row.bucket, row.resource_type, row.action, row.method, row.status_class): row
+        for row in ActivityRollup.objects.filter(granularity=granularity, bucket__in=buckets)
+    }
+
+    to_create = []
+    to_update = []
+    for key, counters in grouped.items():
+        row = existing.get(key)
+        if row is None:
+            bucket, resource_type, action, method, status_class = key
+            to_create.append(ActivityRollup(
+                granularity=granularity,
+                bucket=bucket,
+                resource_type=resource_type,
+                action=action,
+                method=method,
+                status_class=status_class,
+                **counters,
+            ))
+            continue
+        merged = {field: getattr(row, field) for field in COUNTER_FIELDS + ["latency_max_ms"]}
+        _merge(merged, counters)
+        for field, value in merged.items():
+            setattr(row, field, value)
+        to_update.append(row)
+
+    ActivityRollup.objects.bulk_create(to_create, batch_size=500)
+    ActivityRollup.objects.bulk_update(to_update, COUNTER_FIELDS + ["latency_max_ms"], batch_size=500)
+    return len(to_create) + len(to_update)
+
+
+def _rollup_window(start, end):
+    minute_rows = list(_aggregate_minutes(start, end))
+
+    written = 0
+    for granularity in ("minute", "hour", "day"):
+        grouped = {}
+        for row in minute_rows:
+            key = (truncate_bucket(row["bucket"], granularity),) + tuple(row[d] for d in ROLLUP_DIMENSIONS)
+            _merge(grouped.setdefault(key, {"latency_max_ms": None}), row)
+        written += _upsert(granularity, grouped)
+    return len(minute_rows), written
+
+
+def rollup_activity_logs(lag_seconds=120, max_window_seconds=3600, max_windows=24):
+    """
+    Fold ActivityLog rows between the stored high-water mark and
+    `now - lag_seconds` into ActivityRollup, one window at a time.
+
+    The lag leaves room for buffered/streamed writes to land before their
+    minute is rolled up; rows that arrive later than that are not counted.
+    Returns the new high-water mark.
+    """
+    end_limit = truncate_bucket(timezone.now() - timedelta(seconds=lag_seconds), "minute")
+
+    for _ in range(max_windows):
+        with transaction.atomic():
+            checkpoint, _ = ActivityRollupCheckpoint.objects.select_for_update().get_or_create(
+                name=ROLLUP_CHECKPOINT_NAME
+            )
+            start = checkpoint.high_water_mark
+            if start is None:
+                first = ActivityLog.objects.order_by("timestamp").values_list("timestamp", flat=True).first()
+                if first is None:
+                    return None
+                start = truncate_bucket(first, "minute")
+
+            end = min(start + timedelta(seconds=max_window_seconds), end_limit)
+            if end <= start:
+                return start
+
+            minutes, written = _rollup_window(start, end)
+            checkpoint.high_water_mark = end
+            checkpoint.save(update_fields=["high_water_mark", "updated_at"])
+
+        logger.debug(f"Rolled up activity logs [{start}, {end}): {minutes} minute groups, {written} rows")
+        if end >= end_limit:
+            return end
+    return end
+
+
+def prune_minute_rollups(retention_days):
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = ActivityRollup.objects.filter(granularity="minute", bucket__lt=cutoff).delete()
+    return deleted
+
+
+def estimate_percentile(bucket_counts, percentile, edges=LATENCY_BUCKETS_MS):
+    """
+    Estimate a latency percentile (0-100) from non-cumulative histogram
+    counts ordered like `edges` plus an overflow bucket, interpolating
+    linearly inside the bucket. The overflow bucket reports its lower edge.
+    """
+    total = sum(bucket_counts)
+    if total == 0:
+        return None
+
+    rank = total * percentile / 100.0
+    seen = 0
+    lower = 0.0
+    for edge, count in zip(edges, bucket_counts):
+        if count and seen + count >= rank:
+            return round(lower + (edge - lower) * (rank - seen) / count, 2)
+        seen += count
+        lower = float(edge)
+    return float(edges[-1])
@@ -2,7 +2,10 @@ import logging
 
 from rest_framework.exceptions import NotFound, ValidationError
 
+from app.projects.models import Project
 from app.teams.models import Team, TeamMembership
+from core.permissions.base import TEAM_ENTITY, remember_role
+from core.utils.query_utils import count_subquery
 
 logger = logging.getLogger(__name__)
 
@@ -44,9 +47,20 @@ def get_team_membership(team_id, user):
     if team_id and user:
         try:
             obj = TeamMembership.objects.get(team_id=team_id, user=user)
+            remember_role(user, TEAM_ENTITY, team_id, obj.role)
             if not obj:
                 raise ValidationError("User is not a member of this team")
             return obj
         except Exception as e:
             raise Exception(e)
     raise ValidationError("Team ID and user are required")
+
+def with_team_counts(queryset):
+    """
+    Annotate member_count and project_count for TeamSerializer and load the
+    related rows it prints, so a page of teams costs one query.
+    """
+    return queryset.select_related("organization", "created_by").annotate(
+        member_count=count_subquery(TeamMembership, "team"),
+        project_count=count_subquery(Project, "team"),
+    )
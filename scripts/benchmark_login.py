@@ -0,0 +1,106 @@
+"""
+Benchmark login/logout throughput of the Redis session store.
+
+Compares issuing each session write as its own command (how login used to
+store tokens) with services.token_service.create_session / end_session,
+which send all keys for a login or logout in one pipeline round-trip.
+Sessions belong to fake "benchmark-<n>" user ids and are removed afterwards.
+
+Usage:
+    python scripts/benchmark_login.py            # 1000 logins
+    python scripts/benchmark_login.py 10000      # custom login count
+"""
+
+import json
+import os
+import sys
+import time
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from types import SimpleNamespace
+
+from django.conf import settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from services.token_cache import token_digest
+from services.token_service import (
+    ACCESS_TOKEN_TTL, REDIS_ACCESS_TOKEN_PREFIX, REDIS_KEY_PREFIX, REDIS_USER_SESSIONS_PREFIX,
+    REFRESH_TOKEN_TTL, create_session, end_session,
+)
+
+redis_client = settings.REDIS_CLIENT
+
+
+def sequential_login(user_id, refresh, access):
+    now = int(time.time())
+    session_id = token_digest(refresh)
+    index_key = f"{REDIS_USER_SESSIONS_PREFIX}{user_id}"
+    redis_client.setex(f"{REDIS_KEY_PREFIX}{session_id}", REFRESH_TOKEN_TTL, str(user_id))
+    redis_client.setex(f"{REDIS_ACCESS_TOKEN_PREFIX}{token_digest(access)}", ACCESS_TOKEN_TTL, str(user_id))
+    redis_client.hset(index_key, session_id, json.dumps({"created_at": now, "refreshed_at": now, "access": []}))
+    redis_client.expire(index_key, REFRESH_TOKEN_TTL)
+
+
+def sequential_logout(user_id, refresh, access):
+    session_id = token_digest(refresh)
+    redis_client.delete(f"{REDIS_KEY_PREFIX}{session_id}")
+    redis_client.delete(f"{REDIS_ACCESS_TOKEN_PREFIX}{token_digest(access)}")
+    redis_client.hdel(f"{REDIS_USER_SESSIONS_PREFIX}{user_id}", session_id)
+
+
+def run(label, sessions, login, logout):
+    started = time.perf_counter()
+    for user_id, refresh, access in sessions:
+        login(user_id, refresh, access)
+    login_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for user_id, refresh, access in sessions:
+        logout(user_id, refresh, access)
+    logout_seconds = time.perf_counter() - started
+
+    count = len(sessions)
+    print(f"\n  {label}:")
+    print(f"    login:   {count / login_seconds:8.0f} /s  ({login_seconds * 1000 / count:.3f} ms each)")
+    print(f"    logout:  {count / logout_seconds:8.0f} /s  ({logout_seconds * 1000 / count:.3f} ms each)")
+    return login_seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print(f"\nGenerating {count} token pairs...")
+    started = time.perf_counter()
+    sessions = []
+    for n in range(count):
+        refresh = RefreshToken.for_user(SimpleNamespace(id=n))
+        sessions.append((f"benchmark-{n}", str(refresh), str(refresh.access_token)))
+    signing_seconds = time.perf_counter() - started
+    print(f"  JWT signing: {count / signing_seconds:.0f} pairs/s ({signing_seconds * 1000 / count:.3f} ms each)")
+
+    try:
+        before = run("sequential commands", sessions, sequential_login, sequential_logout)
+        after = run(
+            "session store pipeline",
+            sessions,
+            lambda user_id, refresh, access: create_session(user_id, refresh, access),
+            lambda user_id, refresh, access: end_session(user_id, refresh, access),
+        )
+    finally:
+        keys = [f"{REDIS_USER_SESSIONS_PREFIX}{user_id}" for user_id, _, _ in sessions]
+        for _, refresh, access in sessions:
+            keys += [f"{REDIS_KEY_PREFIX}{token_digest(refresh)}", f"{REDIS_ACCESS_TOKEN_PREFIX}{token_digest(access)}"]
+        for start in range(0, len(keys), 1000):
+            redis_client.delete(*keys[start:start + 1000])
+
+    print(f"\n  Login Redis time: {before * 1000 / count:.3f} -> {after * 1000 / count:.3f} ms per login")
+    print(f"  End-to-end (signing + store): {count / (signing_seconds + before):.0f} -> {count / (signing_seconds + after):.0f} logins/s\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark Redis memory per session for full-JWT keys vs fingerprint keys.
+
+Each session is one access key and one refresh key, stored the way
+services.token_service stores them. Keys are written under a
+"benchmark:" prefix and removed afterwards.
+
+Usage:
+    python scripts/benchmark_token_keys.py            # 1000 sessions
+    python scripts/benchmark_token_keys.py 10000      # custom session count
+"""
+
+import os
+import sys
+import time
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+django.setup()
+
+from types import SimpleNamespace
+
+from django.conf import settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from services.token_cache import token_digest
+
+redis_client = settings.REDIS_CLIENT
+BENCH_PREFIX = "benchmark:"
+
+
+def key_memory(keys):
+    """Bytes Redis reports for `keys` (MEMORY USAGE), or key+value length if unsupported."""
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key, samples=0)
+    try:
+        return sum(pipe.execute() or [0]), "MEMORY USAGE"
+    except Exception:
+        values = redis_client.mget(keys)
+        return sum(len(k) + len(v or "") for k, v in zip(keys, values)), "key+value length (MEMORY USAGE unavailable)"
+
+
+def store(sessions, key_for):
+    pipe = redis_client.pipeline(transaction=False)
+    keys = []
+    for user_id, access, refresh in sessions:
+        for prefix, token, ttl in (("access:", access, 1800), ("refresh:", refresh, 604800)):
+            key = f"{BENCH_PREFIX}{prefix}{key_for(token)}"
+            pipe.setex(key, ttl, str(user_id))
+            keys.append(key)
+    started = time.perf_counter()
+    pipe.execute()
+    return keys, time.perf_counter() - started
+
+
+def time_exists(keys):
+    started = time.perf_counter()
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.exists(key)
+    pipe.execute()
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print(f"\nGenerating {count} sessions...")
+    sessions = []
+    for user_id in range(1, count + 1):
+        refresh = RefreshToken.for_user(SimpleNamespace(id=user_id))
+        sessions.append((user_id, str(refresh.access_token), str(refresh)))
+
+    results = {}
+    for label, key_for in (("full JWT keys", lambda token: token), ("fingerprint keys", token_digest)):
+        keys, write_seconds = store(sessions, key_for)
+        try:
+            memory, method = key_memory(keys)
+            exists_seconds = time_exists(keys)
+            avg_key = sum(len(k) for k in keys) / len(keys)
+        finally:
+            redis_client.delete(*keys)
+        results[label] = memory
+        print(f"\n  {label}:")
+        print(f"    avg key length:      {avg_key:.0f} bytes")
+        print(f"    memory per session:  {memory / count:.0f} bytes ({method})")
+        print(f"    pipelined SETEX:     {write_seconds * 1000:.1f} ms for {len(keys)} keys")
+        print(f"    pipelined EXISTS:    {exists_seconds * 1000:.1f} ms for {len(keys)} keys")
+
+    before, after = results["full JWT keys"], results["fingerprint keys"]
+    if before:
+        print(f"\n  Saved {(before - after) / count:.0f} bytes per session ({100 * (before - after) / before:.0f}%)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """
 Script to inspect OTPs and refresh tokens stored in Redis.
 
+Keys are found with cursor-based SCAN (never KEYS) and values/TTLs are
+fetched in pipelined batches, so it is safe to run against production.
+
 Usage:
     python scripts/inspect_redis_data.py          # Show all OTP and token data
+    python scripts/inspect_redis_data.py summary  # Key counts and memory per prefix, no values
     python scripts/inspect_redis_data.py email    # Show only email OTPs
     python scripts/inspect_redis_data.py phone    # Show only phone OTPs
     python scripts/inspect_redis_data.py refresh  # Show only refresh tokens
@@ -24,9 +28,25 @@ from django.conf import settings
 
 redis_client = settings.REDIS_CLIENT
 
+SCAN_COUNT = 1000  # keys examined per SCAN call
+BATCH_SIZE = 500  # commands per pipeline
+
+SUMMARY_PREFIXES = [
+    "otp:",
+    "refresh:",
+    "access:",
+    "invite_token:",
+    "password_reset_token:",
+    "user_sessions:",
+    "user_cache:",
+    "throttle:",
+]
+
 
 def format_ttl(seconds):
     """Format TTL in human-readable format."""
+    if seconds == -1:
+        return "No expiry"
     if seconds < 0:
         return "Expired"
     elif seconds < 60:
@@ -37,273 +57,206 @@ def format_ttl(seconds):
         return f"{seconds // 3600}h {(seconds % 3600) // 60}m"
 
 
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def scan_keys(pattern):
+    """Keys matching `pattern`, via incremental SCAN so Redis is never blocked."""
+    return redis_client.scan_iter(match=pattern, count=SCAN_COUNT)
+
+
+def batched(keys):
+    batch = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def fetch(keys, limit=None):
+    """(key, value, ttl) for string keys, GET and TTL pipelined per batch."""
+    rows = []
+    for batch in batched(keys):
+        pipe = redis_client.pipeline(transaction=False)
+        for key in batch:
+            pipe.get(key)
+            pipe.ttl(key)
+        results = pipe.execute()
+        rows += [(key, results[2 * i], results[2 * i + 1]) for i, key in enumerate(batch)]
+        if limit is not None and len(rows) >= limit:
+            return rows[:limit]
+    return rows
+
+
+def otp_rows(pattern):
+    """OTP codes (not attempt counters) matching `pattern`."""
+    return fetch(key for key in scan_keys(pattern) if not key.endswith(":attempts"))
+
+
+def print_otps(title, rows, empty="(None)"):
+    print(title)
+    print("-" * 80)
+    if not rows:
+        print(f"  {empty}\n")
+        return
+    for key, val, ttl in rows:
+        parts = key.split(":")
+        purpose, kind, identifier = parts[1], parts[2], ":".join(parts[3:])
+        print(f"  Purpose:    {purpose}")
+        print(f"  {kind.capitalize() + ':':<11} {identifier}")
+        print(f"  Code:       {val}")
+        print(f"  TTL:        {format_ttl(ttl)}\n")
+
+
+def print_tokens(title, prefix, limit=None):
+    total = 0
+    for _ in scan_keys(f"{prefix}*"):
+        total += 1
+    print(f"{title} ({total} total):")
+    print("-" * 80)
+    if not total:
+        print("  (None)\n")
+        return
+    for key, user_id, ttl in fetch(scan_keys(f"{prefix}*"), limit=limit):
+        print(f"  Token: {key[:50]}{'...' if len(key) > 50 else ''}")
+        print(f"  User:  {user_id}")
+        print(f"  TTL:   {format_ttl(ttl)}\n")
+    if limit is not None and total > limit:
+        print(f"  ... and {total - limit} more\n")
+
+
 def show_all():
-    """Show all Redis keys."""
-    all_keys = redis_client.keys("*")
-    
+    """Show OTPs, attempt counters and tokens."""
     print("\n" + "=" * 80)
     print(" " * 20 + "REDIS DATA INSPECTION")
     print("=" * 80 + "\n")
-    
-    # OTP keys by purpose and kind
-    login_email_otps = [k for k in all_keys if k.startswith("otp:login:email:") and ":attempts" not in k]
-    login_phone_otps = [k for k in all_keys if k.startswith("otp:login:phone:") and ":attempts" not in k]
-    
-    verify_email_otps = [k for k in all_keys if k.startswith("otp:verify:email:") and ":attempts" not in k]
-    verify_phone_otps = [k for k in all_keys if k.startswith("otp:verify:phone:") and ":attempts" not in k]
-    
-    password_email_otps = [k for k in all_keys if k.startswith("otp:password:email:") and ":attempts" not in k]
-    password_phone_otps = [k for k in all_keys if k.startswith("otp:password:phone:") and ":attempts" not in k]
-    
-    # Attempt counters
-    all_attempts = [k for k in all_keys if k.endswith(":attempts") and k.startswith("otp:")]
-    
-    # Refresh tokens
-    refresh_tokens = [k for k in all_keys if k.startswith("refresh:")]
-    
-    # Reset tokens
-    reset_tokens = [k for k in all_keys if k.startswith("password_reset_token:")]
-    
-    print("🔐 LOGIN OTP CODES:")
-    print("-" * 80)
-    if login_email_otps or login_phone_otps:
-        for key in login_email_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            email = key.replace("otp:login:email:", "")
-            print(f"  Email: {email}")
-            print(f"  Code:  {val}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-        for key in login_phone_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            phone = key.replace("otp:login:phone:", "")
-            print(f"  Phone: {phone}")
-            print(f"  Code:  {val}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-    else:
-        print("  (None)\n")
-    
-    print("✅ VERIFY OTP CODES:")
-    print("-" * 80)
-    if verify_email_otps or verify_phone_otps:
-        for key in verify_email_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            email = key.replace("otp:verify:email:", "")
-            print(f"  Email: {email}")
-            print(f"  Code:  {val}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-        for key in verify_phone_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            phone = key.replace("otp:verify:phone:", "")
-            print(f"  Phone: {phone}")
-            print(f"  Code:  {val}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-    else:
-        print("  (None)\n")
-    
-    print("🔑 PASSWORD RESET OTP CODES:")
-    print("-" * 80)
-    if password_email_otps or password_phone_otps:
-        for key in password_email_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            email = key.replace("otp:password:email:", "")
-            print(f"  Email: {email}")
-            print(f"  Code:  {val}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-        for key in password_phone_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            phone = key.replace("otp:password:phone:", "")
-            print(f"  Phone: {phone}")
-            print(f"  Code:  {val}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-    else:
-        print("  (None)\n")
-    
+
+    print_otps("🔐 LOGIN OTP CODES:", otp_rows("otp:login:*"))
+    print_otps("✅ VERIFY OTP CODES:", otp_rows("otp:verify:*"))
+    print_otps("🔑 PASSWORD RESET OTP CODES:", otp_rows("otp:password:*"))
+
     print("📊 ATTEMPT COUNTERS:")
     print("-" * 80)
-    if all_attempts:
-        for key in all_attempts:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
+    attempts = fetch(scan_keys("otp:*:attempts"))
+    if attempts:
+        for key, val, ttl in attempts:
             print(f"  {key}: {val} attempts (TTL: {format_ttl(ttl)})")
         print()
     else:
         print("  (None)\n")
-    
-    print("🎟️  REFRESH TOKENS:")
-    print("-" * 80)
-    if refresh_tokens:
-        print(f"  Total: {len(refresh_tokens)} active refresh tokens\n")
-        for key in refresh_tokens[:5]:  # Show first 5
-            user_id = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            token_preview = key[:50] + "..."
-            print(f"  Token: {token_preview}")
-            print(f"  User:  {user_id}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-        if len(refresh_tokens) > 5:
-            print(f"  ... and {len(refresh_tokens) - 5} more refresh tokens\n")
-    else:
-        print("  (None)\n")
-    
-    print("🔓 PASSWORD RESET TOKENS:")
-    print("-" * 80)
-    if reset_tokens:
-        for key in reset_tokens:
-            user_id = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            print(f"  Token: {key}")
-            print(f"  User:  {user_id}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-    else:
-        print("  (None)\n")
-    
+
+    print_tokens("🎟️  REFRESH TOKENS", "refresh:", limit=5)
+    print_tokens("🔓 PASSWORD RESET TOKENS", "password_reset_token:")
+
+    print("=" * 80)
+
+
+def show_summary():
+    """Key count, memory and keys without expiry per prefix; values are never read."""
+    print("\n" + "=" * 80)
+    print(" " * 20 + "REDIS KEYSPACE SUMMARY")
+    print("=" * 80 + "\n")
+    print(f"  {'Prefix':<24}{'Keys':>10}{'Memory':>14}{'Avg/key':>12}{'No expiry':>12}")
+    print("  " + "-" * 72)
+
+    memory_supported = True
+    for prefix in SUMMARY_PREFIXES:
+        count = memory = persistent = 0
+        for batch in batched(scan_keys(f"{prefix}*")):
+            pipe = redis_client.pipeline(transaction=False)
+            for key in batch:
+                pipe.ttl(key)
+                if memory_supported:
+                    pipe.memory_usage(key, samples=0)
+            try:
+                results = pipe.execute()
+            except Exception:
+                # MEMORY USAGE is not available on every server/proxy
+                memory_supported = False
+                pipe = redis_client.pipeline(transaction=False)
+                for key in batch:
+                    pipe.ttl(key)
+                results = pipe.execute()
+
+            step = 2 if memory_supported else 1
+            ttls = results[::step]
+            count += len(batch)
+            persistent += sum(1 for ttl in ttls if ttl == -1)
+            if memory_supported:
+                memory += sum(size or 0 for size in results[1::2])
+
+        if memory_supported and count:
+            memory_text, average_text = format_bytes(memory), format_bytes(memory / count)
+        else:
+            memory_text = average_text = "n/a" if not memory_supported else "-"
+        print(f"  {prefix:<24}{count:>10}{memory_text:>14}{average_text:>12}{persistent:>12}")
+
+    print()
+    if not memory_supported:
+        print("  (MEMORY USAGE unavailable; memory not reported)\n")
     print("=" * 80)
 
 
 def show_email():
     """Show only email OTPs."""
-    all_keys = redis_client.keys("otp:*:email:*")
-    email_otps = [k for k in all_keys if ":attempts" not in k]
-    
-    print("\n📧 EMAIL OTP CODES:\n")
-    if email_otps:
-        for key in email_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            # Extract identifier (everything after the last ':')
-            parts = key.split(":")
-            purpose = parts[1]  # e.g., 'login', 'verify', 'password'
-            identifier = ":".join(parts[3:])  # Everything after 'email:'
-            print(f"  Purpose:  {purpose}")
-            print(f"  Email:    {identifier}")
-            print(f"  Code:     {val}")
-            print(f"  TTL:      {format_ttl(ttl)}\n")
-    else:
-        print("  (No email OTPs found)\n")
+    print()
+    print_otps("📧 EMAIL OTP CODES:", otp_rows("otp:*:email:*"), empty="(No email OTPs found)")
 
 
 def show_phone():
     """Show only phone OTPs."""
-    all_keys = redis_client.keys("otp:*:phone:*")
-    phone_otps = [k for k in all_keys if ":attempts" not in k]
-    
-    print("\n📞 PHONE OTP CODES:\n")
-    if phone_otps:
-        for key in phone_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            # Extract identifier (everything after the last ':')
-            parts = key.split(":")
-            purpose = parts[1]  # e.g., 'login', 'verify', 'password'
-            identifier = ":".join(parts[3:])  # Everything after 'phone:'
-            print(f"  Purpose:  {purpose}")
-            print(f"  Phone:    {identifier}")
-            print(f"  Code:     {val}")
-            print(f"  TTL:      {format_ttl(ttl)}\n")
-    else:
-        print("  (No phone OTPs found)\n")
+    print()
+    print_otps("📞 PHONE OTP CODES:", otp_rows("otp:*:phone:*"), empty="(No phone OTPs found)")
 
 
 def show_refresh():
     """Show only refresh tokens."""
-    all_keys = redis_client.keys("refresh:*")
-    
-    print(f"\n🎟️  REFRESH TOKENS ({len(all_keys)} total):\n")
-    if all_keys:
-        for key in all_keys:
-            user_id = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            token_preview = key[:50] + "..."
-            print(f"  Token: {token_preview}")
-            print(f"  User:  {user_id}")
-            print(f"  TTL:   {format_ttl(ttl)}\n")
-    else:
-        print("  (No refresh tokens found)\n")
+    print()
+    print_tokens("🎟️  REFRESH TOKENS", "refresh:")
 
 
 def show_login():
     """Show only login OTPs."""
-    all_keys = redis_client.keys("otp:login:*")
-    login_otps = [k for k in all_keys if ":attempts" not in k]
-    
-    print("\n🔐 LOGIN OTP CODES:\n")
-    if login_otps:
-        for key in login_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            kind = key.split(":")[2]  # email or phone
-            identifier = ":".join(key.split(":")[3:])
-            print(f"  Kind:       {kind}")
-            print(f"  Identifier: {identifier}")
-            print(f"  Code:       {val}")
-            print(f"  TTL:        {format_ttl(ttl)}\n")
-    else:
-        print("  (No login OTPs found)\n")
+    print()
+    print_otps("🔐 LOGIN OTP CODES:", otp_rows("otp:login:*"), empty="(No login OTPs found)")
 
 
 def show_verify():
     """Show only verify OTPs."""
-    all_keys = redis_client.keys("otp:verify:*")
-    verify_otps = [k for k in all_keys if ":attempts" not in k]
-    
-    print("\n✅ VERIFY OTP CODES:\n")
-    if verify_otps:
-        for key in verify_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            kind = key.split(":")[2]  # email or phone
-            identifier = ":".join(key.split(":")[3:])
-            print(f"  Kind:       {kind}")
-            print(f"  Identifier: {identifier}")
-            print(f"  Code:       {val}")
-            print(f"  TTL:        {format_ttl(ttl)}\n")
-    else:
-        print("  (No verify OTPs found)\n")
+    print()
+    print_otps("✅ VERIFY OTP CODES:", otp_rows("otp:verify:*"), empty="(No verify OTPs found)")
 
 
 def show_password():
     """Show only password reset OTPs."""
-    all_keys = redis_client.keys("otp:password:*")
-    password_otps = [k for k in all_keys if ":attempts" not in k]
-    
-    print("\n🔑 PASSWORD RESET OTP CODES:\n")
-    if password_otps:
-        for key in password_otps:
-            val = redis_client.get(key)
-            ttl = redis_client.ttl(key)
-            kind = key.split(":")[2]  # email or phone
-            identifier = ":".join(key.split(":")[3:])
-            print(f"  Kind:       {kind}")
-            print(f"  Identifier: {identifier}")
-            print(f"  Code:       {val}")
-            print(f"  TTL:        {format_ttl(ttl)}\n")
-    else:
-        print("  (No password reset OTPs found)\n")
+    print()
+    print_otps("🔑 PASSWORD RESET OTP CODES:", otp_rows("otp:password:*"), empty="(No password reset OTPs found)")
 
 
 if __name__ == "__main__":
+    commands = {
+        "summary": show_summary,
+        "email": show_email,
+        "phone": show_phone,
+        "refresh": show_refresh,
+        "login": show_login,
+        "verify": show_verify,
+        "password": show_password,
+    }
     if len(sys.argv) > 1:
         arg = sys.argv[1].lower()
-        if arg == "email":
-            show_email()
-        elif arg == "phone":
-            show_phone()
-        elif arg == "refresh":
-            show_refresh()
-        elif arg == "login":
-            show_login()
-        elif arg == "verify":
-            show_verify()
-        elif arg == "password":
-            show_password()
+        if arg in commands:
+            commands[arg]()
         else:
             print(f"Unknown argument: {arg}")
-            print("Use: email, phone, refresh, login, verify, or password")
+            print("Use: summary, email, phone, refresh, login, verify, or password")
     else:
         show_all()
@@ -3,6 +3,7 @@ import random
 import string
 import logging
 
+from collections import namedtuple
 from datetime import timedelta
 
 from django.conf import settings
@@ -13,6 +14,51 @@ REDIS_PREFIX = "otp:"  # full keys will be like "otp:email:abc@x.com"
 RESET_TOKEN_PREFIX = "password_reset_token:"
 RESET_TOKEN_TTL = 15 * 60  # 15 minutes
 
+# KEYS[1] = attempts key; ARGV[1] = window seconds
+# The TTL is set in the same call, so a counter can never be left without one.
+INCREMENT_ATTEMPTS_LUA = """
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return attempts
+"""
+
+# KEYS[1] = otp key, KEYS[2] = attempts key
+# ARGV[1] = submitted otp, ARGV[2] = max attempts, ARGV[3] = attempts window seconds
+# Returns {attempts, valid, consumed}. The OTP is only compared while the
+# attempt budget lasts, and a match deletes it in the same step, so two
+# concurrent submissions can never both succeed.
+VERIFY_AND_CONSUME_OTP_LUA = """
+local attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+end
+if attempts > tonumber(ARGV[2]) then
+    return {attempts, 0, 0}
+end
+local stored = redis.call('GET', KEYS[1])
+if stored == false or stored ~= ARGV[1] then
+    return {attempts, 0, 0}
+end
+return {attempts, 1, redis.call('DEL', KEYS[1])}
+"""
+
+OTPVerification = namedtuple("OTPVerification", ["attempts", "valid", "consumed"])
+
+_scripts = {}
+
+
+def _script(source: str):
+    """
+    Registered script, run with EVALSHA (reloaded automatically after a
+    SCRIPT FLUSH or failover). Callers pass the client on each call.
+    """
+    script = _scripts.get(source)
+    if script is None:
+        script = _scripts[source] = settings.REDIS_CLIENT.register_script(source)
+    return script
+
 
 def _make_key(kind: str, identifier: str) -> str:
     # kind: 'email', 'phone', 'login'
@@ -63,12 +109,32 @@ def verify_otp(kind: str, identifier: str, otp: str):
     logger.warning(f"OTP verification failed for {kind}: {identifier}")
     return False
 
+def verify_and_consume_otp(
+    kind: str, identifier: str, otp: str, *, attempts_kind: str = None,
+    max_attempts: int = 5, window_seconds: int = 300,
+) -> OTPVerification:
+    """
+    Count an attempt and, within the `max_attempts` budget, check and delete
+    the OTP, all in one atomic round-trip. Attempts are counted under
+    `attempts_kind` (defaults to `kind`).
+    """
+    logger.debug(f"Verifying OTP for {kind}: {identifier}")
+    attempts, valid, consumed = _script(VERIFY_AND_CONSUME_OTP_LUA)(
+        keys=[_make_key(kind, identifier), f"{_make_key(attempts_kind or kind, identifier)}:attempts"],
+        args=[str(otp), max_attempts, window_seconds],
+        client=settings.REDIS_CLIENT,
+    )
+    result = OTPVerification(int(attempts), bool(valid), bool(consumed))
+    if result.consumed:
+        logger.info(f"OTP verified successfully for {kind}: {identifier}")
+    else:
+        logger.warning(f"OTP verification failed for {kind}: {identifier} (attempt {result.attempts})")
+    return result
+
 def increment_attempts(kind: str, identifier: str, window_seconds: int = 60):
     logger.debug(f"Incrementing attempts for {kind}: {identifier}")
     key = f"{_make_key(kind, identifier)}:attempts"
-    attempts = settings.REDIS_CLIENT.incr(key)
-    if attempts == 1:
-        settings.REDIS_CLIENT.expire(key, window_seconds)
+    attempts = _script(INCREMENT_ATTEMPTS_LUA)(keys=[key], args=[window_seconds], client=settings.REDIS_CLIENT)
     logger.debug(f"Attempts count for {kind}: {identifier} = {attempts}")
     return attempts
 
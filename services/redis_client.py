@@ -0,0 +1,116 @@
+import logging
+import os
+import socket
+import threading
+
+import redis
+
+from redis.backoff import ExponentialBackoff
+from redis.connection import BlockingConnectionPool
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_pool = None
+_pid = None
+_lock = threading.Lock()
+
+
+def _keepalive_options():
+    # Probe idle connections so dead peers (failover, NAT timeouts) are noticed
+    options = {}
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = value
+    return options
+
+
+def _build_pool():
+    from django.conf import settings
+
+    return BlockingConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        decode_responses=True,
+        max_connections=getattr(settings, "REDIS_MAX_CONNECTIONS", 50),
+        # Seconds to wait for a free connection before raising
+        timeout=getattr(settings, "REDIS_POOL_TIMEOUT", 5.0),
+        socket_timeout=getattr(settings, "REDIS_SOCKET_TIMEOUT", 5.0),
+        socket_connect_timeout=getattr(settings, "REDIS_SOCKET_CONNECT_TIMEOUT", 2.0),
+        socket_keepalive=True,
+        socket_keepalive_options=_keepalive_options(),
+        health_check_interval=getattr(settings, "REDIS_HEALTH_CHECK_INTERVAL", 30),
+        retry=Retry(ExponentialBackoff(cap=1.0, base=0.05), getattr(settings, "REDIS_RETRY_ATTEMPTS", 3)),
+        retry_on_error=[ConnectionError, TimeoutError],
+    )
+
+
+def get_redis_client():
+    """
+    Return the process-wide Redis client, creating its connection pool on
+    first use. A forked child (gunicorn/Celery prefork worker) gets a pool
+    of its own instead of sharing the parent's sockets.
+    """
+    global _client, _pool, _pid
+    pid = os.getpid()
+    if _client is not None and _pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _pid != pid:
+            _pool = _build_pool()
+            _client = redis.Redis(connection_pool=_pool)
+            _pid = pid
+            logger.info(f"Redis connection pool created (pid {pid}, max {_pool.max_connections} connections)")
+    return _client
+
+
+def _reset_after_fork():
+    global _client, _pool, _pid, _lock
+    # Drop the parent's pool without closing its sockets, which it still uses
+    _client = _pool = _pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def pool_stats():
+    """Connection pool utilisation of this process, or None before first use."""
+    pool = _pool
+    if pool is None or _pid != os.getpid():
+        return None
+    created = len(pool._connections)
+    idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    return {
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": created - idle,
+        "idle": idle,
+    }
+
+
+def ping():
+    """True if Redis answers a PING within the socket timeout."""
+    try:
+        return bool(get_redis_client().ping())
+    except Exception as e:
+        logger.warning(f"Redis health check failed: {str(e)}")
+        return False
+
+
+class LazyRedisClient:
+    """
+    Stands in for a redis.Redis instance in settings.REDIS_CLIENT. Nothing
+    connects, and no pool exists, until a command is actually issued.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_redis_client(), name)
+
+    def __repr__(self):
+        return "<LazyRedisClient>"
@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_INVALIDATION_CHANNEL = "token_invalidations"
+INVALIDATE_ALL = "*"
+
+
+def token_digest(token):
+    """
+    Short, non-reversible fingerprint of a raw token (128 bits of SHA-256).
+    Used for session store keys and cache entries; safe to broadcast.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+class LocalTokenCache:
+    """
+    Per-process LRU of access tokens recently confirmed valid in Redis.
+
+    Entries live for `ttl` seconds at most, so a revocation is honoured
+    within `ttl` even if an invalidation message is lost. Entries are only
+    served while the pub/sub listener is subscribed: a process that cannot
+    hear invalidations falls back to asking Redis every time.
+    """
+
+    def __init__(self, max_size=10000, ttl=5.0, channel=TOKEN_INVALIDATION_CHANNEL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.channel = channel
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._listening = threading.Event()
+        self._listener = None
+        self._pid = os.getpid()
+
+    @property
+    def generation(self):
+        """Bumped by every invalidation; read it before asking Redis."""
+        return self._generation
+
+    def get(self, digest):
+        self._ensure_listener()
+        if not self._listening.is_set():
+            self.misses += 1
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._entries.get(digest)
+            if expires_at is None or expires_at <= now:
+                if expires_at is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return False
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return True
+
+    def add(self, digest, generation):
+        """
+        Cache a token Redis reported valid. Skipped if an invalidation
+        arrived since `generation` was read, since it may have been for
+        this token and raced the Redis lookup.
+        """
+        if not self._listening.is_set():
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[digest] = time.monotonic() + self.ttl
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, digest):
+        with self._lock:
+            if digest == INVALIDATE_ALL:
+                self._entries.clear()
+            else:
+                self._entries.pop(digest, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+    def _ensure_listener(self):
+        # Threads do not survive fork; each worker process starts its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._entries = OrderedDict()
+            self._lock = threading.Lock()
+            self._listening = threading.Event()
+            self._listener = None
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name="token-invalidation-listener", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self):
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = settings.REDIS_CLIENT.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything cached before (re)subscribing may have missed an invalidation
+                self.clear()
+                self._listening.set()
+                backoff = 1.0
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        for digest in message["data"].split():
+                            self.invalidate(digest)
+            except Exception as e:
+                logger.warning(f"Token invalidation listener disconnected: {str(e)}")
+            finally:
+                self._listening.clear()
+                self.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+def publish_invalidation(*digests):
+    """
+    Tell every process to drop `digests` (or INVALIDATE_ALL) from its cache,
+    as one space-separated message.
+    """
+    if not digests:
+        return
+    cache = get_access_token_cache()
+    if cache is not None:
+        for digest in digests:
+            cache.invalidate(digest)
+    try:
+        settings.REDIS_CLIENT.publish(
+            getattr(settings, "TOKEN_INVALIDATION_CHANNEL", TOKEN_INVALIDATION_CHANNEL), " ".join(digests)
+        )
+    except Exception as e:
+        # Other processes still drop the entry once its TTL runs out
+        logger.error(f"Could not publish token invalidation: {str(e)}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_access_token_cache():
+    """Return the process-wide access token cache, or None when disabled."""
+    global _cache
+    if not getattr(settings, "ACCESS_TOKEN_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LocalTokenCache(
+                    max_size=getattr(settings, "ACCESS_TOKEN_CACHE_SIZE", 10000),
+                    ttl=getattr(settings, "ACCESS_TOKEN_CACHE_TTL", 5.0),
+                    channel=getattr(settings, "TOKEN_INVALIDATION_CHANNEL", TOKEN_INVALIDATION_CHANNEL),
+                )
+    return _cache
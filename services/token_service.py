@@ -1,3 +1,6 @@
+import jwt
+import json
+import time
 import redis
 import logging
 
@@ -5,45 +8,120 @@ from datetime import timedelta
 
 from django.conf import settings
 
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from services.token_cache import get_access_token_cache, publish_invalidation, token_digest
+
 logger = logging.getLogger(__name__)
 
 REDIS_KEY_PREFIX = "refresh:"
 REDIS_ACCESS_TOKEN_PREFIX = "access:"
 REDIS_USER_SESSIONS_PREFIX = "user_sessions:"
+# Set by revoke_all_sessions: the user's full-JWT (legacy) keys are no longer honoured
+REDIS_LEGACY_REVOKED_PREFIX = "legacy_sessions_revoked:"
 
-def store_refresh_token(user_id, refresh_token):
-    """Store refresh token in Redis with expiry."""
-    logger.debug(f"Storing refresh token for user {user_id}")
+
+def _lifetime_seconds(name, default):
     # prefer configured lifetime if available
     try:
-        ttl = int(settings.SIMPLE_JWT.get("REFRESH_TOKEN_LIFETIME", timedelta(days=7)).total_seconds())
+        return int(settings.SIMPLE_JWT.get(name, default).total_seconds())
     except Exception:
-        ttl = int(timedelta(days=7).total_seconds())
-    key = f"{REDIS_KEY_PREFIX}{refresh_token}"
-    settings.REDIS_CLIENT.setex(key, ttl, str(user_id))
+        return int(default.total_seconds())
+
+
+# Resolved once at import instead of on every store call
+REFRESH_TOKEN_TTL = _lifetime_seconds("REFRESH_TOKEN_LIFETIME", timedelta(days=7))
+ACCESS_TOKEN_TTL = _lifetime_seconds("ACCESS_TOKEN_LIFETIME", timedelta(minutes=30))
+
+
+def _token_key(prefix, token):
+    """
+    Session store key for a raw JWT: the prefix plus a 32-char fingerprint
+    (truncated SHA-256) instead of the whole several-hundred-byte token.
+    """
+    return f"{prefix}{token_digest(token)}"
+
+
+def _lookup_keys(prefix, token, digest=None):
+    """
+    Keys a token may be stored under. While TOKEN_STORE_ACCEPT_LEGACY_KEYS is
+    on, tokens issued before fingerprint keys (keyed by the full JWT) are
+    still honoured; they expire on their own within REFRESH_TOKEN_LIFETIME.
+    """
+    keys = [f"{prefix}{digest or token_digest(token)}"]
+    if getattr(settings, "TOKEN_STORE_ACCEPT_LEGACY_KEYS", True):
+        keys.append(f"{prefix}{token}")
+    return keys
+
+
+def _legacy_revoked_key(user_id):
+    return f"{REDIS_LEGACY_REVOKED_PREFIX}{user_id}"
+
+
+def _token_user_id(token):
+    """
+    User id claim of a JWT, read without verifying the signature. Only used
+    to reject legacy keys, so a forged claim can only revoke its own token.
+    """
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get(jwt_settings.USER_ID_CLAIM)
+    except jwt.PyJWTError:
+        return None
+
+
+def _is_token_stored(prefix, token, digest=None):
+    """
+    Whether `token` has a live key. A legacy key only counts until the user
+    revokes all sessions, since those keys are not in the session index.
+    """
+    keys = _lookup_keys(prefix, token, digest)
+    if len(keys) == 1:
+        return bool(settings.REDIS_CLIENT.exists(keys[0]))
+
+    # Still one round-trip for both key formats and the revocation marker
+    user_id = _token_user_id(token)
+    pipe = settings.REDIS_CLIENT.pipeline(transaction=False)
+    for key in keys:
+        pipe.exists(key)
+    pipe.exists(_legacy_revoked_key(user_id))
+    current, legacy, revoked = pipe.execute()
+    return bool(current) or (bool(legacy) and user_id is not None and not revoked)
+
+
+def store_refresh_token(user_id, refresh_token):
+    """Store refresh token in Redis with expiry."""
+    logger.debug(f"Storing refresh token for user {user_id}")
+    key = _token_key(REDIS_KEY_PREFIX, refresh_token)
+    settings.REDIS_CLIENT.setex(key, REFRESH_TOKEN_TTL, str(user_id))
     logger.info(f"Refresh token stored successfully for user {user_id}")
 
 
 def store_access_token(user_id, access_token):
     """Store access token in Redis with expiry to track active sessions."""
     logger.debug(f"Storing access token for user {user_id}")
-    try:
-        ttl = int(settings.SIMPLE_JWT.get("ACCESS_TOKEN_LIFETIME", timedelta(minutes=30)).total_seconds())
-    except Exception:
-        ttl = int(timedelta(minutes=30).total_seconds())
-    key = f"{REDIS_ACCESS_TOKEN_PREFIX}{access_token}"
-    settings.REDIS_CLIENT.setex(key, ttl, str(user_id))
+    key = _token_key(REDIS_ACCESS_TOKEN_PREFIX, access_token)
+    settings.REDIS_CLIENT.setex(key, ACCESS_TOKEN_TTL, str(user_id))
     logger.info(f"Access token stored successfully for user {user_id}")
 
 
 def is_access_token_valid(access_token):
-    """Check if access token exists in Redis (user hasn't logged out)."""
+    """
+    Check if access token exists in Redis (user hasn't logged out).
+    Tokens confirmed valid in the last ACCESS_TOKEN_CACHE_TTL seconds are
+    answered from the per-process cache without a Redis round-trip.
+    """
     logger.debug("Validating access token")
-    key = f"{REDIS_ACCESS_TOKEN_PREFIX}{access_token}"
-    val = settings.REDIS_CLIENT.exists(key)
-    is_valid = bool(val)
+    cache = get_access_token_cache()
+    digest = token_digest(access_token)
+    if cache is not None:
+        if cache.get(digest):
+            return True
+        generation = cache.generation
+
+    is_valid = _is_token_stored(REDIS_ACCESS_TOKEN_PREFIX, access_token, digest)
+    if is_valid and cache is not None:
+        cache.add(digest, generation)
     logger.debug(f"Access token validation result: {is_valid}")
     return is_valid
 
@@ -51,10 +129,7 @@ def is_access_token_valid(access_token):
 def is_refresh_token_valid(refresh_token):
     """Check if refresh token exists in Redis."""
     logger.debug("Validating refresh token")
-    key = f"{REDIS_KEY_PREFIX}{refresh_token}"
-    # redis-py returns int count for exists in older clients, newer return bool
-    val = settings.REDIS_CLIENT.exists(key)
-    is_valid = bool(val)
+    is_valid = _is_token_stored(REDIS_KEY_PREFIX, refresh_token)
     logger.debug(f"Refresh token validation result: {is_valid}")
     return is_valid
 
@@ -62,14 +137,251 @@ def is_refresh_token_valid(refresh_token):
 def delete_refresh_token(refresh_token):
     """Invalidate refresh token on logout."""
     logger.debug("Deleting refresh token")
-    key = f"{REDIS_KEY_PREFIX}{refresh_token}"
-    settings.REDIS_CLIENT.delete(key)
+    settings.REDIS_CLIENT.delete(*_lookup_keys(REDIS_KEY_PREFIX, refresh_token))
     logger.info("Refresh token deleted successfully")
 
 
 def delete_access_token(access_token):
     """Invalidate access token on logout."""
     logger.debug("Deleting access token")
-    key = f"{REDIS_ACCESS_TOKEN_PREFIX}{access_token}"
-    settings.REDIS_CLIENT.delete(key)
+    digest = token_digest(access_token)
+    settings.REDIS_CLIENT.delete(*_lookup_keys(REDIS_ACCESS_TOKEN_PREFIX, access_token, digest))
+    # Drop it from every process' validation cache
+    publish_invalidation(digest)
     logger.info("Access token deleted successfully")
+
+
+# -------------------------------
+# Per-user session index
+# -------------------------------
+# user_sessions:<user_id> is a hash of refresh fingerprint (the session id)
+# -> JSON {"created_at", "refreshed_at", "access": [[fingerprint, issued_at], ...]}.
+# It is written in the same MULTI as the token keys, so the index and the
+# tokens it points at never disagree.
+
+def _session_index_key(user_id):
+    return f"{REDIS_USER_SESSIONS_PREFIX}{user_id}"
+
+
+def _live_access(entry, now):
+    """Access fingerprints of a session that may not have expired yet."""
+    horizon = now - ACCESS_TOKEN_TTL
+    return [item for item in entry.get("access", []) if item[1] > horizon]
+
+
+def _queue_session_delete(pipe, session_id, entry):
+    """Queue deletion of a session's refresh key and every live access key."""
+    pipe.delete(f"{REDIS_KEY_PREFIX}{session_id}")
+    access_digests = [digest for digest, _ in entry.get("access", [])]
+    if access_digests:
+        pipe.delete(*[f"{REDIS_ACCESS_TOKEN_PREFIX}{digest}" for digest in access_digests])
+    return access_digests
+
+
+def create_session(user_id, refresh_token, access_token=None):
+    """Store a new refresh/access pair and index it under the user. Returns the session id."""
+    logger.debug(f"Creating session for user {user_id}")
+    session_id = token_digest(refresh_token)
+    now = int(time.time())
+    entry = {"created_at": now, "refreshed_at": now, "access": []}
+
+    pipe = settings.REDIS_CLIENT.pipeline(transaction=True)
+    pipe.setex(f"{REDIS_KEY_PREFIX}{session_id}", REFRESH_TOKEN_TTL, str(user_id))
+    if access_token:
+        access_digest = token_digest(access_token)
+        pipe.setex(f"{REDIS_ACCESS_TOKEN_PREFIX}{access_digest}", ACCESS_TOKEN_TTL, str(user_id))
+        entry["access"].append([access_digest, now])
+    pipe.hset(_session_index_key(user_id), session_id, json.dumps(entry))
+    pipe.expire(_session_index_key(user_id), REFRESH_TOKEN_TTL)
+    pipe.execute()
+    logger.info(f"Session created successfully for user {user_id}")
+    return session_id
+
+
+def rotate_session(user_id, old_refresh_token, new_refresh_token, new_access_token=None):
+    """
+    Replace a session's refresh token on refresh. Access tokens issued
+    earlier in the session stay valid until they expire and stay in the
+    index, so revoking the session still revokes them.
+
+    The index entry is read and rewritten under WATCH, so a revoke or a
+    concurrent refresh of the same user retries the rotation instead of
+    being overwritten. Returns None if the old session is already gone.
+    """
+    logger.debug(f"Rotating session for user {user_id}")
+    index_key = _session_index_key(user_id)
+    old_session_id = token_digest(old_refresh_token)
+    new_session_id = token_digest(new_refresh_token)
+    old_keys = _lookup_keys(REDIS_KEY_PREFIX, old_refresh_token, old_session_id)
+    access_digest = token_digest(new_access_token) if new_access_token else None
+
+    with settings.REDIS_CLIENT.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                pipe.watch(index_key, *old_keys)
+                # Revoked, or rotated by a concurrent refresh
+                if not pipe.exists(*old_keys):
+                    pipe.unwatch()
+                    logger.warning(f"Session of user {user_id} ended before it could be rotated")
+                    return None
+
+                now = int(time.time())
+                raw = pipe.hget(index_key, old_session_id)
+                # Sessions created before the index have no entry yet
+                entry = json.loads(raw) if raw else {"created_at": now, "access": []}
+                entry["refreshed_at"] = now
+                entry["access"] = _live_access(entry, now)
+
+                pipe.multi()
+                pipe.setex(f"{REDIS_KEY_PREFIX}{new_session_id}", REFRESH_TOKEN_TTL, str(user_id))
+                if access_digest:
+                    pipe.setex(f"{REDIS_ACCESS_TOKEN_PREFIX}{access_digest}", ACCESS_TOKEN_TTL, str(user_id))
+                    entry["access"].append([access_digest, now])
+                pipe.delete(*old_keys)
+                pipe.hdel(index_key, old_session_id)
+                pipe.hset(index_key, new_session_id, json.dumps(entry))
+                pipe.expire(index_key, REFRESH_TOKEN_TTL)
+                pipe.execute()
+                break
+            except redis.WatchError:
+                logger.debug(f"Session index of user {user_id} changed during rotation, retrying")
+
+    logger.info(f"Session rotated successfully for user {user_id}")
+    return new_session_id
+
+
+def end_session(user_id, refresh_token, access_token=None):
+    """
+    Log out one session: its refresh token, the given access token and any
+    other access tokens it issued. The common case (the session's only
+    access token is the one presented) is a single round-trip.
+    """
+    logger.debug(f"Ending session for user {user_id}")
+    index_key = _session_index_key(user_id)
+    session_id = token_digest(refresh_token) if refresh_token else None
+    access_digest = token_digest(access_token) if access_token else None
+
+    pipe = settings.REDIS_CLIENT.pipeline(transaction=True)
+    if session_id:
+        pipe.hget(index_key, session_id)
+        pipe.delete(*_lookup_keys(REDIS_KEY_PREFIX, refresh_token, session_id))
+        pipe.hdel(index_key, session_id)
+    if access_token:
+        pipe.delete(*_lookup_keys(REDIS_ACCESS_TOKEN_PREFIX, access_token, access_digest))
+    results = pipe.execute()
+
+    raw = results[0] if session_id else None
+    access_digests = {digest for digest, _ in json.loads(raw).get("access", [])} if raw else set()
+    others = access_digests - {access_digest}
+    if others:
+        settings.REDIS_CLIENT.delete(*[f"{REDIS_ACCESS_TOKEN_PREFIX}{digest}" for digest in others])
+    if access_digest:
+        access_digests.add(access_digest)
+
+    publish_invalidation(*access_digests)
+    logger.info(f"Session ended successfully for user {user_id}")
+
+
+def list_sessions(user_id, current_access_token=None):
+    """
+    Active sessions of a user, newest first. The session that issued
+    `current_access_token` is flagged "current". Index entries whose
+    refresh token has expired are pruned on the way.
+    """
+    index_key = _session_index_key(user_id)
+    entries = settings.REDIS_CLIENT.hgetall(index_key)
+    if not entries:
+        return []
+
+    session_ids = list(entries)
+    pipe = settings.REDIS_CLIENT.pipeline(transaction=False)
+    for session_id in session_ids:
+        pipe.exists(f"{REDIS_KEY_PREFIX}{session_id}")
+    alive = pipe.execute()
+
+    expired = [session_id for session_id, exists in zip(session_ids, alive) if not exists]
+    if expired:
+        settings.REDIS_CLIENT.hdel(index_key, *expired)
+
+    current_digest = token_digest(current_access_token) if current_access_token else None
+    now = int(time.time())
+    sessions = []
+    for session_id, exists in zip(session_ids, alive):
+        if not exists:
+            continue
+        entry = json.loads(entries[session_id])
+        sessions.append({
+            "id": session_id,
+            "created_at": entry.get("created_at"),
+            "refreshed_at": entry.get("refreshed_at"),
+            "current": any(digest == current_digest for digest, _ in _live_access(entry, now)),
+        })
+    sessions.sort(key=lambda session: session["refreshed_at"] or 0, reverse=True)
+    return sessions
+
+
+def find_session_id(user_id, access_token):
+    """Id of the session that issued `access_token`, or None."""
+    digest = token_digest(access_token)
+    for session_id, raw in settings.REDIS_CLIENT.hgetall(_session_index_key(user_id)).items():
+        if any(item[0] == digest for item in json.loads(raw).get("access", [])):
+            return session_id
+    return None
+
+
+def revoke_session(user_id, session_id):
+    """Revoke one session by id. Returns False if the user has no such session."""
+    logger.debug(f"Revoking session {session_id} for user {user_id}")
+    index_key = _session_index_key(user_id)
+    raw = settings.REDIS_CLIENT.hget(index_key, session_id)
+    if raw is None:
+        return False
+
+    pipe = settings.REDIS_CLIENT.pipeline(transaction=True)
+    access_digests = _queue_session_delete(pipe, session_id, json.loads(raw))
+    pipe.hdel(index_key, session_id)
+    pipe.execute()
+
+    publish_invalidation(*access_digests)
+    logger.info(f"Session {session_id} revoked for user {user_id}")
+    return True
+
+
+def revoke_all_sessions(user_id, except_session_id=None):
+    """
+    Revoke every session of a user, optionally keeping one. Returns the
+    number revoked. Runs under WATCH on the index, so a session a concurrent
+    refresh rotates in is revoked too. Sessions stored under legacy keys are
+    not indexed; they are all revoked with a per-user marker instead.
+    """
+    logger.debug(f"Revoking all sessions for user {user_id}")
+    index_key = _session_index_key(user_id)
+    legacy = getattr(settings, "TOKEN_STORE_ACCEPT_LEGACY_KEYS", True)
+
+    with settings.REDIS_CLIENT.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                pipe.watch(index_key)
+                entries = pipe.hgetall(index_key)
+                doomed = {sid: json.loads(raw) for sid, raw in entries.items() if sid != except_session_id}
+                if not doomed and not legacy:
+                    pipe.unwatch()
+                    return 0
+
+                pipe.multi()
+                access_digests = []
+                for session_id, entry in doomed.items():
+                    access_digests += _queue_session_delete(pipe, session_id, entry)
+                if doomed:
+                    pipe.hdel(index_key, *doomed)
+                if legacy:
+                    # Legacy tokens expire within REFRESH_TOKEN_LIFETIME; so can the marker
+                    pipe.setex(_legacy_revoked_key(user_id), REFRESH_TOKEN_TTL, int(time.time()))
+                pipe.execute()
+                break
+            except redis.WatchError:
+                logger.debug(f"Session index of user {user_id} changed during revocation, retrying")
+
+    publish_invalidation(*access_digests)
+    logger.info(f"Revoked {len(doomed)} sessions for user {user_id}")
+    return len(doomed)
@@ -0,0 +1,184 @@
+import json
+import logging
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_PREFIX = "user_cache:"
+USER_VERSION_PREFIX = "user_cache_version:"
+
+# Never copied into the cache; read from the database on first access
+UNCACHED_FIELDS = ("password",)
+
+
+def _cached_fields(model):
+    return [field for field in model._meta.concrete_fields if field.name not in UNCACHED_FIELDS]
+
+
+def _dump(user):
+    return {
+        field.attname: field.get_prep_value(getattr(user, field.attname))
+        for field in _cached_fields(type(user))
+    }
+
+
+def _load(model, data):
+    """Rebuild a persisted instance from cached fields without a query."""
+    fields = _cached_fields(model)
+    return model.from_db(
+        "default",
+        [field.attname for field in fields],
+        [field.to_python(data[field.attname]) for field in fields],
+    )
+
+
+class UserCache:
+    """
+    Users by id: a per-process LRU in front of Redis in front of the database.
+
+    Each user has a version stamp in Redis, replaced on every invalidation.
+    Redis entries carry the version they were read under and are ignored
+    once it moves on, so a reader that raced an update can never re-cache
+    the old row. Local entries are trusted for `local_ttl` seconds, which
+    bounds how long another process may keep serving a changed user.
+    """
+
+    def __init__(self, max_size=5000, local_ttl=5.0, redis_ttl=3600):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the user with primary key `user_id`, or None if it does not exist."""
+        model = get_user_model()
+        key = str(user_id)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.local_hits += 1
+                return _load(model, entry[1])
+
+        version, data = self._read_redis(key)
+        if data is not None:
+            self.redis_hits += 1
+        else:
+            self.misses += 1
+            user = model.objects.filter(pk=user_id).first()
+            if user is None:
+                return None
+            data = json.loads(json.dumps(_dump(user), cls=DjangoJSONEncoder))
+            self._write_redis(key, version, data)
+
+        self._remember(key, data)
+        return _load(model, data)
+
+    def invalidate(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            pipe = settings.REDIS_CLIENT.pipeline(transaction=True)
+            # A counter would restart once its key expired and match old entries again
+            pipe.set(f"{USER_VERSION_PREFIX}{key}", uuid.uuid4().hex, ex=self.redis_ttl * 2)
+            pipe.delete(f"{USER_CACHE_PREFIX}{key}")
+            pipe.execute()
+        except Exception as e:
+            # Redis entries also expire on their own after redis_ttl
+            logger.error(f"Could not invalidate cached user {key}: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    def _read_redis(self, key):
+        """(current version, cached fields or None)"""
+        try:
+            version, payload = settings.REDIS_CLIENT.mget(
+                f"{USER_VERSION_PREFIX}{key}", f"{USER_CACHE_PREFIX}{key}"
+            )
+        except Exception as e:
+            logger.warning(f"Could not read cached user {key}: {str(e)}")
+            return None, None
+        version = version or ""
+        if payload:
+            entry = json.loads(payload)
+            if entry.get("version") == version:
+                return version, entry["fields"]
+        return version, None
+
+    def _write_redis(self, key, version, data):
+        if version is None:
+            return
+        try:
+            settings.REDIS_CLIENT.set(
+                f"{USER_CACHE_PREFIX}{key}",
+                json.dumps({"version": version, "fields": data}),
+                ex=self.redis_ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache user {key}: {str(e)}")
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.local_ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    """Return the process-wide user cache, or None when disabled."""
+    global _cache
+    if not getattr(settings, "USER_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UserCache(
+                    max_size=getattr(settings, "USER_CACHE_SIZE", 5000),
+                    local_ttl=getattr(settings, "USER_CACHE_LOCAL_TTL", 5.0),
+                    redis_ttl=getattr(settings, "USER_CACHE_REDIS_TTL", 3600),
+                )
+    return _cache
+
+
+def get_cached_user(user_id):
+    """Load a user through the cache (straight from the database when disabled)."""
+    cache = get_user_cache()
+    if cache is None:
+        return get_user_model().objects.filter(pk=user_id).first()
+    return cache.get(user_id)
+
+
+def invalidate_user(user_id):
+    cache = get_user_cache()
+    if cache is not None:
+        cache.invalidate(user_id)